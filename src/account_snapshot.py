@@ -0,0 +1,85 @@
+import time
+
+
+class AccountSnapshot:
+    def __init__(self, buying_power, positions):
+        """
+        Buying power, positions, and equity of the user's account at one point in time.
+
+        The snapshot is meant to be loaded once per trading cycle and shared by every check made during that cycle.
+        Orders placed by the bot are applied to it locally so that it stays accurate without another request. Sale
+        proceeds are only credited by the next snapshot, since they cannot be spent before the sale fills.
+
+        :param buying_power: Buying power in USD
+        :param positions: Dict mapping each held ticker to a dict with at least its "quantity" and "equity"
+        """
+
+        self.buying_power = float(buying_power)
+        self.positions = {
+            ticker.upper(): {"quantity": float(position["quantity"]), "equity": float(position["equity"])}
+            for ticker, position in positions.items()
+        }
+        self.taken_at = time.monotonic()
+
+    @property
+    def age(self):
+        """Returns the number of seconds since the snapshot was taken."""
+
+        return time.monotonic() - self.taken_at
+
+    @property
+    def total_equity(self):
+        """Returns the combined equity of all positions in USD."""
+
+        return sum(position["equity"] for position in self.positions.values())
+
+    def get_equity_in_position(self, ticker):
+        """
+        Returns the dollar value of the equity in the position.
+
+        :param ticker: A company's ticker symbol as a string
+        :return: float
+        """
+
+        position = self.positions.get(ticker.upper())
+
+        return position["equity"] if position else 0
+
+    def record_purchase(self, ticker, amount_in_dollars):
+        """
+        Applies a buy order to the snapshot.
+
+        :param ticker: A company's ticker symbol as a string
+        :param amount_in_dollars: The amount in USD used for the purchase
+        """
+
+        position = self.positions.setdefault(ticker.upper(), {"quantity": 0.0, "equity": 0.0})
+
+        # The quantity bought is unknown until the order fills, so it is estimated from the position's current price.
+        if position["equity"] > 0:
+            position["quantity"] += position["quantity"] * amount_in_dollars / position["equity"]
+
+        position["equity"] += amount_in_dollars
+        self.buying_power -= amount_in_dollars
+
+    def record_sale(self, ticker, amount_in_dollars):
+        """
+        Applies a sell order to the snapshot. A position whose equity is sold in full is removed. The buying power is
+        left as is until the order fills and a new snapshot is loaded.
+
+        :param ticker: A company's ticker symbol as a string
+        :param amount_in_dollars: The amount in USD used for the sale
+        """
+
+        symbol = ticker.upper()
+        position = self.positions.get(symbol)
+
+        if position is None:
+            return
+
+        if amount_in_dollars >= position["equity"]:
+            del self.positions[symbol]
+
+        else:
+            position["quantity"] -= position["quantity"] * amount_in_dollars / position["equity"]
+            position["equity"] -= amount_in_dollars
@@ -0,0 +1,238 @@
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from src.history_cache import SPAN_SECONDS
+from src.stock_history import COLUMN_DTYPES, NANOSECONDS_PER_SECOND, columns_to_dataframe
+from src.utilities import CacheSettings
+
+# Number of times a read is retried when the series it started reading is replaced by a concurrent append.
+READ_ATTEMPTS = 3
+
+
+def span_start(begins_at, time_span, now):
+    """
+    Returns the position of the first bar that falls within time_span.
+
+    :param begins_at: Sorted array of nanoseconds since the epoch
+    :param time_span: Span as a string
+    :param now: Seconds since the epoch
+    :return: Position as an int
+    """
+
+    if len(begins_at) == 0:
+        return 0
+
+    # The "day" span covers the most recent session rather than the last 24 hours.
+    if time_span == "day":
+        day_length = SPAN_SECONDS["day"] * NANOSECONDS_PER_SECOND
+        start = begins_at[-1] - begins_at[-1] % day_length
+
+    else:
+        start = (now - SPAN_SECONDS[time_span]) * NANOSECONDS_PER_SECOND
+
+    return int(np.searchsorted(begins_at, start, side="left"))
+
+
+class BarStore:
+    def __init__(self, store_dir=None):
+        """
+        Columnar on-disk store of bars with one file per ticker, interval, and column.
+
+        Each column is a flat binary file of COLUMN_DTYPES values that is memory-mapped on read, so a multi-year
+        history is only paged in as it is used. A JSON metadata file per series records the generation of the column
+        files and how many bars they hold. Column files are never modified once written: every append writes a new
+        generation and swaps the metadata last, so readers always see a complete series.
+
+        :param store_dir: Directory holding the store; defaults to TRADEBOT_CACHE_DIR
+        """
+
+        cache_settings = CacheSettings()
+        self.store_dir = os.path.join(store_dir or cache_settings.cache_dir, "bars")
+
+    def _series_dir(self, ticker, interval):
+        """Returns the directory holding the column files for (ticker, interval)."""
+
+        return os.path.join(self.store_dir, interval, ticker.upper())
+
+    def _column_path(self, ticker, interval, column, generation):
+        """Returns the path of the file holding column in the given generation of the series for (ticker, interval)."""
+
+        return os.path.join(self._series_dir(ticker, interval), f"{column}.{generation}.bin")
+
+    def read_metadata(self, ticker, interval):
+        """
+        Returns the metadata of the series stored for (ticker, interval).
+
+        :param ticker: A company's ticker symbol as a string
+        :param interval: Interval of the data points
+        :return: Dict with "length", "time_span", "expires_at", "columns", and "generation"; or None if nothing is
+        stored or the column files do not hold "length" bars
+        """
+
+        # A concurrent append may remove the column files between reading the metadata and checking them.
+        for _ in range(READ_ATTEMPTS):
+            try:
+                with open(os.path.join(self._series_dir(ticker, interval), "metadata.json")) as metadata_file:
+                    metadata = json.load(metadata_file)
+
+            except (OSError, ValueError):
+                return None
+
+            # A series stored with other columns is treated as missing, so the next sync rewrites it from the start.
+            if metadata.get("columns") != list(COLUMN_DTYPES) or "generation" not in metadata:
+                return None
+
+            if self._holds_length(ticker, interval, metadata):
+                return metadata
+
+        print(f"ERROR: The column files of {ticker.upper()} {interval} bars do not hold {metadata['length']} bars")
+
+        return None
+
+    def _holds_length(self, ticker, interval, metadata):
+        """Returns True if every column file of the generation in metadata holds exactly metadata["length"] values."""
+
+        for column, dtype in COLUMN_DTYPES.items():
+            try:
+                column_size = os.path.getsize(self._column_path(ticker, interval, column, metadata["generation"]))
+
+            except OSError:
+                return False
+
+            if column_size != metadata["length"] * dtype.itemsize:
+                return False
+
+        return True
+
+    def _write_metadata(self, ticker, interval, metadata):
+        """Atomically writes the metadata of the series stored for (ticker, interval)."""
+
+        series_dir = self._series_dir(ticker, interval)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=series_dir, suffix=".tmp")
+
+        try:
+            with os.fdopen(file_descriptor, "w") as temporary_file:
+                json.dump(metadata, temporary_file)
+
+            os.replace(temporary_path, os.path.join(series_dir, "metadata.json"))
+
+        except OSError:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+    def read(self, ticker, interval):
+        """
+        Returns the stored columns for (ticker, interval) as read-only memory-mapped arrays.
+
+        :param ticker: A company's ticker symbol as a string
+        :param interval: Interval of the data points
+        :return: Dict mapping each name in COLUMN_DTYPES to a numpy array
+        """
+
+        for _ in range(READ_ATTEMPTS):
+            metadata = self.read_metadata(ticker, interval)
+
+            if metadata is None or metadata["length"] == 0:
+                break
+
+            try:
+                return {
+                    column: np.memmap(
+                        self._column_path(ticker, interval, column, metadata["generation"]),
+                        dtype=dtype,
+                        mode="r",
+                        shape=(metadata["length"],),
+                    )
+                    for column, dtype in COLUMN_DTYPES.items()
+                }
+
+            # A concurrent append removed the generation between reading the metadata and mapping the columns.
+            except FileNotFoundError:
+                continue
+
+        return {column: np.empty(0, dtype=dtype) for column, dtype in COLUMN_DTYPES.items()}
+
+    def read_frame(self, ticker, interval, time_span=None, now=None):
+        """
+        Returns the stored bars for (ticker, interval) as a DataFrame backed by the memory-mapped columns.
+
+        :param ticker: A company's ticker symbol as a string
+        :param interval: Interval of the data points
+        :param time_span: If given, only the bars within this span are returned
+        :param now: Seconds since the epoch used to resolve time_span
+        :return: DataFrame with a UTC DatetimeIndex named begins_at
+        """
+
+        columns = self.read(ticker, interval)
+
+        if time_span is not None:
+            start = span_start(columns["begins_at"], time_span, now)
+            columns = {column: values[start:] for column, values in columns.items()}
+
+        return columns_to_dataframe(columns)
+
+    def append(self, ticker, interval, columns, time_span, expires_at):
+        """
+        Merges new bars into the series stored for (ticker, interval).
+
+        Stored bars that begin at or after the first new bar are replaced, so a bar that was still forming when it was
+        stored is replaced by its final values. The merged columns are written to a new generation of files, which the
+        metadata is only switched to once they are complete. Files of older generations are removed afterwards;
+        memory maps of them stay valid where the platform allows removing mapped files.
+
+        :param ticker: A company's ticker symbol as a string
+        :param interval: Interval of the data points
+        :param columns: Dict mapping each name in COLUMN_DTYPES to an array sorted by begins_at
+        :param time_span: Widest span the series has been synced over
+        :param expires_at: Seconds since the epoch at which the series may have newer bars
+        """
+
+        if len(columns["begins_at"]) == 0:
+            return
+
+        series_dir = self._series_dir(ticker, interval)
+        os.makedirs(series_dir, exist_ok=True)
+
+        metadata = self.read_metadata(ticker, interval)
+        stored_columns = self.read(ticker, interval)
+        cutoff = int(np.searchsorted(stored_columns["begins_at"], columns["begins_at"][0], side="left"))
+        generation = metadata["generation"] + 1 if metadata else 0
+
+        for column, dtype in COLUMN_DTYPES.items():
+            file_descriptor, temporary_path = tempfile.mkstemp(dir=series_dir, suffix=".tmp")
+
+            try:
+                with os.fdopen(file_descriptor, "wb") as temporary_file:
+                    np.ascontiguousarray(stored_columns[column][:cutoff], dtype=dtype).tofile(temporary_file)
+                    np.ascontiguousarray(columns[column], dtype=dtype).tofile(temporary_file)
+
+                os.replace(temporary_path, self._column_path(ticker, interval, column, generation))
+
+            except OSError:
+                if os.path.exists(temporary_path):
+                    os.remove(temporary_path)
+                raise
+
+        del stored_columns
+
+        new_metadata = {
+            "length": cutoff + len(columns["begins_at"]),
+            "time_span": time_span,
+            "expires_at": expires_at,
+            "columns": list(COLUMN_DTYPES),
+            "generation": generation,
+        }
+        self._write_metadata(ticker, interval, new_metadata)
+
+        for file_name in os.listdir(series_dir):
+            if file_name.endswith(".bin") and not file_name.endswith(f".{generation}.bin"):
+                try:
+                    os.remove(os.path.join(series_dir, file_name))
+
+                # Mapped files cannot be removed on every platform; they are left for a later append.
+                except OSError:
+                    pass
@@ -1,10 +1,28 @@
+import functools
+import time
 from enum import Enum
 
 import pandas as pd
-import pyotp
 import robin_stocks.robinhood as robinhood
 
-from src.utilities import RobinhoodCredentials
+from src.account_snapshot import AccountSnapshot
+from src.bar_store import BarStore, span_start
+from src.data_quality import flag_bars
+from src.history_cache import INTERVAL_SECONDS, SPANS, HistoryCache, entry_expiry, smallest_covering_span
+from src.instrument_index import InstrumentIndex
+from src.login_session import session_manager
+from src.market_data import MarketDataFetcher
+from src.quote_cache import quote_cache
+from src.rate_limiter import rate_limiter
+from src.resampling import RESAMPLE_SOURCES, resample_columns
+from src.stock_history import (
+    NANOSECONDS_PER_SECOND,
+    BarBatch,
+    columns_from_stock_history,
+    columns_to_dataframe,
+    parse_stock_history,
+)
+from src.utilities import CacheSettings
 
 
 class OrderType(Enum):
@@ -13,40 +31,207 @@ class OrderType(Enum):
     HOLD_RECOMMENDATION = -1
 
 
+def requires_login(method):
+    """Decorates a TradeBot method that sends requests to Robinhood so that the bot logs in before it runs."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self.ensure_logged_in()
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
 class TradeBot:
+    # Interval and span of the bars the bot's indicators are computed from, which warm_up() fetches ahead of the open.
+    # None if the indicators only depend on the current session.
+    indicator_interval = "day"
+    indicator_time_span = "year"
+
     def __init__(self):
-        """Logs user into their Robinhood account."""
+        """
+        Sets up the bot without sending any request. The user is logged into their Robinhood account by the first
+        call that needs it, so bots that only compute on local data never log in.
+        """
 
-        robinhood_credentials = RobinhoodCredentials()
-        totp = None
+        self.logged_in = False
+        self.market_data = MarketDataFetcher()
+        self.history_cache = HistoryCache()
+        self.bar_store = BarStore()
+        self.quote_cache = quote_cache
+        self.instrument_index = InstrumentIndex()
+        self.account_snapshot_max_age_seconds = CacheSettings().account_snapshot_max_age_seconds
+        self.indicator_state = {}
 
-        if robinhood_credentials.mfa_code == "":
-            print(
-                "WARNING: MFA code is not supplied. Multi-factor authentication will not be attempted. If your "
-                "Robinhood account uses MFA to log in, this will fail and may lock you out of your accounts for "
-                "some period of time."
-            )
+    def robinhood_login(self):
+        """
+        Attaches the bot to the session shared by the bots of this process, logging user into their Robinhood account
+        if no other bot has. The stored login session is reused when there is one.
+        """
 
-        else:
-            totp = pyotp.TOTP(robinhood_credentials.mfa_code).now()
+        session_manager.acquire()
+        self.logged_in = True
+
+    def ensure_logged_in(self):
+        """Logs user into their Robinhood account unless the bot is logged in already."""
 
-        robinhood.login(robinhood_credentials.user, robinhood_credentials.password, mfa_code=totp)
+        if not self.logged_in:
+            self.robinhood_login()
 
     def robinhood_logout(self):
-        """Logs user out of their Robinhood account."""
+        """
+        Detaches the bot from the shared session. User is logged out of their Robinhood account once no other bot of
+        this process is attached.
+        """
+
+        if self.logged_in:
+            session_manager.release()
+            self.logged_in = False
 
-        robinhood.logout()
+    def get_rate_limit_counters(self):
+        """
+        Returns the counters of the rate limiter that every request to the Robinhood API goes through.
+
+        :return: Dict as returned by RateLimiter.counters
+        """
 
+        return rate_limiter.counters
+
+    @property
+    def account_snapshot(self):
+        """Returns the account snapshot shared by the bots of the login session, or None if none is loaded."""
+
+        return session_manager.account_snapshot
+
+    @account_snapshot.setter
+    def account_snapshot(self, account_snapshot):
+        session_manager.account_snapshot = account_snapshot
+
+    @requires_login
     def get_current_positions(self):
         """Returns a dictionary of currently held positions."""
 
         return robinhood.account.build_holdings()
 
+    @requires_login
+    def get_open_positions(self):
+        """
+        Returns the quantity, price, and equity of every open position.
+
+        Unlike get_current_positions(), which also gathers fundamentals and instrument data for each position, this
+        only loads the open positions and their quotes in a single bulk request. A position without a quote is valued
+        at its last known price, or else at its average buy price, so that a missing quote never blocks trading.
+
+        :return: Dict mapping each held ticker to a dict with its "quantity", "price", and "equity" as floats
+        """
+
+        quantities = {}
+        average_buy_prices = {}
+
+        for item in robinhood.account.get_open_stock_positions() or []:
+            # It is possible for the positions to be [None].
+            if not item or float(item["quantity"]) == 0:
+                continue
+
+            ticker = self.get_symbol_from_instrument_url(item["instrument"], item.get("symbol"))
+            quantities[ticker] = float(item["quantity"])
+            average_buy_prices[ticker] = float(item.get("average_buy_price") or 0)
+
+        prices = self.get_current_market_prices(list(quantities))
+        open_positions = {}
+
+        for ticker, quantity in quantities.items():
+            price = prices.get(ticker)
+
+            if price is None:
+                price = self.get_last_known_price(ticker)
+
+                if price is not None:
+                    print(f"ERROR: No market price is available for {ticker}; using its last known price ${price}")
+
+                elif average_buy_prices[ticker]:
+                    price = average_buy_prices[ticker]
+                    print(f"ERROR: No market price is available for {ticker}; using its average buy price ${price}")
+
+                else:
+                    # The position is still listed, so it is not sold as if it were never held.
+                    price = 0.0
+                    print(f"ERROR: No market price is available for {ticker}; valuing its position at $0")
+
+            open_positions[ticker] = {"quantity": quantity, "price": price, "equity": quantity * price}
+
+        return open_positions
+
+    def get_last_known_price(self, ticker):
+        """
+        Returns the last price of ticker this process has seen, from the quote cache or from the position in the
+        account snapshot.
+
+        :param ticker: A company's ticker symbol as a string
+        :return: Price in USD, or None if ticker was never quoted
+        """
+
+        price = self.quote_cache.get_last(ticker)
+
+        if price is None and self.account_snapshot is not None:
+            position = self.account_snapshot.positions.get(ticker.upper())
+
+            if position and position["quantity"]:
+                price = position["equity"] / position["quantity"]
+
+        return price
+
+    def get_symbol_from_instrument_url(self, instrument_url, symbol=None):
+        """
+        Returns the ticker symbol of an instrument, requesting it only if the instrument index does not hold it yet.
+
+        :param instrument_url: The instrument url of a stock
+        :param symbol: The symbol, if it is already known
+        :return: Ticker symbol as a string
+        """
+
+        if symbol:
+            return symbol
+
+        instrument = self.instrument_index.get_by_url(instrument_url)
+
+        if instrument is None:
+            self.ensure_logged_in()
+            instrument = self.instrument_index.refresh_url(instrument_url)
+
+        return instrument["symbol"] if instrument else ""
+
+    @requires_login
     def get_current_cash_position(self):
         """Returns the current cash position as a float."""
 
         return float(robinhood.profiles.load_account_profile(info="buying_power"))
 
+    def refresh_account_snapshot(self):
+        """
+        Loads a new snapshot of the user's buying power and positions, shared by every bot of the login session.
+        trade() calls this once it is about to place an order, so recommendations that hold send no account request.
+
+        :return: AccountSnapshot
+        """
+
+        self.account_snapshot = AccountSnapshot(self.get_current_cash_position(), self.get_open_positions())
+
+        return self.account_snapshot
+
+    def get_account_snapshot(self):
+        """
+        Returns the current account snapshot, loading a new one if there is none or it is older than
+        account_snapshot_max_age_seconds.
+
+        :return: AccountSnapshot
+        """
+
+        if self.account_snapshot is None or self.account_snapshot.age > self.account_snapshot_max_age_seconds:
+            return self.refresh_account_snapshot()
+
+        return self.account_snapshot
+
     def has_sufficient_funds_available(self, amount_in_dollars):
         """
         Returns a boolean if user's account has enough buying power to execute a buy order.
@@ -59,13 +244,15 @@ class TradeBot:
             return False
 
         # Retrieve the available funds.
-        available_funds = self.get_current_cash_position()
+        available_funds = self.get_account_snapshot().buying_power
 
         return available_funds >= amount_in_dollars
 
     def get_current_market_price(self, ticker):
         """
-        Returns the current market price of ticker
+        Returns the current market price of ticker. Prices within the quote cache's staleness budget are reused, and
+        concurrent requests for the same ticker share a single API call. The quote cache is shared by every bot of
+        this process.
 
         :param ticker: A company's symbol as a string
         :return: Current market price in USD
@@ -74,11 +261,62 @@ class TradeBot:
         if not ticker:
             return 0.00
 
+        return self.quote_cache.get(ticker, self._fetch_current_market_price)
+
+    @requires_login
+    def _fetch_current_market_price(self, ticker):
+        """Sends request to the Robinhood API to retrieve the current market price of ticker."""
+
         return float(robinhood.stocks.get_latest_price(ticker, includeExtendedHours=False)[0])
 
+    def get_current_market_prices(self, tickers, include_extended_hours=False):
+        """
+        Returns the current market prices of many tickers using as few quote requests as possible.
+
+        Tickers are requested through the market data fetcher, which sends one request per chunk of symbols
+        concurrently. Regular hours prices are shared with the quote cache used by get_current_market_price().
+
+        :param tickers: A list of company ticker symbols as strings
+        :param include_extended_hours: If True, the extended hours price is used when there is one. Default is False
+        :return: Dict mapping each ticker to its current market price in USD; tickers without a quote are left out
+        """
+
+        tickers = list(dict.fromkeys(ticker for ticker in tickers if ticker))
+        prices_by_symbol = {}
+        missing_tickers = tickers
+
+        if not include_extended_hours:
+            for ticker in tickers:
+                price = self.quote_cache.get_fresh(ticker)
+
+                if price is not None:
+                    prices_by_symbol[ticker.upper()] = price
+
+            missing_tickers = [ticker for ticker in tickers if ticker.upper() not in prices_by_symbol]
+
+        quotes = []
+
+        if missing_tickers:
+            self.ensure_logged_in()
+            quotes = self.market_data.get_quotes(missing_tickers)
+
+        for quote in quotes:
+            price = quote["last_trade_price"]
+
+            if include_extended_hours and quote["last_extended_hours_trade_price"] is not None:
+                price = quote["last_extended_hours_trade_price"]
+
+            prices_by_symbol[quote["symbol"]] = float(price)
+
+            if not include_extended_hours:
+                self.quote_cache.put(quote["symbol"], float(price))
+
+        return {ticker: prices_by_symbol[ticker.upper()] for ticker in tickers if ticker.upper() in prices_by_symbol}
+
     def get_company_name_from_ticker(self, ticker):
         """
-        Returns the company name represented by ticker.
+        Returns the company name represented by ticker. The name is looked up in the instrument index, which is
+        only refreshed from the Robinhood API for tickers it does not hold yet.
 
         :param ticker: A company's ticker symbol as a string
         :return: Company name as a string
@@ -87,29 +325,200 @@ class TradeBot:
         if not ticker:
             return ""
 
-        return robinhood.stocks.get_name_by_symbol(ticker)
+        if ticker not in self.instrument_index:
+            self.ensure_logged_in()
+            self.instrument_index.refresh([ticker])
+
+        return self.instrument_index.get_name(ticker) or ""
 
-    def get_stock_history_dataframe(self, ticker, interval="day", time_span="year"):
+    def get_stock_history_dataframe(self, ticker, interval="day", time_span="year", incremental=False):
         """
-        Sends request to the Robinhood API to retrieve historical stock information.
+        Retrieves historical stock information, sending a request to the Robinhood API only when neither the history
+        cache nor the finer bars stored locally can answer it. The history cache entry of (ticker, interval,
+        time_span) is preferred over bars resampled from finer ones.
 
         :param ticker: A company's ticker symbol as a string
         :param interval: time intervals for data points; Values are "5minute", "10minute", "hour", "day",
          or "week". Default is "day"
         :param time_span: time span for the data points: Values are "day", "week", "month", "3month", "year", or
         "5year". Default is "year"
-        :return: DataFrame of stock historical information
+        :param incremental: If True, only the bars newer than the last stored bar are requested; see
+        sync_stock_history(). Default is False
+        :return: DataFrame of stock historical information with numeric price and volume columns and a quality column
+        as added by flag_bars(), indexed by begins_at
+        """
+        if not ticker or interval not in INTERVAL_SECONDS or time_span not in SPANS:
+            return pd.DataFrame()
+
+        stock_history = self.history_cache.get(ticker, interval, time_span)
+
+        if stock_history is not None:
+            return flag_bars(parse_stock_history(stock_history), interval)
+
+        stock_history_df = self.get_resampled_stock_history(ticker, interval, time_span)
+
+        if stock_history_df is None and incremental:
+            stock_history_df = self.sync_stock_history(ticker, interval, time_span)
+
+        if stock_history_df is None:
+            self.ensure_logged_in()
+            stock_history = robinhood.stocks.get_stock_historicals(ticker, interval=interval, span=time_span)
+            self.history_cache.put(ticker, interval, time_span, stock_history)
+            stock_history_df = parse_stock_history(stock_history)
+
+        return flag_bars(stock_history_df, interval)
+
+    def get_local_stock_history_columns(self, ticker, interval, time_span, now):
+        """
+        Returns the bars of (ticker, interval) held locally over time_span, without sending a request.
+
+        A series from the bar store is used if it is unexpired and reaches back over time_span. Otherwise a history
+        cache entry over time_span or a wider span is used.
+
+        :param ticker: A company's ticker symbol as a string
+        :param interval: time intervals for data points
+        :param time_span: time span for the data points
+        :param now: Seconds since the epoch
+        :return: Dict mapping each name in COLUMN_DTYPES to an array, or None if no bars are held locally
         """
+
+        metadata = self.bar_store.read_metadata(ticker, interval)
+
         if (
-            not ticker
-            or interval not in {"5minute", "10minute", "hour", "day", "week"}
-            or time_span not in {"day", "week", "month", "3month", "year", "5year"}
+            metadata is not None
+            and now < metadata["expires_at"]
+            and SPANS.index(metadata["time_span"]) >= SPANS.index(time_span)
         ):
-            return pd.DataFrame()
+            return self.bar_store.read(ticker, interval)
+
+        for cached_span in SPANS[SPANS.index(time_span) :]:
+            stock_history = self.history_cache.get(ticker, interval, cached_span)
+
+            if stock_history:
+                return columns_from_stock_history(stock_history)
+
+        return None
+
+    def get_resampled_stock_history(self, ticker, interval="day", time_span="year"):
+        """
+        Builds the bars of interval from finer bars that are already held locally, without sending a request. The
+        first bar takes in the finer bars of its bucket from before time_span, and the last bar is kept while it is
+        still forming, as resample_columns() does.
+
+        :param ticker: A company's ticker symbol as a string
+        :param interval: time intervals for data points. Default is "day"
+        :param time_span: time span for the data points. Default is "year"
+        :return: DataFrame as returned by get_stock_history_dataframe(), or None if no finer bars are held locally
+        """
+
+        now = int(time.time())
+
+        for finer_interval in RESAMPLE_SOURCES.get(interval, []):
+            columns = self.get_local_stock_history_columns(ticker, finer_interval, time_span, now)
+
+            if columns is not None:
+                start = span_start(columns["begins_at"], time_span, now)
+
+                return columns_to_dataframe(resample_columns(columns, interval, start))
 
-        stock_history = robinhood.stocks.get_stock_historicals(ticker, interval=interval, span=time_span)
+        return None
 
-        return pd.DataFrame(stock_history)
+    def get_stock_history_frames(self, tickers, interval="day", time_span="year"):
+        """
+        Retrieves historical stock information for many tickers at once.
+
+        Tickers with a valid history cache entry are served locally. The rest are requested through the market data
+        fetcher, which sends one request per chunk of symbols concurrently.
+
+        :param tickers: A list of company ticker symbols as strings
+        :param interval: time intervals for data points. Default is "day"
+        :param time_span: time span for the data points. Default is "year"
+        :return: Dict mapping each ticker to a DataFrame as returned by get_stock_history_dataframe()
+        """
+
+        tickers = list(dict.fromkeys(ticker for ticker in tickers if ticker))
+
+        if interval not in INTERVAL_SECONDS or time_span not in SPANS:
+            return {ticker: pd.DataFrame() for ticker in tickers}
+
+        stock_history_frames = {}
+        missing_tickers = []
+
+        for ticker in tickers:
+            stock_history = self.history_cache.get(ticker, interval, time_span)
+
+            if stock_history is None:
+                missing_tickers.append(ticker)
+            else:
+                stock_history_frames[ticker] = flag_bars(parse_stock_history(stock_history), interval)
+
+        if missing_tickers:
+            # The bars of every symbol come back one after another in a single list, which is packed into one BarBatch
+            # that the frames of the missing tickers view.
+            self.ensure_logged_in()
+            stock_history = self.market_data.get_historicals(missing_tickers, interval, time_span)
+            bar_batch = BarBatch.from_stock_history(stock_history)
+            bars_by_symbol = {}
+
+            for bar in stock_history:
+                bars_by_symbol.setdefault(bar["symbol"], []).append(bar)
+
+            for ticker in missing_tickers:
+                self.history_cache.put(ticker, interval, time_span, bars_by_symbol.get(ticker.upper(), []))
+                ticker_bars = bar_batch.select(ticker)
+                stock_history_frames[ticker] = flag_bars(
+                    columns_to_dataframe(ticker_bars.columns()) if len(ticker_bars) else pd.DataFrame(), interval
+                )
+
+        return {ticker: stock_history_frames[ticker] for ticker in tickers}
+
+    def sync_stock_history(self, ticker, interval="day", time_span="year"):
+        """
+        Brings the series stored in the bar store for (ticker, interval) up to date and returns the bars within
+        time_span.
+
+        Only the narrowest span accepted for interval that covers the bars newer than the last stored begins_at is
+        requested, or the whole synced span if none does. New bars are appended to the stored series, replacing the
+        stored bars they overlap, such as the bar that was still forming when it was last synced.
+
+        :param ticker: A company's ticker symbol as a string
+        :param interval: time intervals for data points. Default is "day"
+        :param time_span: time span for the data points. Default is "year"
+        :return: DataFrame indexed by begins_at and backed by the memory-mapped bar store
+        """
+
+        metadata = self.bar_store.read_metadata(ticker, interval)
+        now = int(time.time())
+
+        # Request the full time_span unless the stored series already reaches back that far.
+        if metadata is None or SPANS.index(metadata["time_span"]) < SPANS.index(time_span):
+            synced_span = time_span
+            request_span = time_span
+
+        else:
+            synced_span = metadata["time_span"]
+
+            # Nothing can have changed before the stored series expires.
+            if now < metadata["expires_at"]:
+                return self.bar_store.read_frame(ticker, interval, time_span, now)
+
+            last_begins_at = int(self.bar_store.read(ticker, interval)["begins_at"][-1]) // NANOSECONDS_PER_SECOND
+            request_span = smallest_covering_span(interval, last_begins_at, now) or synced_span
+
+        self.ensure_logged_in()
+        new_history = robinhood.stocks.get_stock_historicals(ticker, interval=interval, span=request_span)
+
+        # Fall back to the stored bars when the request fails.
+        if new_history and new_history[0] is not None:
+            self.bar_store.append(
+                ticker,
+                interval,
+                columns_from_stock_history(new_history),
+                synced_span,
+                entry_expiry(interval, new_history, now),
+            )
+
+        return self.bar_store.read_frame(ticker, interval, time_span, now)
 
     def get_equity_in_position(self, ticker):
         """
@@ -119,13 +528,7 @@ class TradeBot:
         :return: float
         """
 
-        portfolio = self.get_current_positions()
-
-        if ticker in portfolio:
-            position = portfolio[ticker]
-            return float(position["equity"])
-
-        return 0
+        return self.get_account_snapshot().get_equity_in_position(ticker)
 
     def has_sufficient_equity(self, ticker, amount_in_dollars):
         """
@@ -143,6 +546,7 @@ class TradeBot:
 
         return equity_in_position >= amount_in_dollars
 
+    @requires_login
     def place_buy_order(self, ticker, amount_in_dollars):
         """
         Places a buy order for ticker with a specified amount.
@@ -177,8 +581,13 @@ class TradeBot:
             )
             print(f"Successfully bought ${amount_in_dollars} of {ticker}.")
 
+            # Keep the account snapshot accurate without loading it again.
+            if "id" in purchase_data and self.account_snapshot is not None:
+                self.account_snapshot.record_purchase(ticker, amount_in_dollars)
+
         return purchase_data
 
+    @requires_login
     def place_sell_order(self, ticker, amount_in_dollars):
         """
         Places a sell order for ticker with a specified amount.
@@ -213,6 +622,10 @@ class TradeBot:
             )
             print(f"Successfully sold ${amount_in_dollars} of {ticker}.")
 
+            # Keep the account snapshot accurate without loading it again.
+            if "id" in sale_data and self.account_snapshot is not None:
+                self.account_snapshot.record_sale(ticker, amount_in_dollars)
+
         return sale_data
 
     def buy_with_available_funds(self, ticker):
@@ -227,7 +640,7 @@ class TradeBot:
         if not ticker:
             return {}
 
-        available_funds = self.get_current_cash_position()
+        available_funds = self.get_account_snapshot().buying_power
 
         return self.place_buy_order(ticker, available_funds)
 
@@ -257,9 +670,11 @@ class TradeBot:
         """
 
         compiled_sale_information = []
-        portfolio = self.get_current_positions()
 
-        for ticker in portfolio.keys():
+        # Load the positions once; each sale updates the snapshot locally.
+        portfolio = self.refresh_account_snapshot().positions
+
+        for ticker in list(portfolio.keys()):
             sale_information = self.sell_entire_position(ticker)
             compiled_sale_information.append(sale_information)
 
@@ -275,9 +690,96 @@ class TradeBot:
 
         return OrderType.HOLD_RECOMMENDATION
 
+    def make_order_recommendations(self, tickers):
+        """
+        Makes an order recommendation for each of the given tickers.
+
+        Bots whose recommendations depend on market data should override this to fetch the data for all tickers in
+        bulk, e.g. with get_stock_history_frames() and get_current_market_prices().
+
+        :param tickers: A list of company ticker symbols as strings
+        :return: Dict mapping each ticker to its order recommendation
+        """
+
+        return {ticker: self.make_order_recommendation(ticker) for ticker in dict.fromkeys(tickers) if ticker}
+
+    def compute_indicator_state(self, stock_history_df):
+        """
+        Computes the indicators the bot's order recommendations are made from that only depend on stock history.
+
+        :param stock_history_df: DataFrame as returned by get_stock_history_dataframe() for indicator_interval and
+        indicator_time_span
+        :return: Indicator state, or None if the bot has none
+        """
+
+        return None
+
+    def get_indicator_state(self, ticker):
+        """
+        Returns the indicator state precomputed for ticker by warm_up().
+
+        :param ticker: A company's ticker symbol as a string
+        :return: Indicator state as returned by compute_indicator_state(), or None if there is none or the history it
+        was computed from has expired
+        """
+
+        expires_at, indicator_state = self.indicator_state.get(ticker.upper(), (0, None))
+
+        if time.time() >= expires_at:
+            return None
+
+        return indicator_state
+
+    def warm_up(self, tickers):
+        """
+        Fills the caches read by the first trading cycle, so that at the open trade() only needs a fresh quote for
+        each ticker. Call this ahead of the open, e.g. with a WarmupScheduler.
+
+        The bot logs in, indexes the instruments of tickers, fetches and parses their history in bulk, and precomputes
+        their indicator state, which stays valid as long as the history it was computed from.
+
+        :param tickers: A list of company ticker symbols as strings
+        :return: Dict with the number of "instruments" indexed, "histories" fetched, and "indicator_states" computed
+        """
+
+        tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers if ticker))
+        warmup_counts = {"instruments": 0, "histories": 0, "indicator_states": 0}
+
+        if not tickers:
+            return warmup_counts
+
+        self.ensure_logged_in()
+
+        missing_instruments = [ticker for ticker in tickers if ticker not in self.instrument_index]
+
+        if missing_instruments:
+            warmup_counts["instruments"] = self.instrument_index.refresh(missing_instruments)
+
+        if self.indicator_interval is None:
+            return warmup_counts
+
+        stock_history_frames = self.get_stock_history_frames(tickers, self.indicator_interval, self.indicator_time_span)
+
+        for ticker, stock_history_df in stock_history_frames.items():
+            expires_at = self.history_cache.get_expiry(ticker, self.indicator_interval, self.indicator_time_span)
+
+            # Failed requests are not cached and leave nothing to precompute.
+            if expires_at is None or stock_history_df.empty:
+                continue
+
+            warmup_counts["histories"] += 1
+            indicator_state = self.compute_indicator_state(stock_history_df)
+
+            if indicator_state is not None:
+                self.indicator_state[ticker] = (expires_at, indicator_state)
+                warmup_counts["indicator_states"] += 1
+
+        return warmup_counts
+
     def trade(self, ticker, amount_in_dollars):
         """
-        Places buy/sell orders for fractional shares of stock.
+        Places buy/sell orders for fractional shares of stock. A new account snapshot is loaded to check the order
+        against once the recommendation is to buy or sell.
 
         :param ticker: A company's ticker symbol as a string
         :param amount_in_dollars: The amount in USD to be used for a transaction
@@ -289,6 +791,9 @@ class TradeBot:
 
         action = self.make_order_recommendation(ticker)
 
+        if action in (OrderType.BUY_RECOMMENDATION, OrderType.SELL_RECOMMENDATION):
+            self.refresh_account_snapshot()
+
         if action == OrderType.BUY_RECOMMENDATION:
             purchase_details = self.place_buy_order(ticker, amount_in_dollars)
             transaction_data.update(purchase_details)
@@ -9,7 +9,7 @@ Use this sample file as a "skeleton" for making a new custom TradeBot class.
 
 class TradeBotSample(TradeBot):
     def __init__(self):
-        """Logs user into their Robinhood account."""
+        """Sets up the bot. Logging into Robinhood is deferred until the first call that needs it."""
 
         super().__init__()
 
@@ -25,7 +25,8 @@ class TradeBotSample(TradeBot):
             print("ERROR: ticker cannot be a null value")
             return None
 
-        # TODO - Your own algorithm here!
+        # TODO - Your own algorithm here! src/indicators.py offers vectorized and streaming forms of the common
+        # indicators (SMA, EMA, RSI, MACD, Bollinger Bands, ATR, VWAP) to build it from.
         random_choice = random.choice(
             [OrderType.BUY_RECOMMENDATION, OrderType.SELL_RECOMMENDATION, OrderType.HOLD_RECOMMENDATION]
         )
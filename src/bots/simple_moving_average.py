@@ -1,20 +1,82 @@
+import time
+
+import numpy as np
 import pandas as pd
 
 from src.bots.base_trade_bot import OrderType, TradeBot
+from src.data_quality import FLAG_INTERPOLATED, mask_flagged
+from src.history_cache import INTERVAL_SECONDS
+from src.indicators import (
+    StreamingSimpleMovingAverage,
+    begins_at_seconds,
+    latest_simple_moving_averages,
+    simple_moving_averages,
+)
+from src.stock_history import numeric_column
 
 
 class TradeBotSimpleMovingAverage(TradeBot):
-    def __init__(self):
-        """Logs user into their Robinhood account."""
+    def __init__(self, streaming=False):
+        """
+        Sets up the bot. Logging into Robinhood is deferred until the first call that needs it.
+
+        :param streaming: If True, the moving averages of each ticker are seeded from its history once and then kept
+        up to date bar by bar instead of being recomputed. The bot takes in the new bars itself whenever the history
+        it last took in has expired; bars passed to update_moving_averages() are taken in right away. Default is False
+        """
 
         super().__init__()
 
-    def calculate_simple_moving_average(self, stock_history_df, number_of_days):
+        self.streaming = streaming
+        self.streaming_moving_averages = {}
+        self.streaming_expiries = {}
+
+    def calculate_simple_moving_averages(
+        self, stock_history_df, windows, masked_flags=FLAG_INTERPOLATED, partial=False
+    ):
+        """
+        Calculates the full simple moving average series of the close prices for every window in a single pass, so
+        crossovers, charts, and backtests can share one computation.
+
+        :param stock_history_df: DataFrame containing the stock's history, preferably as returned by
+        get_stock_history_dataframe(); it is not modified
+        :param windows: A list of numbers of days, each used to calculate an n-day moving average
+        :param masked_flags: Quality flags of the bars left out of the averages; 0 keeps every bar. Default is
+        FLAG_INTERPOLATED
+        :param partial: If True, the bars before the first full window hold the average of the bars so far instead of
+        NaN. Default is False
+        :return: DataFrame with an n-day moving average column for each window, indexed like the bars that are not
+        masked; empty if the averages cannot be calculated
+        """
+
+        if stock_history_df is None:
+            print("ERROR: stock_history_df cannot be null")
+            return pd.DataFrame()
+
+        stock_history_df = mask_flagged(stock_history_df, masked_flags)
+
+        if stock_history_df.empty:
+            print("ERROR: stock_history_df cannot be empty")
+            return pd.DataFrame()
+
+        if not windows or any(not window or window <= 0 for window in windows):
+            print("ERROR: windows must be positive numbers.")
+            return pd.DataFrame()
+
+        close_prices = numeric_column(stock_history_df, "close_price")
+        moving_averages = simple_moving_averages(close_prices.to_numpy(), windows, partial)
+
+        return pd.DataFrame(moving_averages, index=close_prices.index)
+
+    def calculate_simple_moving_average(self, stock_history_df, number_of_days, masked_flags=FLAG_INTERPOLATED):
         """
         Calculates the simple moving average based on the number of days.
 
-        :param stock_history_df: DataFrame containing the stock's history
+        :param stock_history_df: DataFrame containing the stock's history, preferably as returned by
+        get_stock_history_dataframe(); it is not modified
         :param number_of_days: Number of days used to calculate the n-day moving average
+        :param masked_flags: Quality flags of the bars left out of the average; 0 keeps every bar. Default is
+        FLAG_INTERPOLATED
         :return: The n-day simple moving average
         """
 
@@ -22,6 +84,8 @@ class TradeBotSimpleMovingAverage(TradeBot):
             print("ERROR: stock_history_df cannot be null")
             return 0
 
+        stock_history_df = mask_flagged(stock_history_df, masked_flags)
+
         if stock_history_df.empty:
             print("ERROR: stock_history_df cannot be empty")
             return 0
@@ -30,16 +94,123 @@ class TradeBotSimpleMovingAverage(TradeBot):
             print("ERROR: number_of_days must be a positive number.")
             return 0
 
-        # Typecast the column to numerics.
-        stock_history_df["close_price"] = pd.to_numeric(stock_history_df["close_price"], errors="coerce")
+        # The last partial average is the average of the last n days, or of every day if there are fewer.
+        moving_averages = self.calculate_simple_moving_averages(
+            stock_history_df, [number_of_days], masked_flags=0, partial=True
+        )
+
+        return round(moving_averages[number_of_days].iloc[-1], 2)
+
+    def compute_indicator_state(self, stock_history_df):
+        """
+        Computes the 50-day and 200-day moving averages the order recommendations are made from in a single pass.
+
+        :param stock_history_df: DataFrame containing the stock's daily history over the last year
+        :return: Dict with the "moving_average_50_day" and the "moving_average_200_day"
+        """
+
+        moving_averages = self.calculate_simple_moving_averages(stock_history_df, [50, 200], partial=True)
+
+        if moving_averages.empty:
+            return {"moving_average_50_day": 0, "moving_average_200_day": 0}
+
+        latest_moving_averages = moving_averages.iloc[-1]
+
+        return {
+            "moving_average_50_day": round(latest_moving_averages[50], 2),
+            "moving_average_200_day": round(latest_moving_averages[200], 2),
+        }
 
-        # Consider only the last n days.
-        n_day_stock_history = stock_history_df.tail(number_of_days)
+    def get_streaming_moving_averages(self, ticker):
+        """
+        Returns the streaming 50-day and 200-day moving averages of ticker. They are seeded from its stock history the
+        first time, and take in the bars newer than the ones they hold whenever the history they last took in has
+        expired.
+
+        :param ticker: A company's ticker symbol as a string
+        :return: Dict mapping 50 and 200 to a StreamingSimpleMovingAverage
+        """
 
-        # Calculate the moving average.
-        n_day_moving_average = round(n_day_stock_history["close_price"].mean(), 2)
+        symbol = ticker.upper()
 
-        return n_day_moving_average
+        if time.time() >= self.streaming_expiries.get(symbol, 0):
+            self.refresh_moving_averages(ticker, self.get_stock_history_dataframe(ticker))
+
+        return self.streaming_moving_averages[symbol]
+
+    def refresh_moving_averages(self, ticker, stock_history_df):
+        """
+        Seeds the streaming moving averages of ticker from its stock history, or adds the bars of the stock history
+        they do not hold yet, and remembers until when they are current. The newest bar held is replaced by its
+        counterpart in the stock history, since it may have been forming.
+
+        :param ticker: A company's ticker symbol as a string
+        :param stock_history_df: DataFrame containing the stock's daily history over the last year
+        :return: Dict mapping 50 and 200 to a StreamingSimpleMovingAverage
+        """
+
+        symbol = ticker.upper()
+        moving_averages = self.streaming_moving_averages.get(symbol)
+        last_begins_at = None if moving_averages is None else moving_averages[200].last_begins_at
+
+        if last_begins_at is None:
+            self.streaming_moving_averages[symbol] = {
+                window: StreamingSimpleMovingAverage.from_stock_history(stock_history_df, window)
+                for window in (50, 200)
+            }
+
+        elif stock_history_df is not None and not stock_history_df.empty:
+            is_new = begins_at_seconds(stock_history_df) >= last_begins_at
+
+            for _, bar in stock_history_df[is_new].iterrows():
+                self._update_moving_averages(moving_averages, bar)
+
+        # Fall back to the length of a bar if the history did not come from the history cache.
+        expires_at = self.history_cache.get_expiry(ticker, "day", "year")
+        self.streaming_expiries[symbol] = expires_at or time.time() + INTERVAL_SECONDS["5minute"]
+
+        return self.streaming_moving_averages[symbol]
+
+    def update_moving_averages(self, ticker, bar):
+        """
+        Adds a new daily bar to the streaming moving averages of ticker in O(1). A bar that is passed again, such as
+        the daily bar that is still forming, replaces its earlier version. Interpolated bars are left out, like
+        calculate_simple_moving_average() does by default.
+
+        :param ticker: A company's ticker symbol as a string
+        :param bar: Dict returned by get_stock_historicals() or row of a DataFrame returned by
+        get_stock_history_dataframe()
+        :return: Dict with the "moving_average_50_day" and the "moving_average_200_day" including bar
+        """
+
+        self._update_moving_averages(self.get_streaming_moving_averages(ticker), bar)
+
+        return self.get_streaming_indicator_state(ticker)
+
+    def _update_moving_averages(self, moving_averages, bar):
+        """Adds bar to each streaming moving average unless it is interpolated."""
+
+        if not bar.get("interpolated") and not int(bar.get("quality", 0)) & FLAG_INTERPOLATED:
+            for moving_average in moving_averages.values():
+                moving_average.update(bar)
+
+    def get_streaming_indicator_state(self, ticker):
+        """
+        Returns the 50-day and 200-day moving averages of ticker held by its streaming moving averages.
+
+        :param ticker: A company's ticker symbol as a string
+        :return: Dict with the "moving_average_50_day" and the "moving_average_200_day"
+        """
+
+        moving_averages = self.get_streaming_moving_averages(ticker)
+
+        if not len(moving_averages[200]):
+            return {"moving_average_50_day": 0, "moving_average_200_day": 0}
+
+        return {
+            "moving_average_50_day": round(moving_averages[50].value, 2),
+            "moving_average_200_day": round(moving_averages[200].value, 2),
+        }
 
     def make_order_recommendation(self, ticker):
         """
@@ -53,15 +224,113 @@ class TradeBotSimpleMovingAverage(TradeBot):
             print("ERROR: ticker cannot be a null value")
             return None
 
-        stock_history_df = self.get_stock_history_dataframe(ticker)
+        # Use the streaming moving averages or the ones precomputed by warm_up(), computing them from the stock history
+        # otherwise.
+        if self.streaming:
+            indicator_state = self.get_streaming_indicator_state(ticker)
+
+        else:
+            indicator_state = self.get_indicator_state(ticker)
+
+        if indicator_state is None:
+            indicator_state = self.compute_indicator_state(self.get_stock_history_dataframe(ticker))
+
+        return self.compare_moving_averages(
+            indicator_state["moving_average_50_day"], indicator_state["moving_average_200_day"]
+        )
+
+    def make_order_recommendations(self, tickers):
+        """
+        Makes a recommendation for a market order for each ticker by comparing its 50-day moving average to its
+        200-day moving average. The history of the tickers without precomputed moving averages is fetched in bulk, and
+        their recommendations are made in one vectorized pass with calculate_order_recommendation_codes().
+
+        :param tickers: A list of company ticker symbols as strings
+        :return: Dict mapping each ticker to its OrderType recommendation
+        """
+
+        if self.streaming:
+            return {ticker: self.make_order_recommendation(ticker) for ticker in dict.fromkeys(tickers) if ticker}
+
+        tickers = list(dict.fromkeys(ticker for ticker in tickers if ticker))
+        order_recommendations = {}
+        missing_tickers = []
+
+        for ticker in tickers:
+            indicator_state = self.get_indicator_state(ticker)
 
-        # Calculate the 200-day moving average.
-        moving_average_200_day = self.calculate_simple_moving_average(stock_history_df, 200)
+            if indicator_state is None:
+                missing_tickers.append(ticker)
+            else:
+                order_recommendations[ticker] = self.compare_moving_averages(
+                    indicator_state["moving_average_50_day"], indicator_state["moving_average_200_day"]
+                )
 
-        # Calculate the 50-day moving average.
-        moving_average_50_day = self.calculate_simple_moving_average(stock_history_df, 50)
+        if missing_tickers:
+            stock_history_frames = self.get_stock_history_frames(missing_tickers)
+            close_prices = self.build_close_price_matrix(list(stock_history_frames.values()))
+            order_recommendation_codes = self.calculate_order_recommendation_codes(close_prices)
+
+            for ticker, order_recommendation_code in zip(stock_history_frames, order_recommendation_codes):
+                order_recommendations[ticker] = OrderType(order_recommendation_code)
+
+        return {ticker: order_recommendations[ticker] for ticker in tickers}
+
+    def build_close_price_matrix(self, stock_history_frames, number_of_days=200, masked_flags=FLAG_INTERPOLATED):
+        """
+        Packs the last close prices of many stock histories into a matrix for calculate_order_recommendation_codes().
+
+        :param stock_history_frames: A list of DataFrames as returned by get_stock_history_dataframe()
+        :param number_of_days: Number of close prices kept per stock history. Default is 200
+        :param masked_flags: Quality flags of the bars left out; 0 keeps every bar. Default is FLAG_INTERPOLATED
+        :return: Array of float64 with one row per stock history holding its last number_of_days close prices, oldest
+        first. Rows of shorter histories are padded with NaN at the start
+        """
+
+        close_prices = np.full((len(stock_history_frames), number_of_days), np.nan)
+
+        for row, stock_history_df in enumerate(stock_history_frames):
+            if stock_history_df is None or stock_history_df.empty:
+                continue
+
+            row_close_prices = numeric_column(mask_flagged(stock_history_df, masked_flags), "close_price").to_numpy()
+            row_close_prices = row_close_prices[-number_of_days:]
+            close_prices[row, number_of_days - len(row_close_prices) :] = row_close_prices
+
+        return close_prices
+
+    def calculate_order_recommendation_codes(self, close_prices):
+        """
+        Makes the order recommendation of every ticker of a universe in one vectorized pass by comparing its 50-day
+        moving average to its 200-day moving average, both rounded to the cent like make_order_recommendation() does.
+
+        :param close_prices: Array of daily close prices with one row per ticker and one column per day, oldest first.
+        Rows of short histories are padded with NaN at the start, e.g. by build_close_price_matrix()
+        :return: Array of int8 holding the OrderType value of the recommendation of each row. Rows without a close
+        price are held
+        """
+
+        moving_averages = latest_simple_moving_averages(close_prices, [50, 200])
+        moving_averages_50_day = np.round(moving_averages[50], 2)
+        moving_averages_200_day = np.round(moving_averages[200], 2)
+
+        order_recommendation_codes = np.select(
+            [moving_averages_50_day > moving_averages_200_day, moving_averages_50_day < moving_averages_200_day],
+            [OrderType.BUY_RECOMMENDATION.value, OrderType.SELL_RECOMMENDATION.value],
+            OrderType.HOLD_RECOMMENDATION.value,
+        )
+
+        return order_recommendation_codes.astype(np.int8)
+
+    def compare_moving_averages(self, moving_average_50_day, moving_average_200_day):
+        """
+        Makes a recommendation for a market order from the 50-day and the 200-day moving averages.
+
+        :param moving_average_50_day: The 50-day simple moving average
+        :param moving_average_200_day: The 200-day simple moving average
+        :return: OrderType recommendation
+        """
 
-        # Determine the order recommendation.
         if moving_average_50_day > moving_average_200_day:
             return OrderType.BUY_RECOMMENDATION
 
@@ -10,8 +10,11 @@ MINIMUM_CONSENSUS_SELL_SCORE = -0.05
 
 
 class TradeBotTwitterSentiments(TradeBot):
+    # Recommendations are made from tweets, so there is no history worth fetching ahead of the open.
+    indicator_interval = None
+
     def __init__(self):
-        """Logs user into their Robinhood account."""
+        """Connects to the Twitter API. Logging into Robinhood is deferred until the first call that needs it."""
 
         super().__init__()
 
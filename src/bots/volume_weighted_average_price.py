@@ -1,19 +1,32 @@
-import pandas as pd
+import time
 
 from src.bots.base_trade_bot import OrderType, TradeBot
+from src.data_quality import FLAG_EXTENDED_HOURS, FLAG_INTERPOLATED, mask_flagged
+from src.history_cache import INTERVAL_SECONDS
+from src.indicators import StreamingVWAP
+from src.stock_history import numeric_column
 
 
 class TradeBotVWAP(TradeBot):
+    # The VWAP restarts with every session, so there is no history worth fetching ahead of the open.
+    indicator_interval = None
+
     def __init__(self):
-        """Logs user into their Robinhood account."""
+        """Sets up the bot. Logging into Robinhood is deferred until the first call that needs it."""
 
         super().__init__()
 
-    def calculate_VWAP(self, stock_history_df):
+        self.vwap_accumulators = {}
+        self.vwap_expiries = {}
+
+    def calculate_VWAP(self, stock_history_df, masked_flags=FLAG_INTERPOLATED | FLAG_EXTENDED_HOURS):
         """
         Calculates the Volume-Weighted Average Price (VWAP).
 
-        :param stock_history_df: DataFrame containing the stock's history
+        :param stock_history_df: DataFrame containing the stock's history, preferably as returned by
+        get_stock_history_dataframe(); it is not modified
+        :param masked_flags: Quality flags of the bars left out of the VWAP; 0 keeps every bar. Default is
+        FLAG_INTERPOLATED | FLAG_EXTENDED_HOURS
         :return: The calculated Volume-Weighted Average Price
         """
 
@@ -21,23 +34,89 @@ class TradeBotVWAP(TradeBot):
             print("ERROR: stock_history_df cannot be null")
             return 0
 
+        stock_history_df = mask_flagged(stock_history_df, masked_flags)
+
         if stock_history_df.empty:
             print("ERROR: stock_history_df cannot be empty")
             return 0
 
-        # Typecast the columns we need.
-        stock_history_df["close_price"] = pd.to_numeric(stock_history_df["close_price"], errors="coerce")
-        stock_history_df["volume"] = pd.to_numeric(stock_history_df["volume"], errors="coerce")
+        close_prices = numeric_column(stock_history_df, "close_price")
+        volumes = numeric_column(stock_history_df, "volume")
 
         # Sum the volumes, and take the dot product of the volume and close_price columns.
-        sum_of_volumes = stock_history_df["volume"].sum()
-        dot_product = stock_history_df["volume"].dot(stock_history_df["close_price"])
+        sum_of_volumes = volumes.sum()
+        dot_product = volumes.dot(close_prices)
 
         # Calculate the VWAP.
         vwap = round(dot_product / sum_of_volumes, 2)
 
         return vwap
 
+    def get_VWAP_accumulator(self, ticker):
+        """
+        Returns the VWAP accumulator of ticker, brought up to date with the last day in 5 minute intervals whenever the
+        history it last took in has expired. Only the bars newer than the ones it holds are added, and the bar that
+        was still forming replaces its earlier version.
+
+        :param ticker: A company's ticker symbol as a string
+        :return: StreamingVWAP
+        """
+
+        if time.time() >= self.vwap_expiries.get(ticker.upper(), 0):
+            stock_history_df = self.get_stock_history_dataframe(ticker, interval="5minute", time_span="day")
+            self.refresh_VWAP_accumulator(ticker, stock_history_df)
+
+        return self.vwap_accumulators[ticker.upper()]
+
+    def refresh_VWAP_accumulator(self, ticker, stock_history_df):
+        """
+        Adds the bars of the last day of ticker that its VWAP accumulator does not hold yet, and remembers until when
+        they are current.
+
+        :param ticker: A company's ticker symbol as a string
+        :param stock_history_df: DataFrame containing the stock's history in 5 minute intervals over the last day
+        :return: StreamingVWAP
+        """
+
+        vwap_accumulator = self.vwap_accumulators.setdefault(ticker.upper(), StreamingVWAP())
+        vwap_accumulator.extend(stock_history_df)
+
+        # Fall back to the length of a bar if the history did not come from the history cache.
+        expires_at = self.history_cache.get_expiry(ticker, "5minute", "day")
+        self.vwap_expiries[ticker.upper()] = expires_at or time.time() + INTERVAL_SECONDS["5minute"]
+
+        return vwap_accumulator
+
+    def update_VWAP(self, ticker, bar):
+        """
+        Adds a new 5 minute bar of ticker to its VWAP accumulator in O(1). A bar that is passed again replaces its
+        earlier version. Streaming each bar as it arrives keeps the VWAP current between refreshes of the day's history.
+
+        :param ticker: A company's ticker symbol as a string
+        :param bar: Dict returned by get_stock_historicals()
+        :return: The VWAP including bar
+        """
+
+        return self.get_VWAP_accumulator(ticker).update(bar)
+
+    def get_VWAP(self, ticker, vwap_accumulator=None):
+        """
+        Returns the Volume-Weighted Average Price (VWAP) of ticker held by its VWAP accumulator.
+
+        :param ticker: A company's ticker symbol as a string
+        :param vwap_accumulator: StreamingVWAP of ticker; defaults to get_VWAP_accumulator(ticker)
+        :return: The VWAP rounded to the cent, or 0 if no volume has been traded
+        """
+
+        if vwap_accumulator is None:
+            vwap_accumulator = self.get_VWAP_accumulator(ticker)
+
+        if not vwap_accumulator.volume:
+            print(f"ERROR: No VWAP is available for {ticker}")
+            return 0
+
+        return round(vwap_accumulator.value, 2)
+
     def make_order_recommendation(self, ticker):
         """
         Makes a recommendation for a market order by comparing the Volume-Weighted Average Price (VWAP) to the current
@@ -51,15 +130,59 @@ class TradeBotVWAP(TradeBot):
             print("ERROR: ticker cannot be a null value")
             return None
 
-        # Calculate the VWAP from the last day in 5 minute intervals.
-        stock_history_df = self.get_stock_history_dataframe(ticker, interval="5minute", time_span="day")
-
-        vwap = self.calculate_VWAP(stock_history_df)
+        # The VWAP accumulator only takes in the bars it does not hold yet.
+        vwap = self.get_VWAP(ticker)
 
         # Get the current market price of the stock.
         current_price = self.get_current_market_price(ticker)
 
-        # Determine the order recommendation.
+        return self.compare_price_to_VWAP(current_price, vwap)
+
+    def make_order_recommendations(self, tickers):
+        """
+        Makes a recommendation for a market order for each ticker by comparing its Volume-Weighted Average Price (VWAP)
+        to its current market price. The accumulators whose history has expired take in the new bars of all their tickers
+        fetched in bulk, and the quotes of all tickers are fetched in bulk.
+
+        :param tickers: A list of company ticker symbols as strings
+        :return: Dict mapping each ticker to its OrderType recommendation
+        """
+
+        tickers = list(dict.fromkeys(ticker for ticker in tickers if ticker))
+
+        # Bring the expired VWAP accumulators up to date with the last day in 5 minute intervals.
+        now = time.time()
+        expired_tickers = [ticker for ticker in tickers if now >= self.vwap_expiries.get(ticker.upper(), 0)]
+        stock_history_frames = self.get_stock_history_frames(expired_tickers, interval="5minute", time_span="day")
+
+        for ticker, stock_history_df in stock_history_frames.items():
+            self.refresh_VWAP_accumulator(ticker, stock_history_df)
+
+        # Get the current market prices of all stocks in as few requests as possible.
+        current_prices = self.get_current_market_prices(tickers)
+
+        order_recommendations = {}
+
+        for ticker in tickers:
+            if ticker not in current_prices:
+                print(f"ERROR: No market price is available for {ticker}")
+                order_recommendations[ticker] = OrderType.HOLD_RECOMMENDATION
+                continue
+
+            vwap = self.get_VWAP(ticker, self.vwap_accumulators.get(ticker.upper()) or StreamingVWAP())
+            order_recommendations[ticker] = self.compare_price_to_VWAP(current_prices[ticker], vwap)
+
+        return order_recommendations
+
+    def compare_price_to_VWAP(self, current_price, vwap):
+        """
+        Makes a recommendation for a market order from the current market price and the VWAP.
+
+        :param current_price: The current market price in USD
+        :param vwap: The Volume-Weighted Average Price
+        :return: OrderType recommendation
+        """
+
         if current_price < vwap:
             return OrderType.BUY_RECOMMENDATION
 
@@ -0,0 +1,84 @@
+import numpy as np
+
+from src.history_cache import INTERVAL_SECONDS
+from src.resampling import DAY_NANOSECONDS
+from src.stock_history import NANOSECONDS_PER_SECOND, SESSION_CODES
+
+# Bits of the quality column added by flag_bars(). A bar can carry several flags at once.
+FLAG_GAP = 1  # One or more bars are missing between this bar and the previous bar of its session
+FLAG_INTERPOLATED = 2  # The bar was filled in by Robinhood rather than traded
+FLAG_ZERO_VOLUME = 4  # No shares were traded during the bar
+FLAG_EXTENDED_HOURS = 8  # The bar falls outside of the regular session
+
+ALL_FLAGS = FLAG_GAP | FLAG_INTERPOLATED | FLAG_ZERO_VOLUME | FLAG_EXTENDED_HOURS
+
+
+def quality_flags(begins_at, volume, session, interpolated, interval):
+    """
+    Computes the quality flags of a series of bars.
+
+    Gaps are only flagged for intraday intervals, since days without a session are not missing bars.
+
+    :param begins_at: Sorted array of nanoseconds since the epoch
+    :param volume: Array of volumes
+    :param session: Array of codes into SESSIONS
+    :param interpolated: Array of booleans
+    :param interval: Interval of the bars
+    :return: Array of uint8 combining the FLAG_* bits
+    """
+
+    flags = np.zeros(len(begins_at), dtype=np.uint8)
+    flags[np.asarray(interpolated, dtype=bool)] |= FLAG_INTERPOLATED
+    flags[np.asarray(volume) == 0] |= FLAG_ZERO_VOLUME
+    flags[np.asarray(session) != SESSION_CODES["reg"]] |= FLAG_EXTENDED_HOURS
+
+    if INTERVAL_SECONDS[interval] < INTERVAL_SECONDS["day"] and len(begins_at) > 1:
+        begins_at = np.asarray(begins_at)
+        steps = np.diff(begins_at)
+        same_day = np.diff(begins_at // DAY_NANOSECONDS) == 0
+        flags[1:][same_day & (steps > INTERVAL_SECONDS[interval] * NANOSECONDS_PER_SECOND)] |= FLAG_GAP
+
+    return flags
+
+
+def flag_bars(stock_history_df, interval):
+    """
+    Adds a "quality" column holding the quality flags of each bar to a typed DataFrame.
+
+    :param stock_history_df: DataFrame as returned by parse_stock_history(); it gains the quality column
+    :param interval: Interval of the bars
+    :return: stock_history_df
+    """
+
+    if stock_history_df.empty:
+        return stock_history_df
+
+    stock_history_df["quality"] = quality_flags(
+        stock_history_df.index.asi8,
+        stock_history_df["volume"].to_numpy(),
+        stock_history_df["session"].cat.codes.to_numpy(),
+        stock_history_df["interpolated"].to_numpy(),
+        interval,
+    )
+
+    return stock_history_df
+
+
+def mask_flagged(stock_history_df, masked_flags=ALL_FLAGS):
+    """
+    Returns the bars of stock_history_df that carry none of masked_flags.
+
+    :param stock_history_df: DataFrame containing the stock's history
+    :param masked_flags: FLAG_* bits of the bars to leave out; 0 keeps every bar. Default is ALL_FLAGS
+    :return: DataFrame; stock_history_df itself if it has no quality column or no bar is masked
+    """
+
+    if not masked_flags or "quality" not in stock_history_df:
+        return stock_history_df
+
+    is_masked = (stock_history_df["quality"].to_numpy() & masked_flags) != 0
+
+    if not is_masked.any():
+        return stock_history_df
+
+    return stock_history_df[~is_masked]
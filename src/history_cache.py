@@ -0,0 +1,287 @@
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from src.utilities import CacheSettings
+from src.warmup import next_market_open
+
+# Length in seconds of a single bar for each interval accepted by get_stock_historicals().
+INTERVAL_SECONDS = {
+    "5minute": 5 * 60,
+    "10minute": 10 * 60,
+    "hour": 60 * 60,
+    "day": 24 * 60 * 60,
+    "week": 7 * 24 * 60 * 60,
+}
+
+# Spans accepted by get_stock_historicals(), from narrowest to widest, and the period of time each one covers.
+SPANS = ["day", "week", "month", "3month", "year", "5year"]
+SPAN_SECONDS = {
+    "day": 24 * 60 * 60,
+    "week": 7 * 24 * 60 * 60,
+    "month": 31 * 24 * 60 * 60,
+    "3month": 92 * 24 * 60 * 60,
+    "year": 366 * 24 * 60 * 60,
+    "5year": 5 * 366 * 24 * 60 * 60,
+}
+
+# Spans get_stock_historicals() accepts for each interval, from narrowest to widest.
+INTERVAL_SPANS = {
+    "5minute": ["day", "week"],
+    "10minute": ["day", "week"],
+    "hour": ["week", "month", "3month"],
+    "day": ["month", "3month", "year", "5year"],
+    "week": ["year", "5year"],
+}
+
+# A bar that is still forming is never kept longer than this, regardless of its interval.
+FORMING_BAR_TTL = INTERVAL_SECONDS["5minute"]
+
+
+def parse_begins_at(begins_at):
+    """
+    Converts a Robinhood begins_at timestamp into seconds since the epoch.
+
+    :param begins_at: Timestamp string such as "2021-11-09T14:30:00Z"
+    :return: Seconds since the epoch as an int
+    """
+
+    return int(datetime.fromisoformat(begins_at.replace("Z", "+00:00")).timestamp())
+
+
+def entry_expiry(interval, stock_history, fetched_at):
+    """
+    Returns the time at which a cached stock history stops being valid.
+
+    Completed bars never change, so a history whose newest bar has closed stays valid until the next bar closes, or
+    until the next session opens if that is sooner, since the next bar may show up as soon as it does. Once a session
+    has opened since the newest bar closed, its bar is missing from the history, which is then only valid for
+    FORMING_BAR_TTL. A history whose newest bar is still forming is only valid until that bar closes, and never longer
+    than FORMING_BAR_TTL.
+
+    :param interval: Interval of the bars in stock_history
+    :param stock_history: List of bars as returned by get_stock_historicals()
+    :param fetched_at: Seconds since the epoch at which stock_history was retrieved
+    :return: Seconds since the epoch
+    """
+
+    bar_length = INTERVAL_SECONDS[interval]
+    last_begins_at = parse_begins_at(stock_history[-1]["begins_at"])
+    last_bar_closes_at = last_begins_at + bar_length
+
+    if fetched_at < last_bar_closes_at:
+        return min(last_bar_closes_at, fetched_at + FORMING_BAR_TTL)
+
+    bars_since_last = (fetched_at - last_begins_at) // bar_length
+    next_bar_closes_at = last_begins_at + (bars_since_last + 1) * bar_length
+    opens_at = next_market_open(last_bar_closes_at)
+
+    if fetched_at < opens_at:
+        return min(next_bar_closes_at, opens_at)
+
+    return min(next_bar_closes_at, fetched_at + FORMING_BAR_TTL)
+
+
+def smallest_covering_span(interval, since, now):
+    """
+    Returns the narrowest span accepted for interval whose response contains every bar that began at or after since.
+
+    The "day" span only returns the most recent session, so it is only used when since falls on the current date. Wider
+    spans are given an extra day of slack to absorb the difference between calendar time and trading sessions.
+
+    :param interval: Interval of the data points
+    :param since: Seconds since the epoch of the last stored bar
+    :param now: Seconds since the epoch
+    :return: Span as a string, or None if no span accepted for interval reaches back to since
+    """
+
+    same_date = datetime.fromtimestamp(since, timezone.utc).date() == datetime.fromtimestamp(now, timezone.utc).date()
+    gap = now - since + SPAN_SECONDS["day"]
+
+    for time_span in INTERVAL_SPANS.get(interval, []):
+        if same_date if time_span == "day" else SPAN_SECONDS[time_span] >= gap:
+            return time_span
+
+    return None
+
+
+class HistoryCache:
+    def __init__(self, cache_dir=None, max_bytes=None):
+        """
+        On-disk cache of get_stock_historicals() responses keyed by (ticker, interval, span).
+
+        Entries are stored as one JSON file each and are shared by every process using the same cache_dir, which is
+        created by the first put(). The least recently used entries are evicted once the cache grows beyond max_bytes.
+        The size of the cache is kept as a running total of the entries written, and the directory is only scanned
+        when that total crosses max_bytes, so entries written by other processes are counted at the next scan.
+
+        :param cache_dir: Directory holding the cache; defaults to TRADEBOT_CACHE_DIR
+        :param max_bytes: Size limit of the cache; defaults to TRADEBOT_HISTORY_CACHE_MAX_BYTES
+        """
+
+        cache_settings = CacheSettings()
+        self.cache_dir = os.path.join(cache_dir or cache_settings.cache_dir, "history")
+        self.max_bytes = cache_settings.history_cache_max_bytes if max_bytes is None else max_bytes
+
+        # Size of the cache in bytes as of the last scan plus the entries written since; None until the first scan.
+        self._total_bytes = None
+
+    def _entry_path(self, ticker, interval, time_span):
+        """Returns the path of the file holding the entry for (ticker, interval, time_span)."""
+
+        return os.path.join(self.cache_dir, f"{ticker.upper()}_{interval}_{time_span}.json")
+
+    def _read_entry(self, entry_path):
+        """Returns the entry stored at entry_path and marks it as recently used, or None if it cannot be read."""
+
+        try:
+            with open(entry_path) as entry_file:
+                entry = json.load(entry_file)
+
+            os.utime(entry_path)
+
+        except (OSError, ValueError):
+            return None
+
+        return entry
+
+    def _write_entry(self, entry_path, entry):
+        """Atomically writes entry to entry_path and evicts old entries if the cache grew beyond max_bytes."""
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # Write to a temporary file first so that readers in other processes never see a partial entry.
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+
+        try:
+            with os.fdopen(file_descriptor, "w") as temporary_file:
+                json.dump(entry, temporary_file)
+
+            entry_size = os.path.getsize(temporary_path)
+            replaced_size = os.path.getsize(entry_path) if os.path.exists(entry_path) else 0
+            os.replace(temporary_path, entry_path)
+
+        except OSError:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+        if self._total_bytes is None:
+            self.evict()
+            return
+
+        self._total_bytes += entry_size - replaced_size
+
+        if self._total_bytes > self.max_bytes:
+            self.evict()
+
+    def get(self, ticker, interval, time_span):
+        """
+        Returns the cached stock history for (ticker, interval, time_span).
+
+        :param ticker: A company's ticker symbol as a string
+        :param interval: Interval of the data points
+        :param time_span: Time span of the data points
+        :return: List of bars, or None if there is no valid entry
+        """
+
+        entry = self._read_entry(self._entry_path(ticker, interval, time_span))
+
+        if entry is None or time.time() >= entry["expires_at"]:
+            return None
+
+        return entry["stock_history"]
+
+    def get_expiry(self, ticker, interval, time_span):
+        """
+        Returns the time at which the cached stock history for (ticker, interval, time_span) stops being valid.
+
+        :param ticker: A company's ticker symbol as a string
+        :param interval: Interval of the data points
+        :param time_span: Time span of the data points
+        :return: Seconds since the epoch, or None if there is no valid entry
+        """
+
+        entry = self._read_entry(self._entry_path(ticker, interval, time_span))
+
+        if entry is None or time.time() >= entry["expires_at"]:
+            return None
+
+        return entry["expires_at"]
+
+    def put(self, ticker, interval, time_span, stock_history):
+        """
+        Stores the stock history for (ticker, interval, time_span), evicting old entries if needed.
+
+        :param ticker: A company's ticker symbol as a string
+        :param interval: Interval of the data points
+        :param time_span: Time span of the data points
+        :param stock_history: List of bars as returned by get_stock_historicals()
+        """
+
+        # Failed requests come back as None or [None] and are never cached.
+        if not stock_history or stock_history[0] is None:
+            return
+
+        fetched_at = int(time.time())
+        entry = {
+            "ticker": ticker.upper(),
+            "interval": interval,
+            "time_span": time_span,
+            "fetched_at": fetched_at,
+            "expires_at": entry_expiry(interval, stock_history, fetched_at),
+            "stock_history": stock_history,
+        }
+
+        self._write_entry(self._entry_path(ticker, interval, time_span), entry)
+
+    def evict(self):
+        """Scans the cache and removes the least recently used entries until it fits within max_bytes."""
+
+        entries = []
+
+        if not os.path.isdir(self.cache_dir):
+            self._total_bytes = 0
+            return
+
+        with os.scandir(self.cache_dir) as directory:
+            for dir_entry in directory:
+                if not dir_entry.name.endswith(".json"):
+                    continue
+
+                try:
+                    stat = dir_entry.stat()
+                except FileNotFoundError:
+                    continue
+
+                entries.append((stat.st_mtime, stat.st_size, dir_entry.path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+            total_bytes -= size
+
+        self._total_bytes = total_bytes
+
+    def clear(self):
+        """Removes every entry from the cache."""
+
+        self._total_bytes = 0
+
+        if not os.path.isdir(self.cache_dir):
+            return
+
+        with os.scandir(self.cache_dir) as directory:
+            for dir_entry in directory:
+                if dir_entry.name.endswith(".json"):
+                    os.remove(dir_entry.path)
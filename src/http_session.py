@@ -0,0 +1,125 @@
+import threading
+import time
+import weakref
+
+import robin_stocks.robinhood as robinhood
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.rate_limiter import PRIORITY_DATA, PRIORITY_ORDERS, parse_retry_after, rate_limiter
+from src.utilities import HttpSessionSettings
+
+# Only requests that are safe to send twice are retried after a response, so an order is never placed twice.
+RETRY_METHODS = frozenset(["GET", "HEAD", "OPTIONS"])
+
+# Responses that are retried by urllib3. Throttled responses (429) are handled by RateLimitedAdapter.
+RETRY_STATUSES = frozenset([500, 502, 503, 504])
+
+# Requests that are throttled are sent again up to this many times once the rate limiter lets them through.
+MAX_THROTTLED_RETRIES = 2
+
+_configure_lock = threading.Lock()
+_pooled_sessions = weakref.WeakSet()
+
+
+def request_priority(request):
+    """Returns the rate limiter lane of a request: orders jump ahead of everything else."""
+
+    return PRIORITY_ORDERS if "/orders/" in request.url else PRIORITY_DATA
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    def __init__(self, limiter, **kwargs):
+        """
+        Transport adapter that takes a token from limiter before sending each request and reports every response
+        back to it.
+
+        Throttled requests that are safe to send twice are sent again once the limiter lets them through, so callers
+        like robin_stocks, which swallow failed responses, still get their data.
+
+        :param limiter: RateLimiter
+        :param kwargs: Keyword arguments of HTTPAdapter
+        """
+
+        self.limiter = limiter
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        priority = request_priority(request)
+
+        for attempt in range(MAX_THROTTLED_RETRIES + 1):
+            self.limiter.acquire(priority)
+            sent_at = time.monotonic()
+            response = super().send(request, **kwargs)
+            self.limiter.record_response(
+                response.status_code, parse_retry_after(response.headers.get("Retry-After")), sent_at
+            )
+
+            if response.status_code != 429 or request.method not in RETRY_METHODS or attempt == MAX_THROTTLED_RETRIES:
+                return response
+
+            response.close()
+
+
+def pooled_adapter(settings=None, limiter=None):
+    """
+    Builds a transport adapter that keeps connections alive in a pool shared by every thread using the session.
+
+    The pool holds up to settings.pool_size connections per host. When they are all in use, a thread waits for one to
+    be returned instead of opening a connection that would be thrown away afterwards. Every request goes through the
+    rate limiter.
+
+    :param settings: HttpSessionSettings; read from the environment by default
+    :param limiter: RateLimiter; defaults to the rate limiter shared by the process
+    :return: RateLimitedAdapter
+    """
+
+    settings = settings or HttpSessionSettings()
+
+    retry = Retry(
+        total=settings.max_retries,
+        backoff_factor=settings.retry_backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=RETRY_METHODS,
+        raise_on_status=False,
+        # Retry-After is honored by the rate limiter, which pauses every request rather than just this one.
+        respect_retry_after_header=False,
+    )
+
+    return RateLimitedAdapter(
+        limiter or rate_limiter, pool_maxsize=settings.pool_size, max_retries=retry, pool_block=True
+    )
+
+
+def configure_session(session, settings=None, limiter=None):
+    """
+    Mounts a pooled adapter on session for http and https urls. Sessions that are already configured are left as is.
+
+    :param session: requests session
+    :param settings: HttpSessionSettings; read from the environment by default
+    :param limiter: RateLimiter; defaults to the rate limiter shared by the process
+    :return: True if the session was configured by this call; False otherwise
+    """
+
+    with _configure_lock:
+        if session in _pooled_sessions:
+            return False
+
+        adapter = pooled_adapter(settings, limiter)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["Connection"] = "keep-alive"
+        _pooled_sessions.add(session)
+
+    return True
+
+
+def configure_robinhood_session(settings=None):
+    """
+    Configures the session robin_stocks sends every request with, so concurrent requests reuse its connections.
+
+    :param settings: HttpSessionSettings; read from the environment by default
+    :return: True if the session was configured by this call; False otherwise
+    """
+
+    return configure_session(robinhood.helper.SESSION, settings)
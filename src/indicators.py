@@ -0,0 +1,922 @@
+import math
+from datetime import datetime
+from numbers import Real
+
+import numpy as np
+import pandas as pd
+
+from src.data_quality import FLAG_EXTENDED_HOURS, FLAG_INTERPOLATED, mask_flagged
+from src.history_cache import INTERVAL_SECONDS, parse_begins_at
+from src.stock_history import NANOSECONDS_PER_SECOND, numeric_column
+
+
+def bar_close_price(bar):
+    """
+    Returns the close price of a bar.
+
+    :param bar: Close price, or a bar with a "close_price", such as a dict returned by get_stock_historicals() or a row
+    of a stock history DataFrame
+    :return: Close price as a float
+    """
+
+    return float(bar if isinstance(bar, Real) else bar["close_price"])
+
+
+def bar_begins_at(bar):
+    """
+    Returns the time at which a bar begins.
+
+    :param bar: Close price, or a bar such as a dict returned by get_stock_historicals() or a row of a stock history
+    DataFrame
+    :return: Seconds since the epoch as an int, or None if bar carries no begins_at
+    """
+
+    if isinstance(bar, Real):
+        return None
+
+    begins_at = bar.get("begins_at")
+
+    # Rows of typed stock histories carry their begins_at as their name.
+    if begins_at is None and isinstance(bar, pd.Series):
+        begins_at = bar.name
+
+    if isinstance(begins_at, str):
+        return parse_begins_at(begins_at)
+
+    if isinstance(begins_at, datetime):
+        return int(begins_at.timestamp())
+
+    return None
+
+
+def begins_at_seconds(stock_history_df):
+    """
+    Returns the begins_at of every bar of a stock history.
+
+    :param stock_history_df: DataFrame containing the stock's history with a begins_at column or index
+    :return: Array of int64 seconds since the epoch
+    """
+
+    if "begins_at" in stock_history_df:
+        begins_at = pd.to_datetime(stock_history_df["begins_at"], utc=True)
+    else:
+        begins_at = stock_history_df.index
+
+    return np.asarray(begins_at.astype("int64")) // NANOSECONDS_PER_SECOND
+
+
+def simple_moving_averages(values, windows, partial=False):
+    """
+    Computes the full simple moving average series of values for every window in a single pass.
+
+    The running sum of values is taken once, and the sum over each window is the difference of two running sums, so
+    every window costs O(n) regardless of its length. NaN values are left out of the averages they fall in.
+
+    :param values: Array of numbers
+    :param windows: Iterable of positive window lengths
+    :param partial: If True, the first window - 1 positions hold the average of the values so far instead of NaN, so
+    the last position always holds the average of the last window values. Default is False
+    :return: Dict mapping each window to an array of float64 as long as values
+    """
+
+    values = np.asarray(values, dtype=np.float64)
+    is_valid = ~np.isnan(values)
+
+    # Prepending a zero makes running_sums[j] - running_sums[i] the sum of values[i:j].
+    running_sums = np.concatenate(([0.0], np.cumsum(np.where(is_valid, values, 0.0))))
+    running_counts = np.concatenate(([0], np.cumsum(is_valid)))
+
+    moving_averages = {}
+
+    for window in dict.fromkeys(windows):
+        if window <= 0:
+            raise ValueError(f"Moving average windows must be positive, got {window}")
+
+        sums = np.empty(len(values))
+        counts = np.empty(len(values))
+        full = min(window, len(values) + 1) - 1
+
+        sums[full:] = running_sums[window:] - running_sums[: len(values) - full]
+        counts[full:] = running_counts[window:] - running_counts[: len(values) - full]
+        sums[:full] = running_sums[1 : full + 1]
+        counts[:full] = running_counts[1 : full + 1] if partial else 0
+
+        moving_averages[window] = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+    return moving_averages
+
+
+def latest_simple_moving_averages(close_prices, windows):
+    """
+    Computes the latest simple moving average of every row of a matrix of close prices in one vectorized pass.
+
+    Only the last window columns are read, so the cost does not depend on the length of the histories. NaN values,
+    such as the padding of short histories, are left out of the averages, which makes a row shorter than window
+    average every price it holds, like calculate_simple_moving_average() does.
+
+    :param close_prices: Array of close prices with one row per ticker and one column per bar, oldest first
+    :param windows: Iterable of positive window lengths
+    :return: Dict mapping each window to an array holding the average of each row, or NaN for rows without a price
+    """
+
+    close_prices = np.asarray(close_prices, dtype=np.float64)
+    moving_averages = {}
+
+    for window in dict.fromkeys(windows):
+        if window <= 0:
+            raise ValueError(f"Moving average windows must be positive, got {window}")
+
+        recent_close_prices = close_prices[..., -window:]
+        is_valid = ~np.isnan(recent_close_prices)
+        sums = np.where(is_valid, recent_close_prices, 0.0).sum(axis=-1)
+        counts = is_valid.sum(axis=-1)
+
+        moving_averages[window] = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+    return moving_averages
+
+
+class StreamingSimpleMovingAverage:
+    __slots__ = ("window", "last_begins_at", "_close_prices", "_position", "_length", "_sum", "_count")
+
+    def __init__(self, window):
+        """
+        Simple moving average that is kept up to date one bar at a time.
+
+        The last window close prices are held in a ring buffer next to their running sum, so each update costs O(1)
+        whatever the window. Until window bars have been added, the average is taken over the bars added so far, like
+        calculate_simple_moving_average() does. NaN close prices take a slot but are left out of the average. A bar
+        with the begins_at of the newest bar, such as a daily bar that is still forming, replaces it, and older bars
+        are ignored.
+
+        :param window: Number of bars averaged
+        """
+
+        if window <= 0:
+            raise ValueError(f"Moving average windows must be positive, got {window}")
+
+        self.window = window
+        self.reset()
+
+    @classmethod
+    def from_stock_history(cls, stock_history_df, window, masked_flags=FLAG_INTERPOLATED):
+        """
+        Builds a streaming moving average seeded with the last window bars of a stock history.
+
+        :param stock_history_df: DataFrame containing the stock's history, preferably as returned by
+        get_stock_history_dataframe(); it is not modified
+        :param window: Number of bars averaged
+        :param masked_flags: Quality flags of the bars left out of the average; 0 keeps every bar. Default is
+        FLAG_INTERPOLATED
+        :return: StreamingSimpleMovingAverage
+        """
+
+        moving_average = cls(window)
+
+        if stock_history_df is not None and not stock_history_df.empty:
+            stock_history_df = mask_flagged(stock_history_df, masked_flags)
+
+        if stock_history_df is not None and not stock_history_df.empty:
+            close_prices = numeric_column(stock_history_df, "close_price")
+            moving_average.seed(close_prices.to_numpy()[-window:])
+            moving_average.last_begins_at = int(begins_at_seconds(stock_history_df)[-1])
+
+        return moving_average
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def value(self):
+        """Returns the current moving average, or NaN if no close price has been added."""
+
+        return self._sum / self._count if self._count else math.nan
+
+    def reset(self):
+        """Removes every bar held."""
+
+        self.last_begins_at = None
+        self._close_prices = [math.nan] * self.window
+        self._position = 0
+        self._length = 0
+        self._sum = 0.0
+        self._count = 0
+
+    def seed(self, close_prices):
+        """
+        Replaces the bars held with the last window close_prices.
+
+        :param close_prices: Array of close prices, oldest first
+        :return: The moving average of the last window close prices
+        """
+
+        self.reset()
+
+        for close_price in close_prices[-self.window :]:
+            self.update(close_price)
+
+        return self.value
+
+    def update(self, bar):
+        """
+        Adds a new bar, dropping the oldest one once window bars are held. A bar with the begins_at of the newest bar
+        replaces it instead, and older bars are ignored; close prices carry no begins_at and are always added.
+
+        :param bar: Close price, or a bar with a "close_price", such as a dict returned by get_stock_historicals() or
+        a row of a stock history DataFrame
+        :return: The moving average including bar
+        """
+
+        close_price = bar_close_price(bar)
+        begins_at = bar_begins_at(bar)
+
+        if begins_at is not None and self.last_begins_at is not None:
+            if begins_at < self.last_begins_at:
+                return self.value
+
+            if begins_at == self.last_begins_at:
+                return self._replace_newest(close_price)
+
+        if begins_at is not None:
+            self.last_begins_at = begins_at
+
+        oldest_close_price = self._close_prices[self._position]
+
+        if not math.isnan(oldest_close_price):
+            self._sum -= oldest_close_price
+            self._count -= 1
+
+        if not math.isnan(close_price):
+            self._sum += close_price
+            self._count += 1
+
+        self._close_prices[self._position] = close_price
+        self._position = (self._position + 1) % self.window
+        self._length = min(self._length + 1, self.window)
+
+        # Resum the buffer once per lap so rounding errors of the running sum never pile up; O(1) amortized.
+        if self._position == 0:
+            self._sum = math.fsum(price for price in self._close_prices if not math.isnan(price))
+
+        return self.value
+
+    def _replace_newest(self, close_price):
+        """Replaces the close price of the newest bar held and returns the moving average."""
+
+        newest_position = (self._position - 1) % self.window
+        newest_close_price = self._close_prices[newest_position]
+
+        if not math.isnan(newest_close_price):
+            self._sum -= newest_close_price
+            self._count -= 1
+
+        if not math.isnan(close_price):
+            self._sum += close_price
+            self._count += 1
+
+        self._close_prices[newest_position] = close_price
+
+        return self.value
+
+
+class StreamingVWAP:
+    __slots__ = ("session_day", "last_begins_at", "_price_volume", "_volume", "_last_price_volume", "_last_volume")
+
+    def __init__(self):
+        """
+        Volume-Weighted Average Price of the current session that is kept up to date one bar or trade at a time.
+
+        Only the cumulative price times volume and the cumulative volume are held, next to the contribution of the
+        newest bar, so each update costs O(1). A bar that is sent again, such as the bar that is still forming, replaces
+        the newest bar instead of being added twice, and older bars are ignored. The accumulator starts over at the
+        open of every session, i.e. with the first bar or trade of a new UTC date, since regular sessions never span
+        two.
+        """
+
+        self._start_session(None)
+
+    @classmethod
+    def from_stock_history(cls, stock_history_df, masked_flags=FLAG_INTERPOLATED | FLAG_EXTENDED_HOURS):
+        """
+        Builds a VWAP accumulator seeded with the bars of the last session of a stock history.
+
+        :param stock_history_df: DataFrame containing the stock's intraday history, preferably as returned by
+        get_stock_history_dataframe(); it is not modified
+        :param masked_flags: Quality flags of the bars left out of the VWAP; 0 keeps every bar. Default is
+        FLAG_INTERPOLATED | FLAG_EXTENDED_HOURS
+        :return: StreamingVWAP
+        """
+
+        vwap = cls()
+        vwap.extend(stock_history_df, masked_flags)
+
+        return vwap
+
+    @property
+    def value(self):
+        """Returns the VWAP of the current session, or NaN if no volume has been added."""
+
+        return self._price_volume / self._volume if self._volume else math.nan
+
+    @property
+    def volume(self):
+        """Returns the volume traded during the current session."""
+
+        return self._volume
+
+    def _start_session(self, session_day):
+        """Drops everything held and starts the session of session_day."""
+
+        self.session_day = session_day
+        self.last_begins_at = None
+        self._price_volume = 0.0
+        self._volume = 0.0
+        self._last_price_volume = 0.0
+        self._last_volume = 0.0
+
+    def add_trade(self, price, volume, traded_at):
+        """
+        Adds a trade, starting over if it belongs to a new session.
+
+        :param price: Price of the trade in USD
+        :param volume: Number of shares traded
+        :param traded_at: Seconds since the epoch
+        :return: The VWAP including the trade
+        """
+
+        session_day = int(traded_at) // INTERVAL_SECONDS["day"]
+
+        if session_day != self.session_day:
+            self._start_session(session_day)
+
+        self._price_volume += price * volume
+        self._volume += volume
+
+        return self.value
+
+    def update(self, bar):
+        """
+        Adds a bar, weighing its close price by its volume. A bar with the begins_at of the newest bar replaces it.
+        Older bars, interpolated bars, and extended hours bars are left out.
+
+        :param bar: Dict returned by get_stock_historicals()
+        :return: The VWAP including bar
+        """
+
+        if bar.get("interpolated") or bar.get("session", "reg") != "reg":
+            return self.value
+
+        begins_at = parse_begins_at(bar["begins_at"])
+        session_day = begins_at // INTERVAL_SECONDS["day"]
+
+        if self.session_day is not None and session_day < self.session_day:
+            return self.value
+
+        if session_day != self.session_day:
+            self._start_session(session_day)
+
+        elif self.last_begins_at is not None:
+            if begins_at < self.last_begins_at:
+                return self.value
+
+            if begins_at == self.last_begins_at:
+                self._price_volume -= self._last_price_volume
+                self._volume -= self._last_volume
+
+        volume = float(bar["volume"])
+        self._last_price_volume = float(bar["close_price"]) * volume
+        self._last_volume = volume
+        self._price_volume += self._last_price_volume
+        self._volume += volume
+        self.last_begins_at = begins_at
+
+        return self.value
+
+    def extend(self, stock_history_df, masked_flags=FLAG_INTERPOLATED | FLAG_EXTENDED_HOURS):
+        """
+        Adds the bars of a stock history that are not held yet, in a single vectorized step. The newest bar held is
+        replaced by its counterpart in the stock history, and a stock history of a newer session replaces the session
+        held.
+
+        :param stock_history_df: DataFrame containing the stock's intraday history, preferably as returned by
+        get_stock_history_dataframe(); it is not modified
+        :param masked_flags: Quality flags of the bars left out of the VWAP; 0 keeps every bar. Default is
+        FLAG_INTERPOLATED | FLAG_EXTENDED_HOURS
+        :return: The VWAP including the bars of stock_history_df
+        """
+
+        if stock_history_df is None or stock_history_df.empty:
+            return self.value
+
+        stock_history_df = mask_flagged(stock_history_df, masked_flags)
+
+        if stock_history_df.empty:
+            return self.value
+
+        begins_at = begins_at_seconds(stock_history_df)
+        session_days = begins_at // INTERVAL_SECONDS["day"]
+        session_day = int(session_days[-1])
+
+        if self.session_day is not None and session_day < self.session_day:
+            return self.value
+
+        if session_day != self.session_day:
+            self._start_session(session_day)
+
+        is_new = session_days == session_day
+
+        if self.last_begins_at is not None:
+            is_new &= begins_at >= self.last_begins_at
+
+        if not is_new.any():
+            return self.value
+
+        begins_at = begins_at[is_new]
+        volumes = numeric_column(stock_history_df, "volume").to_numpy(dtype=np.float64)[is_new]
+        price_volumes = numeric_column(stock_history_df, "close_price").to_numpy(dtype=np.float64)[is_new] * volumes
+
+        if begins_at[0] == self.last_begins_at:
+            self._price_volume -= self._last_price_volume
+            self._volume -= self._last_volume
+
+        self._price_volume += float(price_volumes.sum())
+        self._volume += float(volumes.sum())
+        self._last_price_volume = float(price_volumes[-1])
+        self._last_volume = float(volumes[-1])
+        self.last_begins_at = int(begins_at[-1])
+
+        return self.value
+
+
+def _exponential_smoothing(values, alpha):
+    """
+    Smooths values, which hold no NaN, with smoothed[0] = values[0] and
+    smoothed[t] = (1 - alpha) * smoothed[t - 1] + alpha * values[t].
+    """
+
+    if not len(values):
+        return np.empty(0)
+
+    return pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+
+def _spread(results, is_valid, warm_up):
+    """
+    Places the results computed from the valid values of a series back at their positions in the series.
+
+    Positions of invalid values carry the result of the last valid value before them, and the results of the first
+    warm_up valid values are NaN.
+    """
+
+    results = results.copy()
+    results[:warm_up] = np.nan
+
+    spread_results = np.full(len(is_valid), np.nan)
+    result_positions = np.cumsum(is_valid) - 1
+    has_result = result_positions >= 0
+    spread_results[has_result] = results[result_positions[has_result]]
+
+    return spread_results
+
+
+def _relative_strength_index(average_gains, average_losses):
+    """Returns the RSI from average gains and losses; 50 when the price has not moved."""
+
+    total_moves = average_gains + average_losses
+
+    return np.where(total_moves > 0, 100 * average_gains / np.where(total_moves > 0, total_moves, 1), 50.0)
+
+
+def exponential_moving_average(close_prices, window):
+    """
+    Computes the exponential moving average (EMA) of close prices, with a smoothing factor of 2 / (window + 1).
+
+    The average starts at the first price. NaN prices are skipped, and the average carries over them.
+
+    :param close_prices: Array of close prices, oldest first
+    :param window: Number of bars the smoothing factor is derived from
+    :return: Array of float64 as long as close_prices; NaN until window prices have been seen
+    """
+
+    close_prices = np.asarray(close_prices, dtype=np.float64)
+    is_valid = ~np.isnan(close_prices)
+    moving_averages = _exponential_smoothing(close_prices[is_valid], 2 / (window + 1))
+
+    return _spread(moving_averages, is_valid, window - 1)
+
+
+def relative_strength_index(close_prices, window=14):
+    """
+    Computes the relative strength index (RSI) of close prices, smoothing gains and losses with Wilder's smoothing
+    factor of 1 / window.
+
+    NaN prices are skipped, and the RSI carries over them.
+
+    :param close_prices: Array of close prices, oldest first
+    :param window: Number of bars the smoothing factor is derived from. Default is 14
+    :return: Array of float64 between 0 and 100 as long as close_prices; NaN until window price changes have been seen
+    """
+
+    close_prices = np.asarray(close_prices, dtype=np.float64)
+    is_valid = ~np.isnan(close_prices)
+    price_changes = np.diff(close_prices[is_valid])
+
+    average_gains = _exponential_smoothing(np.maximum(price_changes, 0.0), 1 / window)
+    average_losses = _exponential_smoothing(np.maximum(-price_changes, 0.0), 1 / window)
+    relative_strength_indexes = np.concatenate(([np.nan], _relative_strength_index(average_gains, average_losses)))
+
+    return _spread(relative_strength_indexes, is_valid, window)
+
+
+def moving_average_convergence_divergence(close_prices, fast_window=12, slow_window=26, signal_window=9):
+    """
+    Computes the moving average convergence divergence (MACD) of close prices.
+
+    NaN prices are skipped, and the MACD carries over them.
+
+    :param close_prices: Array of close prices, oldest first
+    :param fast_window: Window of the fast EMA. Default is 12
+    :param slow_window: Window of the slow EMA. Default is 26
+    :param signal_window: Window of the EMA of the MACD line. Default is 9
+    :return: Dict with the "macd" line, i.e. the fast EMA minus the slow EMA, its "signal" line, and the "histogram",
+    i.e. the MACD line minus the signal line, as arrays of float64 as long as close_prices. The MACD line is NaN until
+    slow_window prices have been seen, and the others until signal_window MACD values have been
+    """
+
+    close_prices = np.asarray(close_prices, dtype=np.float64)
+    is_valid = ~np.isnan(close_prices)
+    valid_close_prices = close_prices[is_valid]
+
+    macd = _exponential_smoothing(valid_close_prices, 2 / (fast_window + 1)) - _exponential_smoothing(
+        valid_close_prices, 2 / (slow_window + 1)
+    )
+    signal = _exponential_smoothing(macd, 2 / (signal_window + 1))
+    signal_warm_up = slow_window + signal_window - 2
+
+    return {
+        "macd": _spread(macd, is_valid, slow_window - 1),
+        "signal": _spread(signal, is_valid, signal_warm_up),
+        "histogram": _spread(macd - signal, is_valid, signal_warm_up),
+    }
+
+
+def bollinger_bands(close_prices, window=20, number_of_deviations=2):
+    """
+    Computes the Bollinger Bands of close prices: the simple moving average of the last window prices, and the bands
+    number_of_deviations standard deviations of those prices above and below it.
+
+    NaN prices are skipped, and the bands carry over them.
+
+    :param close_prices: Array of close prices, oldest first
+    :param window: Number of prices averaged. Default is 20
+    :param number_of_deviations: Number of standard deviations between the middle band and the others. Default is 2
+    :return: Dict with the "middle", "upper", and "lower" bands as arrays of float64 as long as close_prices; NaN until
+    window prices have been seen
+    """
+
+    close_prices = np.asarray(close_prices, dtype=np.float64)
+    is_valid = ~np.isnan(close_prices)
+    valid_close_prices = close_prices[is_valid]
+
+    middle_band = np.full(len(valid_close_prices), np.nan)
+    deviations = np.full(len(valid_close_prices), np.nan)
+
+    if len(valid_close_prices) >= window:
+        price_windows = np.lib.stride_tricks.sliding_window_view(valid_close_prices, window)
+        middle_band[window - 1 :] = price_windows.mean(axis=-1)
+        deviations[window - 1 :] = price_windows.std(axis=-1)
+
+    bands = {
+        "middle": middle_band,
+        "upper": middle_band + number_of_deviations * deviations,
+        "lower": middle_band - number_of_deviations * deviations,
+    }
+
+    return {name: _spread(band, is_valid, window - 1) for name, band in bands.items()}
+
+
+def average_true_range(high_prices, low_prices, close_prices, window=14):
+    """
+    Computes the average true range (ATR) of bars, smoothing true ranges with Wilder's smoothing factor of 1 / window.
+
+    The true range of a bar spans its high and low prices and the close price of the previous bar. Bars with a NaN
+    price are skipped, and the ATR carries over them.
+
+    :param high_prices: Array of high prices, oldest first
+    :param low_prices: Array of low prices, oldest first
+    :param close_prices: Array of close prices, oldest first
+    :param window: Number of bars the smoothing factor is derived from. Default is 14
+    :return: Array of float64 as long as close_prices; NaN until window bars have been seen
+    """
+
+    high_prices = np.asarray(high_prices, dtype=np.float64)
+    low_prices = np.asarray(low_prices, dtype=np.float64)
+    close_prices = np.asarray(close_prices, dtype=np.float64)
+    is_valid = ~(np.isnan(high_prices) | np.isnan(low_prices) | np.isnan(close_prices))
+
+    high_prices = high_prices[is_valid]
+    low_prices = low_prices[is_valid]
+    previous_close_prices = close_prices[is_valid][:-1]
+
+    true_ranges = high_prices - low_prices
+    true_ranges[1:] = np.maximum.reduce(
+        [
+            true_ranges[1:],
+            np.abs(high_prices[1:] - previous_close_prices),
+            np.abs(low_prices[1:] - previous_close_prices),
+        ]
+    )
+
+    return _spread(_exponential_smoothing(true_ranges, 1 / window), is_valid, window - 1)
+
+
+class StreamingExponentialSmoothing:
+    __slots__ = ("alpha", "value")
+
+    def __init__(self, alpha):
+        """
+        Exponential smoothing that is kept up to date one value at a time, with the same arithmetic as the batch
+        indicators so that both give identical results.
+
+        :param alpha: Smoothing factor between 0 and 1
+        """
+
+        self.alpha = alpha
+        self.value = math.nan
+
+    def update(self, value):
+        """
+        Adds a value, which must not be NaN.
+
+        :param value: Number
+        :return: The smoothed value including value
+        """
+
+        if math.isnan(self.value):
+            self.value = value
+
+        # The same steps as pandas' ewm(adjust=False).mean(), which the batch indicators use.
+        elif self.value != value:
+            old_weight = 1.0 - self.alpha
+            self.value = (old_weight * self.value + self.alpha * value) / (old_weight + self.alpha)
+
+        return self.value
+
+
+class StreamingExponentialMovingAverage:
+    __slots__ = ("window", "_smoothing", "_length")
+
+    def __init__(self, window):
+        """
+        Exponential moving average that is kept up to date one bar at a time in O(1), with the same results as
+        exponential_moving_average().
+
+        :param window: Number of bars the smoothing factor is derived from
+        """
+
+        self.window = window
+        self._smoothing = StreamingExponentialSmoothing(2 / (window + 1))
+        self._length = 0
+
+    @property
+    def value(self):
+        """Returns the current EMA, or NaN until window prices have been added."""
+
+        return self._smoothing.value if self._length >= self.window else math.nan
+
+    def update(self, bar):
+        """
+        Adds a new bar. Bars with a NaN close price are skipped.
+
+        :param bar: Close price, or a bar with a "close_price"
+        :return: The EMA including bar
+        """
+
+        close_price = bar_close_price(bar)
+
+        if not math.isnan(close_price):
+            self._smoothing.update(close_price)
+            self._length += 1
+
+        return self.value
+
+
+class StreamingRelativeStrengthIndex:
+    __slots__ = ("window", "_previous_close_price", "_average_gain", "_average_loss", "_length")
+
+    def __init__(self, window=14):
+        """
+        Relative strength index that is kept up to date one bar at a time in O(1), with the same results as
+        relative_strength_index().
+
+        :param window: Number of bars the smoothing factor is derived from. Default is 14
+        """
+
+        self.window = window
+        self._previous_close_price = None
+        self._average_gain = StreamingExponentialSmoothing(1 / window)
+        self._average_loss = StreamingExponentialSmoothing(1 / window)
+        self._length = 0
+
+    @property
+    def value(self):
+        """Returns the current RSI, or NaN until window price changes have been added."""
+
+        if self._length <= self.window:
+            return math.nan
+
+        return float(_relative_strength_index(self._average_gain.value, self._average_loss.value))
+
+    def update(self, bar):
+        """
+        Adds a new bar. Bars with a NaN close price are skipped.
+
+        :param bar: Close price, or a bar with a "close_price"
+        :return: The RSI including bar
+        """
+
+        close_price = bar_close_price(bar)
+
+        if math.isnan(close_price):
+            return self.value
+
+        if self._previous_close_price is not None:
+            price_change = close_price - self._previous_close_price
+            self._average_gain.update(max(price_change, 0.0))
+            self._average_loss.update(max(-price_change, 0.0))
+
+        self._previous_close_price = close_price
+        self._length += 1
+
+        return self.value
+
+
+class StreamingMovingAverageConvergenceDivergence:
+    __slots__ = ("slow_window", "signal_window", "_fast", "_slow", "_signal", "_length")
+
+    def __init__(self, fast_window=12, slow_window=26, signal_window=9):
+        """
+        Moving average convergence divergence that is kept up to date one bar at a time in O(1), with the same results
+        as moving_average_convergence_divergence().
+
+        :param fast_window: Window of the fast EMA. Default is 12
+        :param slow_window: Window of the slow EMA. Default is 26
+        :param signal_window: Window of the EMA of the MACD line. Default is 9
+        """
+
+        self.slow_window = slow_window
+        self.signal_window = signal_window
+        self._fast = StreamingExponentialSmoothing(2 / (fast_window + 1))
+        self._slow = StreamingExponentialSmoothing(2 / (slow_window + 1))
+        self._signal = StreamingExponentialSmoothing(2 / (signal_window + 1))
+        self._length = 0
+
+    @property
+    def value(self):
+        """Returns the current "macd", "signal", and "histogram" values, each NaN until it has warmed up."""
+
+        macd = self._fast.value - self._slow.value
+        signal = self._signal.value
+
+        if self._length < self.slow_window:
+            macd = math.nan
+
+        if self._length < self.slow_window + self.signal_window - 1:
+            signal = math.nan
+
+        return {"macd": macd, "signal": signal, "histogram": macd - signal}
+
+    def update(self, bar):
+        """
+        Adds a new bar. Bars with a NaN close price are skipped.
+
+        :param bar: Close price, or a bar with a "close_price"
+        :return: Dict with the "macd", "signal", and "histogram" values including bar
+        """
+
+        close_price = bar_close_price(bar)
+
+        if not math.isnan(close_price):
+            self._signal.update(self._fast.update(close_price) - self._slow.update(close_price))
+            self._length += 1
+
+        return self.value
+
+
+class StreamingBollingerBands:
+    __slots__ = ("window", "number_of_deviations", "_close_prices", "_position", "_length", "_sum", "_sum_of_squares")
+
+    def __init__(self, window=20, number_of_deviations=2):
+        """
+        Bollinger Bands that are kept up to date one bar at a time in O(1), with the same results as bollinger_bands()
+        up to floating point rounding.
+
+        The last window close prices are held in a ring buffer next to their running sum and sum of squares.
+
+        :param window: Number of prices averaged. Default is 20
+        :param number_of_deviations: Number of standard deviations between the middle band and the others. Default is 2
+        """
+
+        self.window = window
+        self.number_of_deviations = number_of_deviations
+        self._close_prices = [0.0] * window
+        self._position = 0
+        self._length = 0
+        self._sum = 0.0
+        self._sum_of_squares = 0.0
+
+    @property
+    def value(self):
+        """Returns the current "middle", "upper", and "lower" bands, or NaN until window prices have been added."""
+
+        if self._length < self.window:
+            return {"middle": math.nan, "upper": math.nan, "lower": math.nan}
+
+        middle_band = self._sum / self.window
+        deviation = math.sqrt(max(0.0, self._sum_of_squares / self.window - middle_band * middle_band))
+
+        return {
+            "middle": middle_band,
+            "upper": middle_band + self.number_of_deviations * deviation,
+            "lower": middle_band - self.number_of_deviations * deviation,
+        }
+
+    def update(self, bar):
+        """
+        Adds a new bar, dropping the oldest one once window bars are held. Bars with a NaN close price are skipped.
+
+        :param bar: Close price, or a bar with a "close_price"
+        :return: Dict with the "middle", "upper", and "lower" bands including bar
+        """
+
+        close_price = bar_close_price(bar)
+
+        if math.isnan(close_price):
+            return self.value
+
+        oldest_close_price = self._close_prices[self._position]
+        self._sum += close_price - oldest_close_price
+        self._sum_of_squares += close_price * close_price - oldest_close_price * oldest_close_price
+
+        self._close_prices[self._position] = close_price
+        self._position = (self._position + 1) % self.window
+        self._length = min(self._length + 1, self.window)
+
+        # Resum the buffer once per lap so rounding errors of the running sums never pile up; O(1) amortized.
+        if self._position == 0:
+            self._sum = math.fsum(self._close_prices)
+            self._sum_of_squares = math.fsum(price * price for price in self._close_prices)
+
+        return self.value
+
+
+class StreamingAverageTrueRange:
+    __slots__ = ("window", "_previous_close_price", "_smoothing", "_length")
+
+    def __init__(self, window=14):
+        """
+        Average true range that is kept up to date one bar at a time in O(1), with the same results as
+        average_true_range().
+
+        :param window: Number of bars the smoothing factor is derived from. Default is 14
+        """
+
+        self.window = window
+        self._previous_close_price = None
+        self._smoothing = StreamingExponentialSmoothing(1 / window)
+        self._length = 0
+
+    @property
+    def value(self):
+        """Returns the current ATR, or NaN until window bars have been added."""
+
+        return self._smoothing.value if self._length >= self.window else math.nan
+
+    def update(self, bar):
+        """
+        Adds a new bar. Bars with a NaN price are skipped.
+
+        :param bar: Bar with a "high_price", a "low_price", and a "close_price", such as a dict returned by
+        get_stock_historicals() or a row of a stock history DataFrame
+        :return: The ATR including bar
+        """
+
+        high_price = float(bar["high_price"])
+        low_price = float(bar["low_price"])
+        close_price = float(bar["close_price"])
+
+        if math.isnan(high_price) or math.isnan(low_price) or math.isnan(close_price):
+            return self.value
+
+        true_range = high_price - low_price
+
+        if self._previous_close_price is not None:
+            true_range = max(
+                true_range, abs(high_price - self._previous_close_price), abs(low_price - self._previous_close_price)
+            )
+
+        self._smoothing.update(true_range)
+        self._previous_close_price = close_price
+        self._length += 1
+
+        return self.value
@@ -0,0 +1,210 @@
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import robin_stocks.robinhood as robinhood
+
+from src.utilities import CacheSettings
+
+# Largest number of instrument requests sent to the Robinhood API at the same time by a bulk refresh.
+MAX_CONCURRENT_INSTRUMENT_REQUESTS = 8
+
+# Serializes the saves of every index of this process, so that indexes sharing a file merge each other's instruments.
+_save_lock = threading.Lock()
+
+
+def instrument_record(instrument_data):
+    """
+    Extracts the fields kept by the instrument index from an instrument returned by the Robinhood API.
+
+    :param instrument_data: Dict as returned by get_instruments_by_symbols() or get_instrument_by_url()
+    :return: Dict with "symbol", "id", "url", "simple_name", "name", "tradable", and "fractional_tradable"
+    """
+
+    return {
+        "symbol": instrument_data["symbol"].upper(),
+        "id": instrument_data["id"],
+        "url": instrument_data["url"],
+        "simple_name": instrument_data.get("simple_name"),
+        "name": instrument_data.get("name"),
+        "tradable": instrument_data.get("tradability") == "tradable",
+        "fractional_tradable": instrument_data.get("fractional_tradability") == "tradable",
+    }
+
+
+class InstrumentIndex:
+    def __init__(self, index_path=None):
+        """
+        Local index of instrument metadata that is loaded once and persisted to disk.
+
+        Lookups by symbol and by instrument url are dictionary lookups and never send a request. Instruments are added
+        with refresh() or put().
+
+        :param index_path: JSON file holding the index; defaults to instruments.json in TRADEBOT_CACHE_DIR
+        """
+
+        self.index_path = index_path or os.path.join(CacheSettings().cache_dir, "instruments.json")
+
+        self._lock = threading.Lock()
+        self._instruments_by_symbol = {}
+        self._symbols_by_url = {}
+
+        self.load()
+
+    def __len__(self):
+        return len(self._instruments_by_symbol)
+
+    def __contains__(self, symbol):
+        return symbol.upper() in self._instruments_by_symbol
+
+    def _read_records(self):
+        """Returns the instruments saved on disk, or an empty list if the index file is missing or malformed."""
+
+        try:
+            with open(self.index_path) as index_file:
+                return json.load(index_file)
+
+        except (OSError, ValueError):
+            return []
+
+    def load(self):
+        """Loads the index from disk, replacing the instruments held in memory."""
+
+        records = self._read_records()
+
+        with self._lock:
+            self._instruments_by_symbol = {record["symbol"]: record for record in records}
+            self._symbols_by_url = {record["url"]: record["symbol"] for record in records}
+
+    def save(self):
+        """
+        Atomically writes the index to disk. The instruments saved to the same file by other indexes since this one
+        was loaded are merged in first, so bots sharing the file never drop each other's instruments.
+        """
+
+        index_dir = os.path.dirname(self.index_path) or "."
+        os.makedirs(index_dir, exist_ok=True)
+
+        with _save_lock:
+            saved_records = self._read_records()
+
+            with self._lock:
+                for record in saved_records:
+                    if record["symbol"] not in self._instruments_by_symbol:
+                        self._instruments_by_symbol[record["symbol"]] = record
+                        self._symbols_by_url[record["url"]] = record["symbol"]
+
+                records = list(self._instruments_by_symbol.values())
+
+            file_descriptor, temporary_path = tempfile.mkstemp(dir=index_dir, suffix=".tmp")
+
+            try:
+                with os.fdopen(file_descriptor, "w") as temporary_file:
+                    json.dump(records, temporary_file)
+
+                os.replace(temporary_path, self.index_path)
+
+            except OSError:
+                if os.path.exists(temporary_path):
+                    os.remove(temporary_path)
+                raise
+
+    def get(self, symbol):
+        """
+        Returns the instrument of symbol.
+
+        :param symbol: A company's ticker symbol as a string
+        :return: Dict as returned by instrument_record(), or None if the symbol is not indexed
+        """
+
+        return self._instruments_by_symbol.get(symbol.upper())
+
+    def get_by_url(self, instrument_url):
+        """
+        Returns the instrument with the given instrument url.
+
+        :param instrument_url: The instrument url of a stock
+        :return: Dict as returned by instrument_record(), or None if the instrument is not indexed
+        """
+
+        symbol = self._symbols_by_url.get(instrument_url)
+
+        return self._instruments_by_symbol.get(symbol) if symbol else None
+
+    def get_name(self, symbol):
+        """
+        Returns the simple name of the company represented by symbol, or its full name if it has no simple name.
+
+        :param symbol: A company's ticker symbol as a string
+        :return: Company name as a string, or None if the symbol is not indexed
+        """
+
+        instrument = self.get(symbol)
+
+        if instrument is None:
+            return None
+
+        return instrument["simple_name"] or instrument["name"] or ""
+
+    def put(self, instrument_data):
+        """
+        Adds an instrument returned by the Robinhood API to the index without saving it.
+
+        :param instrument_data: Dict as returned by get_instruments_by_symbols() or get_instrument_by_url()
+        :return: Dict as returned by instrument_record()
+        """
+
+        record = instrument_record(instrument_data)
+
+        with self._lock:
+            self._instruments_by_symbol[record["symbol"]] = record
+            self._symbols_by_url[record["url"]] = record["symbol"]
+
+        return record
+
+    def refresh(self, symbols):
+        """
+        Requests the instruments of symbols from the Robinhood API, adds them to the index, and saves it.
+
+        :param symbols: A list of company ticker symbols as strings
+        :return: Number of instruments that were indexed
+        """
+
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols if symbol))
+
+        # The instruments endpoint only looks up one symbol per request, so the requests are sent concurrently.
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_INSTRUMENT_REQUESTS) as executor:
+            responses = list(executor.map(robinhood.stocks.get_instruments_by_symbols, symbols))
+
+        indexed = 0
+
+        for response in responses:
+            for instrument_data in response or []:
+                if instrument_data:
+                    self.put(instrument_data)
+                    indexed += 1
+
+        if indexed:
+            self.save()
+
+        return indexed
+
+    def refresh_url(self, instrument_url):
+        """
+        Requests the instrument at instrument_url from the Robinhood API, adds it to the index, and saves it.
+
+        :param instrument_url: The instrument url of a stock
+        :return: Dict as returned by instrument_record(), or None if the request failed
+        """
+
+        instrument_data = robinhood.stocks.get_instrument_by_url(instrument_url)
+
+        if not instrument_data:
+            return None
+
+        record = self.put(instrument_data)
+        self.save()
+
+        return record
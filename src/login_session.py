@@ -0,0 +1,306 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+import pyotp
+import robin_stocks.robinhood as robinhood
+
+from src.http_session import configure_robinhood_session
+from src.utilities import RobinhoodCredentials
+
+# OAuth client id of the Robinhood web app, as used by robin_stocks.
+ROBINHOOD_CLIENT_ID = "c82SH0WZOsabOXGP2sxqcj34FxkvfnWRZBKlBjFS"
+
+# Lifetime in seconds requested for new access tokens.
+ACCESS_TOKEN_LIFETIME = 24 * 60 * 60
+
+# A stored access token is refreshed this many seconds before it expires, so it never expires in the middle of a cycle.
+ACCESS_TOKEN_EXPIRY_MARGIN = 5 * 60
+
+# Timeout in seconds of the request checking that a stored access token is still accepted.
+TOKEN_CHECK_TIMEOUT = 16
+
+# Status codes of the responses to requests sent with an access token that was revoked.
+REJECTED_TOKEN_STATUS_CODES = (401, 403)
+
+
+def token_from_login_data(login_data, now, device_token):
+    """
+    Extracts the token kept by the session store from the response of a login or refresh request.
+
+    :param login_data: Dict with "token_type", "access_token", "refresh_token", and optionally "expires_in"
+    :param now: Seconds since the epoch at which the token was issued
+    :param device_token: Device token the token was issued to, which its refresh requests must send
+    :return: Dict with "token_type", "access_token", "refresh_token", "device_token", and "expires_at"
+    """
+
+    return {
+        "token_type": login_data["token_type"],
+        "access_token": login_data["access_token"],
+        "refresh_token": login_data["refresh_token"],
+        "device_token": device_token,
+        "expires_at": now + int(login_data.get("expires_in") or ACCESS_TOKEN_LIFETIME),
+    }
+
+
+def apply_token(token):
+    """Authorizes every request robin_stocks sends with the access token."""
+
+    robinhood.helper.update_session("Authorization", f"{token['token_type']} {token['access_token']}")
+    robinhood.helper.set_login_state(True)
+
+
+def clear_token():
+    """Stops authorizing the requests robin_stocks sends."""
+
+    robinhood.helper.update_session("Authorization", None)
+    robinhood.helper.set_login_state(False)
+
+
+def is_token_accepted():
+    """
+    Checks that Robinhood still accepts the access token in use, which it may have revoked before it expires.
+
+    :return: False if Robinhood rejected the access token; True otherwise, including when the check itself failed
+    """
+
+    try:
+        response = robinhood.helper.SESSION.get(
+            robinhood.urls.positions_url(), params={"nonzero": "true"}, timeout=TOKEN_CHECK_TIMEOUT
+        )
+
+    except OSError as error:
+        print(f"ERROR: Could not check the stored access token: {error}")
+        return True
+
+    return response.status_code not in REJECTED_TOKEN_STATUS_CODES
+
+
+class LoginSessionStore:
+    def __init__(self, session_path=None):
+        """
+        Stores the access and refresh tokens of the last login in a file that only the user can read.
+
+        :param session_path: JSON file holding the tokens; defaults to ROBINHOOD_SESSION_PATH
+        """
+
+        self.session_path = session_path or RobinhoodCredentials().session_path
+
+    def load(self):
+        """
+        Returns the stored token.
+
+        :return: Dict as returned by token_from_login_data(), or None if no token is stored
+        """
+
+        try:
+            with open(self.session_path) as session_file:
+                return json.load(session_file)
+
+        except (OSError, ValueError):
+            return None
+
+    def save(self, token):
+        """
+        Atomically writes token to the session file.
+
+        :param token: Dict as returned by token_from_login_data()
+        """
+
+        session_dir = os.path.dirname(self.session_path) or "."
+        os.makedirs(session_dir, exist_ok=True)
+
+        # mkstemp creates the file readable and writable by the user only.
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=session_dir, suffix=".tmp")
+
+        try:
+            with os.fdopen(file_descriptor, "w") as temporary_file:
+                json.dump(token, temporary_file)
+
+            os.replace(temporary_path, self.session_path)
+
+        except OSError:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+    def clear(self):
+        """Removes the stored token."""
+
+        if os.path.exists(self.session_path):
+            os.remove(self.session_path)
+
+
+def refresh_token(token, now):
+    """
+    Exchanges the refresh token of token for a new access token.
+
+    :param token: Dict as returned by token_from_login_data()
+    :param now: Seconds since the epoch
+    :return: New token as returned by token_from_login_data(), or None if the refresh was rejected
+    """
+
+    device_token = token.get("device_token")
+
+    # Tokens stored before device tokens were kept cannot be refreshed.
+    if not device_token:
+        return None
+
+    payload = {
+        "client_id": ROBINHOOD_CLIENT_ID,
+        "device_token": device_token,
+        "expires_in": ACCESS_TOKEN_LIFETIME,
+        "grant_type": "refresh_token",
+        "refresh_token": token["refresh_token"],
+        "scope": "internal",
+    }
+
+    login_data = robinhood.helper.request_post(robinhood.urls.login_url(), payload)
+
+    if not login_data or "access_token" not in login_data:
+        return None
+
+    return token_from_login_data(login_data, now, device_token)
+
+
+def full_login(robinhood_credentials, now, device_token=None):
+    """
+    Logs in with the username, password, and MFA code of robinhood_credentials.
+
+    The password grant is sent directly rather than through robinhood.login(), which keeps its own token file and does
+    not return the device token that refresh requests must send.
+
+    :param robinhood_credentials: RobinhoodCredentials
+    :param now: Seconds since the epoch
+    :param device_token: Device token of an earlier login, so Robinhood recognizes the device; a new one is generated
+    by default
+    :return: Token as returned by token_from_login_data()
+    """
+
+    device_token = device_token or robinhood.authentication.generate_device_token()
+
+    payload = {
+        "client_id": ROBINHOOD_CLIENT_ID,
+        "device_token": device_token,
+        "expires_in": ACCESS_TOKEN_LIFETIME,
+        "grant_type": "password",
+        "password": robinhood_credentials.password,
+        "scope": "internal",
+        "username": robinhood_credentials.user,
+    }
+
+    if not robinhood_credentials.mfa_code:
+        print(
+            "WARNING: MFA code is not supplied. Multi-factor authentication will not be attempted. If your "
+            "Robinhood account uses MFA to log in, this will fail and may lock you out of your accounts for "
+            "some period of time."
+        )
+
+    else:
+        payload["mfa_code"] = pyotp.TOTP(robinhood_credentials.mfa_code).now()
+
+    login_data = robinhood.helper.request_post(robinhood.urls.login_url(), payload)
+
+    if not login_data:
+        raise Exception("Trouble connecting to the Robinhood API. Check your internet connection.")
+
+    # Challenges sent by SMS or email need someone to answer them, which a bot cannot do.
+    if "access_token" not in login_data:
+        raise Exception(f"Robinhood login failed: {login_data.get('detail', login_data)}")
+
+    return token_from_login_data(login_data, now, device_token)
+
+
+def login(session_store=None, robinhood_credentials=None):
+    """
+    Logs into Robinhood with as little work as possible.
+
+    A stored access token that has not expired is used once a single request confirms Robinhood still accepts it. An
+    expired or rejected one is refreshed with its refresh token. A full login with MFA is only made when there is no
+    stored token or its refresh is rejected. The resulting token is stored for the next login.
+
+    :param session_store: LoginSessionStore; defaults to one at ROBINHOOD_SESSION_PATH
+    :param robinhood_credentials: RobinhoodCredentials; read from the environment by default
+    :return: "stored", "refreshed", or "logged in" depending on how the token was obtained
+    """
+
+    session_store = session_store or LoginSessionStore()
+    now = int(time.time())
+    token = session_store.load()
+
+    if token is not None and now < token["expires_at"] - ACCESS_TOKEN_EXPIRY_MARGIN:
+        apply_token(token)
+
+        if is_token_accepted():
+            return "stored"
+
+        clear_token()
+
+    refreshed_token = refresh_token(token, now) if token is not None else None
+
+    if refreshed_token is not None:
+        detail = "refreshed"
+        token = refreshed_token
+
+    else:
+        detail = "logged in"
+        device_token = token.get("device_token") if token is not None else None
+        token = full_login(robinhood_credentials or RobinhoodCredentials(), now, device_token)
+
+    apply_token(token)
+    session_store.save(token)
+
+    return detail
+
+
+class SessionManager:
+    def __init__(self):
+        """
+        Shares one logged in robin_stocks session between every bot of the process.
+
+        robin_stocks keeps its login in global state, so bots acquire the session instead of logging in themselves.
+        The first acquire() logs in, and the session is only logged out when the last bot holding it releases it.
+
+        The bots holding the session trade from the same account, so they share its account snapshot, which is dropped
+        when the session logs out.
+        """
+
+        self._lock = threading.Lock()
+        self._reference_count = 0
+        self.account_snapshot = None
+
+    @property
+    def reference_count(self):
+        """Returns the number of bots holding the session."""
+
+        return self._reference_count
+
+    def acquire(self):
+        """Logs in if no bot holds the session yet and adds a reference to it."""
+
+        with self._lock:
+            if self._reference_count == 0:
+                # Every request shares the pooled connections of the session robin_stocks logs in.
+                configure_robinhood_session()
+                login()
+
+            self._reference_count += 1
+
+    def release(self):
+        """Removes a reference to the session and logs out when it was the last one."""
+
+        with self._lock:
+            if self._reference_count == 0:
+                return
+
+            self._reference_count -= 1
+
+            if self._reference_count == 0:
+                robinhood.logout()
+                self.account_snapshot = None
+
+
+# Session shared by the bots of this process.
+session_manager = SessionManager()
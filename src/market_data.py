@@ -0,0 +1,212 @@
+import asyncio
+import concurrent.futures
+import weakref
+
+import requests
+import robin_stocks.robinhood as robinhood
+
+ROBINHOOD_API_URL = "https://api.robinhood.com"
+
+# Largest number of symbols the historicals endpoint accepts in a single request.
+MAX_SYMBOLS_PER_HISTORICALS_REQUEST = 75
+
+# Largest number of symbols the quotes and fundamentals endpoints accept in a single request.
+MAX_SYMBOLS_PER_QUOTES_REQUEST = 100
+
+# Largest number of requests sent to the Robinhood API at the same time by a batched call.
+MAX_CONCURRENT_REQUESTS = 8
+
+# Seconds to wait for the Robinhood API to respond before a request is given up.
+REQUEST_TIMEOUT_SECONDS = 16
+
+
+def chunk_symbols(symbols, chunk_size):
+    """
+    Splits symbols into chunks that fit in a single request.
+
+    :param symbols: A list of company ticker symbols as strings
+    :param chunk_size: Largest number of symbols in a chunk
+    :return: List of lists of upper-case symbols, without duplicates or empty symbols
+    """
+
+    symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols if symbol))
+
+    return [symbols[start : start + chunk_size] for start in range(0, len(symbols), chunk_size)]
+
+
+def run_coroutine(coroutine):
+    """
+    Runs coroutine to completion from synchronous code. When an event loop is already running in this thread, e.g. in
+    Jupyter or when called from a coroutine, the coroutine runs on a private event loop in a worker thread instead, and
+    the running loop is blocked until it completes.
+
+    :param coroutine: Coroutine to run
+    :return: Result of coroutine
+    """
+
+    try:
+        asyncio.get_running_loop()
+
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+class MarketDataFetcher:
+    def __init__(self, base_url=ROBINHOOD_API_URL, max_concurrent_requests=MAX_CONCURRENT_REQUESTS, session=None):
+        """
+        Fetches historicals, quotes, and fundamentals for many symbols with concurrent requests.
+
+        The fetch_* coroutines split the symbols into chunks and send one request per chunk, with at most
+        max_concurrent_requests requests in flight at a time. Requests are sent from worker threads through a requests
+        session, so they carry the authentication of robin_stocks and can be pointed at a local server for testing.
+        Each coroutine has a synchronous get_* wrapper, which can also be called while an event loop is running.
+
+        :param base_url: Root url of the Robinhood API
+        :param max_concurrent_requests: Largest number of requests in flight at a time
+        :param session: requests session to send requests with; defaults to the session robin_stocks logs in
+        """
+
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrent_requests = max_concurrent_requests
+        self.session = session
+
+        # One semaphore per event loop, shared by every coroutine of the fetcher running on it.
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _get_semaphore(self):
+        """Returns the semaphore bounding the requests sent from the running event loop."""
+
+        loop = asyncio.get_running_loop()
+
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_concurrent_requests)
+
+        return self._semaphores[loop]
+
+    async def _get_results(self, path, params):
+        """
+        Sends a GET request to the API and returns the "results" of its response.
+
+        :param path: Path of the endpoint, relative to base_url
+        :param params: Dict of query parameters
+        :return: List of results; empty if the request failed
+        """
+
+        session = self.session or robinhood.helper.SESSION
+        url = f"{self.base_url}/{path}"
+
+        async with self._get_semaphore():
+            try:
+                response = await asyncio.to_thread(session.get, url, params=params, timeout=REQUEST_TIMEOUT_SECONDS)
+                response.raise_for_status()
+                return response.json().get("results") or []
+
+            except (requests.exceptions.RequestException, ValueError) as error:
+                print(f"ERROR: Request to {url} failed: {error}")
+                return []
+
+    async def _fetch_chunks(self, path, chunks, params):
+        """Requests every chunk of symbols from path concurrently and returns the results of each chunk."""
+
+        return await asyncio.gather(
+            *(self._get_results(path, dict(params, symbols=",".join(chunk))) for chunk in chunks)
+        )
+
+    async def fetch_historicals(self, symbols, interval="day", span="year", bounds="regular"):
+        """
+        Fetches the bars of many symbols.
+
+        :param symbols: A list of company ticker symbols as strings
+        :param interval: Interval of the bars. Default is "day"
+        :param span: Span of the bars. Default is "year"
+        :param bounds: Trading sessions to include. Default is "regular"
+        :return: List of bars as returned by get_stock_historicals(), each with a "symbol" key
+        """
+
+        chunks = chunk_symbols(symbols, MAX_SYMBOLS_PER_HISTORICALS_REQUEST)
+        responses = await self._fetch_chunks(
+            "quotes/historicals/", chunks, {"interval": interval, "span": span, "bounds": bounds}
+        )
+
+        stock_history = []
+
+        for results in responses:
+            for result in results:
+                if result:
+                    stock_history.extend(dict(bar, symbol=result["symbol"]) for bar in result["historicals"])
+
+        return stock_history
+
+    async def fetch_quotes(self, symbols):
+        """
+        Fetches the quotes of many symbols.
+
+        :param symbols: A list of company ticker symbols as strings
+        :return: List of quotes as returned by get_quotes(); symbols without a quote are left out
+        """
+
+        chunks = chunk_symbols(symbols, MAX_SYMBOLS_PER_QUOTES_REQUEST)
+        responses = await self._fetch_chunks("quotes/", chunks, {})
+
+        return [quote for results in responses for quote in results if quote]
+
+    async def fetch_fundamentals(self, symbols):
+        """
+        Fetches the fundamentals of many symbols.
+
+        :param symbols: A list of company ticker symbols as strings
+        :return: List of fundamentals as returned by get_fundamentals(), each with a "symbol" key; symbols without
+        fundamentals are left out
+        """
+
+        chunks = chunk_symbols(symbols, MAX_SYMBOLS_PER_QUOTES_REQUEST)
+        responses = await self._fetch_chunks("fundamentals/", chunks, {})
+
+        # The endpoint returns the fundamentals in the order of the requested symbols but without the symbols.
+        return [
+            dict(fundamentals, symbol=symbol)
+            for chunk, results in zip(chunks, responses)
+            for symbol, fundamentals in zip(chunk, results)
+            if fundamentals
+        ]
+
+    async def fetch_universe(self, symbols, interval="day", span="year"):
+        """
+        Fetches the historicals, quotes, and fundamentals of many symbols at the same time.
+
+        :param symbols: A list of company ticker symbols as strings
+        :param interval: Interval of the bars. Default is "day"
+        :param span: Span of the bars. Default is "year"
+        :return: Dict with the "historicals", "quotes", and "fundamentals" as returned by the fetch_* coroutines
+        """
+
+        historicals, quotes, fundamentals = await asyncio.gather(
+            self.fetch_historicals(symbols, interval, span),
+            self.fetch_quotes(symbols),
+            self.fetch_fundamentals(symbols),
+        )
+
+        return {"historicals": historicals, "quotes": quotes, "fundamentals": fundamentals}
+
+    def get_historicals(self, symbols, interval="day", span="year", bounds="regular"):
+        """Synchronous wrapper of fetch_historicals(), which can also be called from a running event loop."""
+
+        return run_coroutine(self.fetch_historicals(symbols, interval, span, bounds))
+
+    def get_quotes(self, symbols):
+        """Synchronous wrapper of fetch_quotes(), which can also be called from a running event loop."""
+
+        return run_coroutine(self.fetch_quotes(symbols))
+
+    def get_fundamentals(self, symbols):
+        """Synchronous wrapper of fetch_fundamentals(), which can also be called from a running event loop."""
+
+        return run_coroutine(self.fetch_fundamentals(symbols))
+
+    def get_universe(self, symbols, interval="day", span="year"):
+        """Synchronous wrapper of fetch_universe(), which can also be called from a running event loop."""
+
+        return run_coroutine(self.fetch_universe(symbols, interval, span))
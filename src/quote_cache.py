@@ -0,0 +1,143 @@
+import threading
+import time
+from concurrent.futures import Future
+
+from src.utilities import CacheSettings
+
+
+class QuoteCache:
+    def __init__(self, fetch_price=None, max_staleness_ms=None):
+        """
+        In-process cache of market prices with single-flight request coalescing.
+
+        A price is served from the cache while it is at most max_staleness_ms old. When it is not, the first caller
+        fetches it and every concurrent caller asking for the same ticker waits for that one request.
+
+        :param fetch_price: Function taking a ticker and returning its current market price, used by get() when its
+        caller passes none
+        :param max_staleness_ms: Age in milliseconds after which a price is fetched again; defaults to
+        TRADEBOT_QUOTE_MAX_STALENESS_MS. Zero only coalesces concurrent requests
+        """
+
+        self.fetch_price = fetch_price
+        self.max_staleness_ms = CacheSettings().quote_max_staleness_ms if max_staleness_ms is None else max_staleness_ms
+
+        self._lock = threading.Lock()
+        self._prices = {}
+        self._in_flight = {}
+
+    def get_fresh(self, ticker):
+        """
+        Returns the cached price of ticker if it is within the staleness budget.
+
+        :param ticker: A company's ticker symbol as a string
+        :return: Price in USD, or None
+        """
+
+        with self._lock:
+            return self._get_fresh(ticker.upper())
+
+    def get_last(self, ticker):
+        """
+        Returns the last price of ticker held by the cache, however old it is.
+
+        :param ticker: A company's ticker symbol as a string
+        :return: Price in USD, or None
+        """
+
+        with self._lock:
+            cached = self._prices.get(ticker.upper())
+
+        return None if cached is None else cached[0]
+
+    def _get_fresh(self, symbol):
+        """Returns the cached price of symbol if it is within the staleness budget. The lock must be held."""
+
+        cached = self._prices.get(symbol)
+
+        if cached is None:
+            return None
+
+        price, requested_at = cached
+
+        if (time.monotonic() - requested_at) * 1000 > self.max_staleness_ms:
+            return None
+
+        return price
+
+    def get(self, ticker, fetch_price=None):
+        """
+        Returns the price of ticker, fetching it only if there is no fresh price and no request already in flight.
+
+        :param ticker: A company's ticker symbol as a string
+        :param fetch_price: Function taking a ticker and returning its current market price; defaults to the one the
+        cache was created with
+        :return: Price in USD
+        """
+
+        fetch_price = fetch_price or self.fetch_price
+
+        symbol = ticker.upper()
+
+        with self._lock:
+            price = self._get_fresh(symbol)
+
+            if price is not None:
+                return price
+
+            in_flight = self._in_flight.get(symbol)
+
+            if in_flight is None:
+                in_flight = Future()
+                self._in_flight[symbol] = in_flight
+                is_leader = True
+
+            else:
+                is_leader = False
+
+        # Another caller is already fetching this ticker.
+        if not is_leader:
+            return in_flight.result()
+
+        # Measure staleness from when the request is sent, since the price can be no older than that.
+        requested_at = time.monotonic()
+
+        try:
+            price = fetch_price(ticker)
+
+        except BaseException as error:
+            with self._lock:
+                del self._in_flight[symbol]
+
+            in_flight.set_exception(error)
+            raise
+
+        with self._lock:
+            self._prices[symbol] = (price, requested_at)
+            del self._in_flight[symbol]
+
+        in_flight.set_result(price)
+
+        return price
+
+    def put(self, ticker, price):
+        """
+        Stores a price retrieved outside of the cache, e.g. by a bulk quote request.
+
+        :param ticker: A company's ticker symbol as a string
+        :param price: Price in USD
+        """
+
+        with self._lock:
+            self._prices[ticker.upper()] = (price, time.monotonic())
+
+    def clear(self):
+        """Removes every price from the cache."""
+
+        with self._lock:
+            self._prices.clear()
+
+
+# Quote cache shared by the bots of this process. Each bot passes its own fetch function, so whichever bot asks first
+# fetches the price for all of them.
+quote_cache = QuoteCache()
@@ -0,0 +1,229 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from src.utilities import HttpSessionSettings
+
+# Lanes of the rate limiter, from highest to lowest priority. A request only gets a token once no request of a higher
+# priority lane is waiting for one.
+PRIORITY_ORDERS = 0
+PRIORITY_DATA = 1
+PRIORITIES = (PRIORITY_ORDERS, PRIORITY_DATA)
+
+# The rate is multiplied by this factor once per throttle episode.
+MULTIPLICATIVE_DECREASE = 0.5
+
+# Throttled responses of requests whose send time is unknown are part of the same episode as a decrease for this many
+# seconds, or for the Retry-After of the response if it is longer.
+THROTTLE_EPISODE_SECONDS = 1.0
+
+# Requests per second the rate grows by over one second of successful responses at the current rate.
+ADDITIVE_INCREASE = 0.25
+
+# After being throttled, the rate only grows up to this fraction of the rate it was throttled at...
+THROTTLED_RATE_MARGIN = 0.9
+
+# ...until this many seconds without being throttled have passed, after which it probes up to the configured rate.
+THROTTLED_RATE_TTL = 5 * 60
+
+# The rate never drops below this many requests per second.
+MINIMUM_RATE = 0.2
+
+
+def parse_retry_after(retry_after, now=None):
+    """
+    Converts the value of a Retry-After header to a number of seconds.
+
+    :param retry_after: Number of seconds or HTTP date as a string, or None
+    :param now: Seconds since the epoch used to resolve an HTTP date; defaults to the current time
+    :return: Seconds to wait as a float, or None if retry_after is missing or malformed
+    """
+
+    if not retry_after:
+        return None
+
+    try:
+        return max(0.0, float(retry_after))
+
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(retry_after).timestamp()
+
+    except (TypeError, ValueError):
+        return None
+
+    return max(0.0, retry_at - (time.time() if now is None else now))
+
+
+class RateLimiter:
+    def __init__(self, rate=None, burst=None):
+        """
+        Token bucket shared by every request sent to the Robinhood API, with a rate that adapts to throttling.
+
+        Each request takes a token from the bucket, which refills at the current rate up to burst tokens. Throttled
+        responses pause the bucket for their Retry-After and halve the rate once per throttle episode, so the
+        responses of requests already in flight when the rate was cut do not cut it again. Successful responses grow
+        the rate additively. Once throttled, the rate settles just under the rate it was throttled at instead of oscillating
+        around it.
+
+        :param rate: Requests per second allowed at most; defaults to TRADEBOT_RATE_LIMIT_PER_SECOND
+        :param burst: Largest number of requests sent back to back; defaults to TRADEBOT_RATE_LIMIT_BURST
+        """
+
+        settings = HttpSessionSettings()
+        self.max_rate = rate or settings.rate_limit_per_second
+        self.burst = burst or settings.rate_limit_burst
+
+        self._condition = threading.Condition()
+        self._rate = self.max_rate
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._throttled_rate = None
+        self._throttled_at = 0.0
+        self._decreased_at = None
+        self._episode_ends_at = 0.0
+        self._waiting = {priority: 0 for priority in PRIORITIES}
+
+        self._requests = {priority: 0 for priority in PRIORITIES}
+        self._throttled_responses = 0
+        self._wait_seconds = 0.0
+
+    @property
+    def rate(self):
+        """Returns the current rate in requests per second."""
+
+        return self._rate
+
+    @property
+    def counters(self):
+        """
+        Returns the counters of the rate limiter.
+
+        :return: Dict with the current "rate", the number of "requests" and "order_requests" sent, the number of
+        "throttled_responses", and the total "wait_seconds" spent waiting for tokens
+        """
+
+        with self._condition:
+            return {
+                "rate": self._rate,
+                "requests": sum(self._requests.values()),
+                "order_requests": self._requests[PRIORITY_ORDERS],
+                "throttled_responses": self._throttled_responses,
+                "wait_seconds": self._wait_seconds,
+            }
+
+    def _refill(self, now):
+        """Adds the tokens accumulated since the last refill."""
+
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self._rate)
+        self._refilled_at = now
+
+    def acquire(self, priority=PRIORITY_DATA):
+        """
+        Blocks until a request of the given priority may be sent.
+
+        :param priority: PRIORITY_ORDERS or PRIORITY_DATA. Default is PRIORITY_DATA
+        :return: Seconds spent waiting
+        """
+
+        started_at = time.monotonic()
+
+        with self._condition:
+            self._waiting[priority] += 1
+
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+
+                    if now < self._paused_until:
+                        timeout = self._paused_until - now
+
+                    elif any(self._waiting[lane] for lane in PRIORITIES if lane < priority):
+                        # Woken up once a request of a higher priority lane takes its token.
+                        timeout = None
+
+                    elif self._tokens >= 1:
+                        self._tokens -= 1
+                        self._requests[priority] += 1
+                        waited = now - started_at
+                        self._wait_seconds += waited
+                        return waited
+
+                    else:
+                        timeout = (1 - self._tokens) / self._rate
+
+                    self._condition.wait(timeout)
+
+            finally:
+                self._waiting[priority] -= 1
+                self._condition.notify_all()
+
+    def _in_throttle_episode(self, now, sent_at):
+        """
+        Tells whether a throttled response belongs to the episode of the last decrease of the rate.
+
+        :param now: Current monotonic time
+        :param sent_at: Monotonic time the request was sent at, or None if unknown
+        :return: True if the rate was already cut for this response
+        """
+
+        if self._decreased_at is None:
+            return False
+
+        # A request sent before the decrease was already in flight when the rate was cut.
+        if sent_at is not None:
+            return sent_at < self._decreased_at
+
+        return now < self._episode_ends_at
+
+    def record_response(self, status_code, retry_after=None, sent_at=None):
+        """
+        Adapts the rate to the response of a request.
+
+        Concurrent requests throttled together only cut the rate once: throttled responses of requests sent before
+        the last decrease, or, when the send time is unknown, received within THROTTLE_EPISODE_SECONDS or the
+        Retry-After of it, are counted and pause the bucket but leave the rate as is.
+
+        :param status_code: HTTP status code of the response
+        :param retry_after: Seconds the API asked to wait before the next request, if it did
+        :param sent_at: Monotonic time the request was sent at, if known
+        """
+
+        with self._condition:
+            now = time.monotonic()
+            self._refill(now)
+
+            if status_code == 429:
+                self._throttled_responses += 1
+                self._throttled_at = now
+                self._tokens = 0.0
+
+                if retry_after:
+                    self._paused_until = max(self._paused_until, now + retry_after)
+
+                if not self._in_throttle_episode(now, sent_at):
+                    # The rate only drops within an episode, so the rate it was throttled at is the highest one.
+                    self._throttled_rate = self._rate
+                    self._rate = max(MINIMUM_RATE, self._rate * MULTIPLICATIVE_DECREASE)
+                    self._decreased_at = now
+                    self._episode_ends_at = now + max(THROTTLE_EPISODE_SECONDS, retry_after or 0.0)
+
+            elif status_code < 500:
+                target_rate = self.max_rate
+
+                if self._throttled_rate is not None and now - self._throttled_at < THROTTLED_RATE_TTL:
+                    target_rate = min(target_rate, self._throttled_rate * THROTTLED_RATE_MARGIN)
+
+                # Growing by ADDITIVE_INCREASE / rate per response grows the rate by ADDITIVE_INCREASE per second.
+                if self._rate < target_rate:
+                    self._rate = min(target_rate, self._rate + ADDITIVE_INCREASE / self._rate)
+
+            self._condition.notify_all()
+
+
+# Rate limiter shared by every request of this process.
+rate_limiter = RateLimiter()
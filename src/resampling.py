@@ -0,0 +1,109 @@
+import numpy as np
+
+from src.history_cache import INTERVAL_SECONDS
+from src.stock_history import NANOSECONDS_PER_SECOND
+
+# Finer intervals each interval can be built from, from most to least preferred.
+RESAMPLE_SOURCES = {
+    "10minute": ["5minute"],
+    "hour": ["10minute", "5minute"],
+    "day": ["hour", "10minute", "5minute"],
+    "week": ["day"],
+}
+
+DAY_NANOSECONDS = INTERVAL_SECONDS["day"] * NANOSECONDS_PER_SECOND
+
+# The epoch fell on a Thursday, three days after the start of its week.
+EPOCH_WEEKDAY = 3
+
+
+def bucket_starts(begins_at, interval):
+    """
+    Returns the begins_at of the coarser bar that each bar falls into.
+
+    Intraday buckets are anchored at the first bar of each session, so hour bars of a session opening at 14:30 UTC
+    begin at 14:30, 15:30, and so on, and no bucket spans two sessions. Day bars begin at midnight UTC and week bars
+    at midnight UTC on Monday, matching the bars returned by get_stock_historicals().
+
+    :param begins_at: Sorted array of nanoseconds since the epoch
+    :param interval: Interval of the coarser bars
+    :return: Array of nanoseconds since the epoch
+    """
+
+    day_starts = begins_at - begins_at % DAY_NANOSECONDS
+
+    if interval == "day":
+        return day_starts
+
+    if interval == "week":
+        weekdays = (day_starts // DAY_NANOSECONDS + EPOCH_WEEKDAY) % 7
+        return day_starts - weekdays * DAY_NANOSECONDS
+
+    # Find the first bar of each session.
+    is_session_open = np.empty(len(begins_at), dtype=bool)
+    is_session_open[:1] = True
+    is_session_open[1:] = day_starts[1:] != day_starts[:-1]
+    session_opens = begins_at[is_session_open][np.cumsum(is_session_open) - 1]
+
+    bucket_length = INTERVAL_SECONDS[interval] * NANOSECONDS_PER_SECOND
+
+    return session_opens + (begins_at - session_opens) // bucket_length * bucket_length
+
+
+def resample_columns(columns, interval, start=0):
+    """
+    Builds bars of a coarser interval from finer bars.
+
+    Each coarser bar opens at the open of its first finer bar and closes at the close of its last one, spans their
+    highest high and lowest low, and sums their volume. It takes the session of its first finer bar and is
+    interpolated if any of its finer bars is.
+
+    Only the bars from start onward are resampled, but the coarser bar holding the bar at start also takes in the bars
+    before it that fall into the same bucket, so trimming the finer bars to a span never cuts a coarser bar short.
+    The first week bar is dropped if the finer bars begin after its Monday, as it would miss the days before. The last
+    bar is kept even while it is still forming, like the current bar returned by get_stock_historicals().
+
+    :param columns: Dict mapping each name in COLUMN_DTYPES to an array sorted by begins_at
+    :param interval: Interval of the coarser bars
+    :param start: Position of the first finer bar to resample. Default is 0
+    :return: Dict mapping each name in COLUMN_DTYPES to an array
+    """
+
+    buckets = bucket_starts(np.asarray(columns["begins_at"]), interval)
+    end = len(buckets)
+
+    if start < end:
+        # Widen start to the first bar of its bucket.
+        start = int(np.searchsorted(buckets, buckets[start], side="left"))
+
+    if interval == "week" and start < end:
+        first_day_start = columns["begins_at"][start] - columns["begins_at"][start] % DAY_NANOSECONDS
+
+        # The first week began before the first bar, whose earlier days are missing.
+        if start == 0 and first_day_start != buckets[0]:
+            start = int(np.searchsorted(buckets, buckets[0], side="right"))
+
+    if start >= end:
+        return {column: values[:0] for column, values in columns.items()}
+
+    columns = {column: values[start:end] for column, values in columns.items()}
+    buckets = buckets[start:end]
+
+    # Bars are sorted, so every bucket is a contiguous run of bars.
+    is_first_in_bucket = np.empty(len(buckets), dtype=bool)
+    is_first_in_bucket[0] = True
+    is_first_in_bucket[1:] = buckets[1:] != buckets[:-1]
+
+    firsts = np.flatnonzero(is_first_in_bucket)
+    lasts = np.append(firsts[1:], len(buckets)) - 1
+
+    return {
+        "begins_at": buckets[firsts],
+        "open_price": np.asarray(columns["open_price"])[firsts],
+        "high_price": np.maximum.reduceat(columns["high_price"], firsts),
+        "low_price": np.minimum.reduceat(columns["low_price"], firsts),
+        "close_price": np.asarray(columns["close_price"])[lasts],
+        "volume": np.add.reduceat(columns["volume"], firsts),
+        "session": np.asarray(columns["session"])[firsts],
+        "interpolated": np.logical_or.reduceat(columns["interpolated"], firsts),
+    }
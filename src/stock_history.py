@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+
+# Data type of each typed column. begins_at holds nanoseconds since the epoch so that it can be viewed as a UTC
+# DatetimeIndex without conversion, and session holds a code into SESSIONS.
+COLUMN_DTYPES = {
+    "begins_at": np.dtype(np.int64),
+    "open_price": np.dtype(np.float64),
+    "high_price": np.dtype(np.float64),
+    "low_price": np.dtype(np.float64),
+    "close_price": np.dtype(np.float64),
+    "volume": np.dtype(np.int64),
+    "session": np.dtype(np.int8),
+    "interpolated": np.dtype(np.bool_),
+}
+
+# Trading sessions a bar can belong to. Bars with an unknown session get the code -1.
+SESSIONS = ("pre", "reg", "post")
+SESSION_CODES = {session: code for code, session in enumerate(SESSIONS)}
+
+# Packed layout of one bar: 52 bytes, against well over a kilobyte for a bar as returned by get_stock_historicals().
+# symbol holds a code into the symbols of the BarBatch the bar belongs to.
+BAR_DTYPE = np.dtype([("symbol", np.int16)] + list(COLUMN_DTYPES.items()))
+
+NANOSECONDS_PER_SECOND = 1_000_000_000
+
+
+class BarBatch:
+    __slots__ = ("bars", "symbols")
+
+    def __init__(self, bars, symbols):
+        """
+        Bars of one or more symbols packed into a single structured array of BAR_DTYPE.
+
+        :param bars: numpy array of BAR_DTYPE sorted by symbol, then begins_at
+        :param symbols: Tuple of the symbols the symbol codes of bars refer to
+        """
+
+        self.bars = bars
+        self.symbols = symbols
+
+    @classmethod
+    def from_stock_history(cls, stock_history):
+        """
+        Packs bars as returned by get_stock_historicals() into a BarBatch.
+
+        :param stock_history: List of bars, each sorted by begins_at within its symbol
+        :return: BarBatch
+        """
+
+        bars = np.empty(len(stock_history), dtype=BAR_DTYPE)
+
+        symbols, symbol_codes = np.unique([bar.get("symbol", "") for bar in stock_history], return_inverse=True)
+        bars["symbol"] = symbol_codes
+        bars["begins_at"] = pd.to_datetime([bar["begins_at"] for bar in stock_history], utc=True).asi8
+        bars["session"] = [SESSION_CODES.get(bar.get("session"), -1) for bar in stock_history]
+        bars["interpolated"] = [bar.get("interpolated", False) for bar in stock_history]
+
+        for column in ["open_price", "high_price", "low_price", "close_price", "volume"]:
+            bars[column] = np.array([bar[column] for bar in stock_history], dtype=COLUMN_DTYPES[column])
+
+        # A multi-symbol response lists each symbol's bars together, so the stable sort only matters for odd input.
+        if len(symbols) > 1:
+            bars = bars[np.argsort(bars["symbol"], kind="stable")]
+
+        return cls(bars, tuple(str(symbol) for symbol in symbols))
+
+    def __len__(self):
+        return len(self.bars)
+
+    def columns(self):
+        """
+        Returns the bars as column arrays that are views into the batch.
+
+        :return: Dict mapping each name in COLUMN_DTYPES to a numpy array
+        """
+
+        return {column: self.bars[column] for column in COLUMN_DTYPES}
+
+    def select(self, symbol):
+        """
+        Returns the bars of one symbol.
+
+        :param symbol: A company's ticker symbol as a string
+        :return: BarBatch viewing the bars of symbol; empty if the batch holds none
+        """
+
+        symbol = symbol.upper()
+
+        if symbol not in self.symbols:
+            return BarBatch(self.bars[:0], (symbol,))
+
+        code = self.symbols.index(symbol)
+        start, end = np.searchsorted(self.bars["symbol"], [code, code + 1])
+
+        return BarBatch(self.bars[start:end], self.symbols)
+
+
+def columns_from_stock_history(stock_history):
+    """
+    Converts bars as returned by get_stock_historicals() into typed column arrays.
+
+    The columns are views into a single BarBatch, so the bars are stored in its packed layout.
+
+    :param stock_history: List of bars sorted by begins_at
+    :return: Dict mapping each name in COLUMN_DTYPES to a numpy array
+    """
+
+    return BarBatch.from_stock_history(stock_history).columns()
+
+
+def columns_to_dataframe(columns):
+    """
+    Wraps column arrays in a DataFrame indexed by begins_at without copying them.
+
+    :param columns: Dict mapping each name in COLUMN_DTYPES to a numpy array
+    :return: DataFrame with a UTC DatetimeIndex named begins_at
+    """
+
+    begins_at = pd.arrays.DatetimeArray(
+        columns["begins_at"].view("datetime64[ns]"), dtype=pd.DatetimeTZDtype("ns", "UTC"), copy=False
+    )
+    index = pd.DatetimeIndex(begins_at, name="begins_at", copy=False)
+
+    data = {column: columns[column] for column in COLUMN_DTYPES if column != "begins_at"}
+    data["session"] = pd.Categorical.from_codes(columns["session"], categories=SESSIONS)
+
+    return pd.DataFrame(data, index=index, copy=False)
+
+
+def parse_stock_history(stock_history):
+    """
+    Parses bars as returned by get_stock_historicals() into a typed DataFrame.
+
+    Prices are float64, volume is int64, session is categorical, and the bars are indexed by their begins_at
+    timestamp, so indicators can use the columns directly without converting them again.
+
+    :param stock_history: List of bars sorted by begins_at
+    :return: DataFrame with a UTC DatetimeIndex named begins_at; empty if stock_history holds no bars
+    """
+
+    # Failed requests come back as None or [None].
+    if not stock_history or stock_history[0] is None:
+        return pd.DataFrame()
+
+    return columns_to_dataframe(columns_from_stock_history(stock_history))
+
+
+def numeric_column(stock_history_df, column):
+    """
+    Returns a column of stock_history_df as numbers without modifying stock_history_df.
+
+    Typed DataFrames from parse_stock_history() are returned as is; columns of untyped DataFrames are converted.
+
+    :param stock_history_df: DataFrame containing the stock's history
+    :param column: Name of the column
+    :return: Series of numbers
+    """
+
+    values = stock_history_df[column]
+
+    if pd.api.types.is_numeric_dtype(values):
+        return values
+
+    return pd.to_numeric(values, errors="coerce")
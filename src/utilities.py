@@ -23,9 +23,41 @@ class RobinhoodCredentials:
         self.user = os.getenv("ROBINHOOD_USER")
         self.password = os.getenv("ROBINHOOD_PASS")
         self.mfa_code = os.getenv("ROBINHOOD_MFA_CODE")
+        self.session_path = os.getenv(
+            "ROBINHOOD_SESSION_PATH", os.path.join(os.path.expanduser("~"), ".tokens", "robinhood-trading-bot.json")
+        )
 
     @property
     def empty_credentials(self):
         """Returns True is any credential is empty; False otherwise"""
 
         return not (bool(self.user) and bool(self.password) and bool(self.mfa_code))
+
+
+class CacheSettings:
+    def __init__(self):
+        self.cache_dir = os.getenv(
+            "TRADEBOT_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "robinhood-trading-bot")
+        )
+        self.history_cache_max_bytes = int(os.getenv("TRADEBOT_HISTORY_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+        self.quote_max_staleness_ms = int(os.getenv("TRADEBOT_QUOTE_MAX_STALENESS_MS", 1000))
+        self.account_snapshot_max_age_seconds = float(os.getenv("TRADEBOT_ACCOUNT_SNAPSHOT_MAX_AGE_SECONDS", 60))
+
+
+class HttpSessionSettings:
+    def __init__(self):
+        self.pool_size = int(os.getenv("TRADEBOT_HTTP_POOL_SIZE", 16))
+        self.max_retries = int(os.getenv("TRADEBOT_HTTP_MAX_RETRIES", 3))
+        self.retry_backoff_factor = float(os.getenv("TRADEBOT_HTTP_RETRY_BACKOFF_FACTOR", 0.5))
+        self.rate_limit_per_second = float(os.getenv("TRADEBOT_RATE_LIMIT_PER_SECOND", 5))
+        self.rate_limit_burst = int(os.getenv("TRADEBOT_RATE_LIMIT_BURST", 10))
+
+
+class WarmupSettings:
+    def __init__(self):
+        self.universe = [
+            ticker.strip().upper() for ticker in os.getenv("TRADEBOT_UNIVERSE", "").split(",") if ticker.strip()
+        ]
+        self.market_open = os.getenv("TRADEBOT_MARKET_OPEN", "09:30")
+        self.market_timezone = os.getenv("TRADEBOT_MARKET_TIMEZONE", "America/New_York")
+        self.warmup_lead_seconds = float(os.getenv("TRADEBOT_WARMUP_LEAD_SECONDS", 15 * 60))
@@ -0,0 +1,116 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from src.utilities import WarmupSettings
+
+
+def next_market_open(now, settings=None):
+    """
+    Returns the next time the market opens after now. Markets open on weekdays at settings.market_open; holidays are
+    not taken into account.
+
+    :param now: Seconds since the epoch
+    :param settings: WarmupSettings; read from the environment by default
+    :return: Seconds since the epoch
+    """
+
+    settings = settings or WarmupSettings()
+    market_timezone = ZoneInfo(settings.market_timezone)
+    hour, minute = (int(part) for part in settings.market_open.split(":"))
+    day = datetime.fromtimestamp(now, market_timezone).date()
+
+    while True:
+        opens_at = datetime(day.year, day.month, day.day, hour, minute, tzinfo=market_timezone).timestamp()
+
+        if day.weekday() < 5 and now < opens_at:
+            return opens_at
+
+        day += timedelta(days=1)
+
+
+class WarmupScheduler:
+    def __init__(self, bots, tickers=None, settings=None):
+        """
+        Warms up bots ahead of every market open, so that their first trading cycle finds every cache filled.
+
+        Each warmup runs settings.warmup_lead_seconds before the open on a daemon timer, which schedules the warmup of
+        the next open once it is done. A scheduler started less than that before the open warms up right away.
+
+        :param bots: A list of TradeBots
+        :param tickers: A list of company ticker symbols as strings; defaults to the universe in TRADEBOT_UNIVERSE
+        :param settings: WarmupSettings; read from the environment by default
+        """
+
+        self.settings = settings or WarmupSettings()
+        self.bots = list(bots)
+        self.tickers = self.settings.universe if tickers is None else list(tickers)
+        self.last_warmup_counts = []
+
+        self._lock = threading.Lock()
+        self._timer = None
+
+    @property
+    def scheduled(self):
+        """Returns True if a warmup is scheduled; False otherwise."""
+
+        return self._timer is not None
+
+    def run(self):
+        """
+        Warms up every bot now. A bot whose warmup fails is left cold, and the failure is reported.
+
+        :return: List holding the dict returned by TradeBot.warm_up() for each bot, or None if its warmup failed
+        """
+
+        warmup_counts = []
+
+        for bot in self.bots:
+            try:
+                warmup_counts.append(bot.warm_up(self.tickers))
+
+            except Exception as error:
+                print(f"ERROR: Warmup of {type(bot).__name__} failed: {error}")
+                warmup_counts.append(None)
+
+        self.last_warmup_counts = warmup_counts
+
+        return warmup_counts
+
+    def start(self):
+        """Schedules the warmup of the next market open. Schedulers that are already started are left as is."""
+
+        with self._lock:
+            if self._timer is None:
+                self._schedule(time.time())
+
+    def stop(self):
+        """Cancels the scheduled warmup. A warmup that is already running is finished but not rescheduled."""
+
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _schedule(self, now):
+        """Starts the timer of the warmup of the first market open after now. Must be called holding the lock."""
+
+        opens_at = next_market_open(now, self.settings)
+        delay = max(0.0, opens_at - self.settings.warmup_lead_seconds - time.time())
+
+        self._timer = threading.Timer(delay, self._warm_up_before, args=(opens_at,))
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _warm_up_before(self, opens_at):
+        """Runs the warmup of the market open at opens_at and schedules the warmup of the open after it."""
+
+        self.run()
+
+        with self._lock:
+            # The scheduler was stopped while the warmup was running.
+            if self._timer is None:
+                return
+
+            self._schedule(max(time.time(), opens_at))
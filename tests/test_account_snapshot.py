@@ -0,0 +1,166 @@
+import pytest
+
+from src import login_session
+from src.account_snapshot import AccountSnapshot
+from src.bots import base_trade_bot
+from src.bots.base_trade_bot import OrderType, TradeBot
+from src.login_session import SessionManager
+from src.quote_cache import quote_cache
+
+HOLDINGS_SAMPLE = {
+    "AAPL": {"price": "150.000000", "quantity": "2.00000000", "equity": "300.00"},
+    "GOOG": {"price": "2900.000000", "quantity": "0.10000000", "equity": "290.00"},
+}
+
+
+class TestAccountSnapshot:
+    def test_snapshot(self):
+        account_snapshot = AccountSnapshot("100.50", HOLDINGS_SAMPLE)
+
+        assert account_snapshot.buying_power == 100.50
+        assert account_snapshot.total_equity == 590.0
+        assert account_snapshot.positions["AAPL"] == {"quantity": 2.0, "equity": 300.0}
+        assert account_snapshot.age >= 0
+
+    @pytest.mark.parametrize(
+        "ticker,expected",
+        [
+            ("AAPL", 300.0),
+            ("goog", 290.0),
+            ("META", 0),
+        ],
+    )
+    def test_get_equity_in_position(self, ticker, expected):
+        assert AccountSnapshot(0, HOLDINGS_SAMPLE).get_equity_in_position(ticker) == expected
+
+    def test_record_purchase(self):
+        account_snapshot = AccountSnapshot(100.0, HOLDINGS_SAMPLE)
+        account_snapshot.record_purchase("AAPL", 75.0)
+        account_snapshot.record_purchase("META", 10.0)
+
+        assert account_snapshot.buying_power == 15.0
+        assert account_snapshot.positions["AAPL"] == {"quantity": 2.5, "equity": 375.0}
+        assert account_snapshot.get_equity_in_position("META") == 10.0
+
+    def test_record_sale(self):
+        account_snapshot = AccountSnapshot(100.0, HOLDINGS_SAMPLE)
+        account_snapshot.record_sale("AAPL", 150.0)
+        account_snapshot.record_sale("GOOG", 290.0)
+        account_snapshot.record_sale("META", 10.0)
+
+        # Proceeds are only credited once the sales fill.
+        assert account_snapshot.buying_power == 100.0
+        assert account_snapshot.positions == {"AAPL": {"quantity": 1.0, "equity": 150.0}}
+
+
+class TestSharedAccountSnapshot:
+    @pytest.fixture
+    def account(self, monkeypatch):
+        account = {"buying_power": 100.0, "loads": 0, "orders": []}
+
+        def get_current_cash_position(trade_bot):
+            account["loads"] += 1
+            return account["buying_power"]
+
+        def order_buy_fractional_by_price(ticker, amount_in_dollars, **kwargs):
+            account["orders"].append((ticker, amount_in_dollars))
+            return {"id": len(account["orders"])}
+
+        monkeypatch.setattr(login_session, "configure_robinhood_session", lambda: None)
+        monkeypatch.setattr(login_session, "login", lambda: None)
+        monkeypatch.setattr(login_session.robinhood, "logout", lambda: None)
+        monkeypatch.setattr(base_trade_bot, "session_manager", SessionManager())
+        monkeypatch.setattr(TradeBot, "get_current_cash_position", get_current_cash_position)
+        monkeypatch.setattr(TradeBot, "get_open_positions", lambda trade_bot: HOLDINGS_SAMPLE)
+        monkeypatch.setattr(
+            TradeBot, "make_order_recommendation", lambda trade_bot, ticker: OrderType.BUY_RECOMMENDATION
+        )
+        monkeypatch.setattr(
+            base_trade_bot.robinhood.orders, "order_buy_fractional_by_price", order_buy_fractional_by_price
+        )
+
+        return account
+
+    def test_trade_checks_a_new_snapshot(self, account):
+        trade_bot = TradeBot()
+        trade_bot.refresh_account_snapshot()
+
+        # Funds were deposited since the last snapshot.
+        account["buying_power"] = 500.0
+
+        assert trade_bot.trade("AAPL", 200.0) == {"id": 1}
+        assert account["loads"] == 2
+        assert trade_bot.account_snapshot.buying_power == 300.0
+
+    def test_hold_loads_no_snapshot(self, account, monkeypatch):
+        monkeypatch.setattr(
+            TradeBot, "make_order_recommendation", lambda trade_bot, ticker: OrderType.HOLD_RECOMMENDATION
+        )
+        trade_bot = TradeBot()
+
+        assert trade_bot.trade("AAPL", 200.0) == {}
+        assert trade_bot.make_order_recommendations(["AAPL"]) == {"AAPL": OrderType.HOLD_RECOMMENDATION}
+        assert account["loads"] == 0
+        assert not trade_bot.logged_in
+
+    def test_bots_of_a_session_share_the_snapshot(self, account):
+        first_bot = TradeBot()
+        second_bot = TradeBot()
+        first_bot.ensure_logged_in()
+        second_bot.ensure_logged_in()
+
+        first_bot.refresh_account_snapshot()
+        first_bot.place_buy_order("AAPL", 60.0)
+
+        # The second bot sees the purchase of the first and does not spend the same funds.
+        assert second_bot.account_snapshot is first_bot.account_snapshot
+        assert second_bot.place_buy_order("AAPL", 60.0) == {}
+        assert account["loads"] == 1
+        assert account["orders"] == [("AAPL", 60.0)]
+
+        first_bot.robinhood_logout()
+        second_bot.robinhood_logout()
+
+        assert first_bot.account_snapshot is None
+
+
+class TestOpenPositions:
+    @pytest.fixture
+    def trade_bot(self, monkeypatch):
+        open_stock_positions = [
+            {"symbol": "AAPL", "instrument": "", "quantity": "2.00000000"},
+            {"symbol": "GOOG", "instrument": "", "quantity": "0.10000000", "average_buy_price": "2800.0000"},
+            {"symbol": "META", "instrument": "", "quantity": "1.00000000", "average_buy_price": "0.0000"},
+        ]
+
+        monkeypatch.setattr(base_trade_bot, "session_manager", SessionManager())
+        monkeypatch.setattr(base_trade_bot.session_manager, "acquire", lambda: None)
+        monkeypatch.setattr(base_trade_bot.robinhood.account, "get_open_stock_positions", lambda: open_stock_positions)
+        monkeypatch.setattr(TradeBot, "get_current_market_prices", lambda trade_bot, tickers: {"AAPL": 150.0})
+        quote_cache.clear()
+
+        yield TradeBot()
+
+        quote_cache.clear()
+
+    def test_unquoted_position_keeps_its_last_known_price(self, trade_bot):
+        quote_cache.put("GOOG", 2900.0)
+        quote_cache.put("META", 300.0)
+
+        assert trade_bot.get_open_positions() == {
+            "AAPL": {"quantity": 2.0, "price": 150.0, "equity": 300.0},
+            "GOOG": {"quantity": 0.1, "price": 2900.0, "equity": 290.0},
+            "META": {"quantity": 1.0, "price": 300.0, "equity": 300.0},
+        }
+
+    def test_last_known_price_from_the_account_snapshot(self, trade_bot):
+        trade_bot.account_snapshot = AccountSnapshot(0, HOLDINGS_SAMPLE)
+
+        assert trade_bot.get_open_positions()["GOOG"]["equity"] == pytest.approx(290.0)
+
+    def test_unpriced_position_falls_back_to_its_average_buy_price(self, trade_bot, capsys):
+        open_positions = trade_bot.get_open_positions()
+
+        assert open_positions["GOOG"] == {"quantity": 0.1, "price": 2800.0, "equity": pytest.approx(280.0)}
+        assert open_positions["META"] == {"quantity": 1.0, "price": 0.0, "equity": 0.0}
+        assert "ERROR: No market price is available for META" in capsys.readouterr().out
@@ -0,0 +1,144 @@
+import numpy as np
+import pytest
+
+from src.bar_store import BarStore, span_start
+from src.bots import base_trade_bot
+from src.bots.base_trade_bot import TradeBot
+from src.history_cache import parse_begins_at
+from src.stock_history import COLUMN_DTYPES, columns_from_stock_history
+from tests.configs import AAPL_STOCK_HISTORY_SAMPLE, STOCK_HISTORY_SAMPLE
+
+
+class TestBarStore:
+    @pytest.mark.parametrize(
+        "stock_history,time_span,now,expected_length",
+        [
+            ([], "year", "2021-11-09T00:00:00Z", 0),
+            (STOCK_HISTORY_SAMPLE, "year", "2021-11-09T00:00:00Z", 252),
+            (STOCK_HISTORY_SAMPLE, "week", "2021-11-09T00:00:00Z", 5),
+            (STOCK_HISTORY_SAMPLE, "day", "2021-11-09T00:00:00Z", 1),
+            (AAPL_STOCK_HISTORY_SAMPLE, "day", "2021-11-09T21:00:00Z", 78),
+        ],
+    )
+    def test_span_start(self, stock_history, time_span, now, expected_length):
+        begins_at = columns_from_stock_history(stock_history)["begins_at"]
+        start = span_start(begins_at, time_span, parse_begins_at(now))
+
+        assert len(begins_at) - start == expected_length
+
+    def test_read_empty_series(self, tmp_path):
+        bar_store = BarStore(store_dir=tmp_path)
+
+        assert bar_store.read_metadata("AAPL", "day") is None
+        assert bar_store.read_frame("AAPL", "day").empty
+
+    def test_read_frame_is_memory_mapped(self, tmp_path):
+        bar_store = BarStore(store_dir=tmp_path)
+        bar_store.append("AAPL", "5minute", columns_from_stock_history(AAPL_STOCK_HISTORY_SAMPLE), "day", 0)
+
+        stock_history_df = bar_store.read_frame("AAPL", "5minute")
+
+        assert isinstance(stock_history_df["close_price"].values, np.memmap)
+        assert isinstance(stock_history_df["volume"].values, np.memmap)
+        assert stock_history_df.index[0].isoformat() == "2021-11-09T14:30:00+00:00"
+        assert round(stock_history_df["close_price"].mean(), 2) == 150.83
+
+    def test_append_replaces_forming_bar(self, tmp_path):
+        bar_store = BarStore(store_dir=tmp_path)
+        forming_bar = dict(AAPL_STOCK_HISTORY_SAMPLE[49], volume=1)
+
+        bar_store.append(
+            "AAPL", "5minute", columns_from_stock_history(AAPL_STOCK_HISTORY_SAMPLE[:49] + [forming_bar]), "day", 0
+        )
+        bar_store.append("AAPL", "5minute", columns_from_stock_history(AAPL_STOCK_HISTORY_SAMPLE[49:]), "day", 1)
+
+        expected = columns_from_stock_history(AAPL_STOCK_HISTORY_SAMPLE)
+        columns = bar_store.read("AAPL", "5minute")
+
+        assert bar_store.read_metadata("AAPL", "5minute") == {
+            "length": 78,
+            "time_span": "day",
+            "expires_at": 1,
+            "columns": list(COLUMN_DTYPES),
+            "generation": 1,
+        }
+
+        for column, values in expected.items():
+            assert np.array_equal(columns[column], values)
+
+    def test_append_shorter_history(self, tmp_path):
+        bar_store = BarStore(store_dir=tmp_path)
+        bar_store.append("AAPL", "5minute", columns_from_stock_history(AAPL_STOCK_HISTORY_SAMPLE), "day", 0)
+        bar_store.append("AAPL", "5minute", columns_from_stock_history(AAPL_STOCK_HISTORY_SAMPLE[:10]), "day", 0)
+
+        assert len(bar_store.read("AAPL", "5minute")["begins_at"]) == 10
+
+    def test_series_with_other_columns_is_missing(self, tmp_path):
+        bar_store = BarStore(store_dir=tmp_path)
+        bar_store.append("AAPL", "5minute", columns_from_stock_history(AAPL_STOCK_HISTORY_SAMPLE), "day", 0)
+        bar_store._write_metadata(
+            "AAPL", "5minute", {"length": 78, "time_span": "day", "expires_at": 0, "generation": 0}
+        )
+
+        assert bar_store.read_metadata("AAPL", "5minute") is None
+        assert len(bar_store.read("AAPL", "5minute")["begins_at"]) == 0
+
+    def test_series_with_short_column_files_is_missing(self, tmp_path):
+        bar_store = BarStore(store_dir=tmp_path)
+        bar_store.append("AAPL", "5minute", columns_from_stock_history(AAPL_STOCK_HISTORY_SAMPLE), "day", 0)
+
+        # The metadata claims more bars than the column files hold.
+        metadata = bar_store.read_metadata("AAPL", "5minute")
+        bar_store._write_metadata("AAPL", "5minute", dict(metadata, length=79))
+
+        assert bar_store.read_metadata("AAPL", "5minute") is None
+        assert len(bar_store.read("AAPL", "5minute")["begins_at"]) == 0
+
+    def test_append_keeps_earlier_reads_intact(self, tmp_path):
+        bar_store = BarStore(store_dir=tmp_path)
+        bar_store.append("AAPL", "5minute", columns_from_stock_history(AAPL_STOCK_HISTORY_SAMPLE), "day", 0)
+        columns = bar_store.read("AAPL", "5minute")
+        close_prices = np.array(columns["close_price"])
+
+        replaced_bars = [dict(bar, close_price="1.00") for bar in AAPL_STOCK_HISTORY_SAMPLE[10:]]
+        bar_store.append("AAPL", "5minute", columns_from_stock_history(replaced_bars), "day", 0)
+
+        # Column files are replaced rather than written in place, and files of older generations are removed.
+        assert np.array_equal(columns["close_price"], close_prices)
+        assert np.all(bar_store.read("AAPL", "5minute")["close_price"][10:] == 1.0)
+        assert sorted(path.name for path in (tmp_path / "bars" / "5minute" / "AAPL").iterdir()) == sorted(
+            [f"{column}.1.bin" for column in COLUMN_DTYPES] + ["metadata.json"]
+        )
+
+
+class TestSyncStockHistory:
+    @pytest.mark.parametrize(
+        "now,expected_span",
+        [
+            ("2021-11-09T21:00:00Z", "day"),
+            ("2021-11-12T21:00:00Z", "week"),
+            # No intraday span reaches back this far, so the whole synced span is fetched again.
+            ("2021-11-29T21:00:00Z", "week"),
+        ],
+    )
+    def test_requests_a_span_accepted_for_the_interval(self, tmp_path, monkeypatch, now, expected_span):
+        requested_spans = []
+
+        def get_stock_historicals(ticker, interval, span):
+            requested_spans.append(span)
+            return AAPL_STOCK_HISTORY_SAMPLE
+
+        monkeypatch.setenv("TRADEBOT_CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(base_trade_bot.time, "time", lambda: parse_begins_at(now))
+        monkeypatch.setattr(base_trade_bot.robinhood.stocks, "get_stock_historicals", get_stock_historicals)
+
+        trade_bot = TradeBot()
+        monkeypatch.setattr(trade_bot, "ensure_logged_in", lambda: None)
+        trade_bot.bar_store.append(
+            "AAPL", "5minute", columns_from_stock_history(AAPL_STOCK_HISTORY_SAMPLE[:-1]), "week", 0
+        )
+
+        trade_bot.sync_stock_history("AAPL", "5minute", "day")
+
+        assert requested_spans == [expected_span]
+        assert trade_bot.bar_store.read_metadata("AAPL", "5minute")["length"] == len(AAPL_STOCK_HISTORY_SAMPLE)
@@ -27,6 +27,16 @@ class TestTradeBot:
         portfolio = self.trade_bot.get_current_positions()
         assert isinstance(portfolio, dict)
 
+    def test_get_open_positions(self):
+        """Tests TradeBot.get_open_positions()."""
+
+        open_positions = self.trade_bot.get_open_positions()
+        assert set(open_positions) == set(self.trade_bot.get_current_positions())
+
+        for position in open_positions.values():
+            assert position["equity"] >= 0.00
+            assert position["equity"] == pytest.approx(position["quantity"] * position["price"])
+
     def test_get_current_cash_position(self):
         """Tests TradeBot.get_current_cash_position()."""
 
@@ -63,6 +73,24 @@ class TestTradeBot:
         assert isinstance(market_price, float)
         assert market_price >= 0.00
 
+    @pytest.mark.parametrize(
+        "tickers,include_extended_hours",
+        [
+            ([], False),
+            (["AAPL", "GOOG", "META"], False),
+            (["AAPL", "GOOG", "META"], True),
+        ],
+    )
+    def test_get_current_market_prices(self, tickers, include_extended_hours):
+        """Tests TradeBot.get_current_market_prices()."""
+
+        market_prices = self.trade_bot.get_current_market_prices(tickers, include_extended_hours=include_extended_hours)
+        assert list(market_prices) == tickers
+
+        for market_price in market_prices.values():
+            assert isinstance(market_price, float)
+            assert market_price >= 0.00
+
     @pytest.mark.parametrize(
         "ticker,expected",
         [
@@ -124,6 +152,25 @@ class TestTradeBot:
 
         assert stock_history_df.empty if empty_dataframe else not stock_history_df.empty
 
+    @pytest.mark.parametrize(
+        "tickers,interval,time_span",
+        [
+            (["AAPL", "GOOG", "META"], "day", "year"),
+            (["AAPL", "GOOG", "META"], "5minute", "day"),
+            (["AAPL", "AAPL", ""], "day", "year"),
+        ],
+    )
+    def test_get_stock_history_frames(self, tickers, interval, time_span):
+        """Tests TradeBot.get_stock_history_frames()."""
+
+        stock_history_frames = self.trade_bot.get_stock_history_frames(tickers, interval=interval, time_span=time_span)
+
+        assert list(stock_history_frames) == [ticker for ticker in dict.fromkeys(tickers) if ticker]
+
+        for ticker, stock_history_df in stock_history_frames.items():
+            expected_df = self.trade_bot.get_stock_history_dataframe(ticker, interval=interval, time_span=time_span)
+            assert stock_history_df.equals(expected_df)
+
     @pytest.mark.skipif(
         TEST_MODE in [_TestMode.SKIP_ALL_MARKET_ORDERS],
         reason="Current TestMode selected will skip this test!",
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from src.data_quality import (
+    ALL_FLAGS,
+    FLAG_EXTENDED_HOURS,
+    FLAG_GAP,
+    FLAG_INTERPOLATED,
+    FLAG_ZERO_VOLUME,
+    flag_bars,
+    mask_flagged,
+)
+from src.stock_history import parse_stock_history
+from tests.configs import AAPL_STOCK_HISTORY_SAMPLE, STOCK_HISTORY_SAMPLE
+
+
+def flawed_stock_history():
+    """Returns the AAPL sample with one bar of each kind of flaw."""
+
+    stock_history = [dict(bar) for bar in AAPL_STOCK_HISTORY_SAMPLE]
+    stock_history[3]["interpolated"] = True
+    stock_history[5]["volume"] = 0
+    stock_history[-1]["session"] = "post"
+
+    # Drop two bars, leaving a gap before the bar that followed them.
+    del stock_history[10:12]
+
+    return stock_history
+
+
+class TestDataQuality:
+    def test_flag_bars(self):
+        stock_history_df = flag_bars(parse_stock_history(flawed_stock_history()), "5minute")
+        quality = stock_history_df["quality"].to_numpy()
+
+        assert quality.dtype == np.uint8
+        assert quality[3] == FLAG_INTERPOLATED
+        assert quality[5] == FLAG_ZERO_VOLUME
+        assert quality[10] == FLAG_GAP
+        assert quality[-1] == FLAG_EXTENDED_HOURS
+        assert np.count_nonzero(quality) == 4
+
+    def test_no_gaps_between_sessions(self):
+        stock_history_df = flag_bars(parse_stock_history(STOCK_HISTORY_SAMPLE), "day")
+
+        assert not stock_history_df["quality"].any()
+
+    def test_flag_empty_bars(self):
+        assert flag_bars(pd.DataFrame(), "day").empty
+
+    def test_mask_flagged(self):
+        stock_history_df = flag_bars(parse_stock_history(flawed_stock_history()), "5minute")
+
+        assert len(mask_flagged(stock_history_df)) == 72
+        assert len(mask_flagged(stock_history_df, FLAG_INTERPOLATED | FLAG_ZERO_VOLUME)) == 74
+        assert mask_flagged(stock_history_df, 0) is stock_history_df
+        assert len(stock_history_df) == 76
+
+    def test_mask_without_quality_column(self):
+        stock_history_df = pd.DataFrame(AAPL_STOCK_HISTORY_SAMPLE)
+
+        assert mask_flagged(stock_history_df, ALL_FLAGS) is stock_history_df
@@ -0,0 +1,125 @@
+import os
+
+import pytest
+
+from src import history_cache
+from src.history_cache import HistoryCache, entry_expiry, parse_begins_at, smallest_covering_span
+from tests.configs import AAPL_STOCK_HISTORY_SAMPLE, STOCK_HISTORY_SAMPLE
+
+
+class TestHistoryCache:
+    @pytest.mark.parametrize(
+        "interval,stock_history,fetched_at,expected",
+        [
+            # Daily bars that have all closed stay valid until the next session opens or the next bar closes.
+            ("day", STOCK_HISTORY_SAMPLE, "2021-11-09T10:00:00Z", "2021-11-09T14:30:00Z"),
+            ("day", [{"begins_at": "2021-11-12T00:00:00Z"}], "2021-11-13T10:00:00Z", "2021-11-14T00:00:00Z"),
+            # Bars of the sessions that opened since the last bar are missing, so they are fetched again soon.
+            ("day", STOCK_HISTORY_SAMPLE, "2021-11-09T15:00:00Z", "2021-11-09T15:05:00Z"),
+            ("day", STOCK_HISTORY_SAMPLE, "2021-11-13T10:00:00Z", "2021-11-13T10:05:00Z"),
+            # A daily bar that is still forming is refreshed like an intraday bar.
+            ("day", STOCK_HISTORY_SAMPLE, "2021-11-08T15:00:00Z", "2021-11-08T15:05:00Z"),
+            # Intraday bars expire with the interval.
+            ("5minute", AAPL_STOCK_HISTORY_SAMPLE, "2021-11-09T20:57:00Z", "2021-11-09T21:00:00Z"),
+            ("5minute", AAPL_STOCK_HISTORY_SAMPLE, "2021-11-09T21:01:00Z", "2021-11-09T21:05:00Z"),
+        ],
+    )
+    def test_entry_expiry(self, interval, stock_history, fetched_at, expected):
+        assert entry_expiry(interval, stock_history, parse_begins_at(fetched_at)) == parse_begins_at(expected)
+
+    def test_get_returns_stored_history(self, tmp_path, monkeypatch):
+        cache = HistoryCache(cache_dir=tmp_path)
+        monkeypatch.setattr(history_cache.time, "time", lambda: parse_begins_at("2021-11-09T10:00:00Z"))
+
+        assert cache.get("AAPL", "day", "year") is None
+
+        cache.put("AAPL", "day", "year", STOCK_HISTORY_SAMPLE)
+        assert cache.get("aapl", "day", "year") == STOCK_HISTORY_SAMPLE
+        assert cache.get("AAPL", "day", "5year") is None
+
+        # A second cache over the same directory sees the entry, as another process would.
+        assert HistoryCache(cache_dir=tmp_path).get("AAPL", "day", "year") == STOCK_HISTORY_SAMPLE
+
+    def test_get_ignores_expired_entries(self, tmp_path, monkeypatch):
+        cache = HistoryCache(cache_dir=tmp_path)
+        monkeypatch.setattr(history_cache.time, "time", lambda: parse_begins_at("2021-11-09T20:57:00Z"))
+        cache.put("AAPL", "5minute", "day", AAPL_STOCK_HISTORY_SAMPLE)
+
+        monkeypatch.setattr(history_cache.time, "time", lambda: parse_begins_at("2021-11-09T21:00:00Z"))
+        assert cache.get("AAPL", "5minute", "day") is None
+
+    @pytest.mark.parametrize("stock_history", [None, [], [None]])
+    def test_put_skips_failed_requests(self, tmp_path, stock_history):
+        cache = HistoryCache(cache_dir=tmp_path)
+        cache.put("AAPL", "day", "year", stock_history)
+
+        assert not os.path.exists(cache.cache_dir)
+
+    def test_directory_is_created_by_the_first_put(self, tmp_path):
+        cache = HistoryCache(cache_dir=tmp_path / "cache")
+
+        assert cache.get("AAPL", "day", "year") is None
+        assert cache.get_expiry("AAPL", "day", "year") is None
+        cache.clear()
+        assert not os.path.exists(tmp_path / "cache")
+
+        cache.put("AAPL", "day", "year", STOCK_HISTORY_SAMPLE)
+        assert os.listdir(cache.cache_dir) == ["AAPL_day_year.json"]
+
+    def test_directory_is_only_scanned_past_max_bytes(self, tmp_path, monkeypatch):
+        cache = HistoryCache(cache_dir=tmp_path)
+        scans = []
+        evict = cache.evict
+        monkeypatch.setattr(cache, "evict", lambda: scans.append(len(os.listdir(cache.cache_dir))) or evict())
+
+        cache.put("AAPL", "day", "year", STOCK_HISTORY_SAMPLE)
+        cache.max_bytes = 2 * os.path.getsize(cache._entry_path("AAPL", "day", "year"))
+
+        # Replacing an entry does not grow the cache.
+        cache.put("AAPL", "day", "year", STOCK_HISTORY_SAMPLE)
+        cache.put("GOOG", "day", "year", STOCK_HISTORY_SAMPLE)
+        assert scans == [1]
+
+        cache.put("META", "day", "year", STOCK_HISTORY_SAMPLE)
+        assert scans == [1, 3]
+        assert len(os.listdir(cache.cache_dir)) == 2
+
+    def test_evict_least_recently_used(self, tmp_path, monkeypatch):
+        cache = HistoryCache(cache_dir=tmp_path)
+        monkeypatch.setattr(history_cache.time, "time", lambda: parse_begins_at("2021-11-09T10:00:00Z"))
+
+        cache.put("AAPL", "day", "year", STOCK_HISTORY_SAMPLE)
+        entry_size = os.path.getsize(cache._entry_path("AAPL", "day", "year"))
+        cache.max_bytes = 2 * entry_size
+
+        cache.put("GOOG", "day", "year", STOCK_HISTORY_SAMPLE)
+        os.utime(cache._entry_path("AAPL", "day", "year"), (0, 1))
+        os.utime(cache._entry_path("GOOG", "day", "year"), (0, 2))
+
+        # Reading AAPL makes GOOG the least recently used entry.
+        cache.get("AAPL", "day", "year")
+        cache.put("META", "day", "year", STOCK_HISTORY_SAMPLE)
+
+        assert cache.get("AAPL", "day", "year") is not None
+        assert cache.get("GOOG", "day", "year") is None
+        assert cache.get("META", "day", "year") is not None
+
+    @pytest.mark.parametrize(
+        "interval,since,now,expected",
+        [
+            ("5minute", "2021-11-09T14:30:00Z", "2021-11-09T20:00:00Z", "day"),
+            ("5minute", "2021-11-08T20:55:00Z", "2021-11-09T15:00:00Z", "week"),
+            ("5minute", "2021-11-05T20:55:00Z", "2021-11-09T15:00:00Z", "week"),
+            # No intraday span reaches back further than a week.
+            ("5minute", "2021-10-25T00:00:00Z", "2021-11-09T15:00:00Z", None),
+            ("hour", "2021-11-09T14:30:00Z", "2021-11-09T20:00:00Z", "week"),
+            ("hour", "2021-10-25T00:00:00Z", "2021-11-09T15:00:00Z", "month"),
+            # Daily bars are never requested over a single day.
+            ("day", "2021-11-09T00:00:00Z", "2021-11-09T20:00:00Z", "month"),
+            ("day", "2021-08-01T00:00:00Z", "2021-11-09T15:00:00Z", "year"),
+            ("day", "2010-01-01T00:00:00Z", "2021-11-09T15:00:00Z", None),
+            ("week", "2021-11-01T00:00:00Z", "2021-11-09T15:00:00Z", "year"),
+        ],
+    )
+    def test_smallest_covering_span(self, interval, since, now, expected):
+        assert smallest_covering_span(interval, parse_begins_at(since), parse_begins_at(now)) == expected
@@ -0,0 +1,129 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from src.http_session import RETRY_METHODS, RateLimitedAdapter, configure_session, pooled_adapter
+from src.rate_limiter import RateLimiter
+from src.utilities import HttpSessionSettings
+
+
+class KeepAliveRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.do_GET()
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.client_ports.add(self.client_address[1])
+            self.server.failures_left -= 1
+            status = self.server.failure_status if self.server.failures_left >= 0 else 200
+
+        body = b"{}"
+        self.send_response(status)
+
+        if status == 429:
+            self.send_header("Retry-After", "1")
+
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def keep_alive_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveRequestHandler)
+    server.lock = threading.Lock()
+    server.client_ports = set()
+    server.failures_left = 0
+    server.failure_status = 503
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    monkeypatch.setenv("TRADEBOT_HTTP_POOL_SIZE", "4")
+    monkeypatch.setenv("TRADEBOT_HTTP_MAX_RETRIES", "2")
+    monkeypatch.setenv("TRADEBOT_HTTP_RETRY_BACKOFF_FACTOR", "0")
+
+    return HttpSessionSettings()
+
+
+class TestHttpSession:
+    def test_pooled_adapter(self, settings):
+        adapter = pooled_adapter(settings)
+
+        assert adapter._pool_maxsize == 4
+        assert adapter._pool_block
+        assert adapter.max_retries.total == 2
+        assert adapter.max_retries.allowed_methods == RETRY_METHODS
+        assert "POST" not in adapter.max_retries.allowed_methods
+
+    def test_configure_session_once(self, settings):
+        session = requests.Session()
+
+        assert configure_session(session, settings)
+        adapter = session.get_adapter("https://api.robinhood.com/")
+
+        assert not configure_session(session, settings)
+        assert session.get_adapter("https://api.robinhood.com/") is adapter
+        assert session.headers["Connection"] == "keep-alive"
+
+    def test_threads_reuse_connections(self, settings, keep_alive_server):
+        session = requests.Session()
+        configure_session(session, settings, RateLimiter(rate=1000, burst=1000))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            responses = list(executor.map(lambda _: session.get(keep_alive_server.url), range(64)))
+
+        assert all(response.status_code == 200 for response in responses)
+        assert len(keep_alive_server.client_ports) <= 4
+
+    def test_get_is_retried(self, settings, keep_alive_server):
+        session = requests.Session()
+        configure_session(session, settings, RateLimiter(rate=1000, burst=1000))
+        keep_alive_server.failures_left = 2
+
+        assert session.get(keep_alive_server.url).status_code == 200
+
+    def test_throttled_get_is_retried(self, settings, keep_alive_server):
+        limiter = RateLimiter(rate=1000, burst=1000)
+        session = requests.Session()
+        configure_session(session, settings, limiter)
+        keep_alive_server.failures_left = 1
+        keep_alive_server.failure_status = 429
+
+        assert session.get(keep_alive_server.url).status_code == 200
+        assert limiter.counters["requests"] == 2
+        assert limiter.counters["throttled_responses"] == 1
+        assert limiter.counters["wait_seconds"] >= 0.9
+        assert round(limiter.rate) == 500
+
+    def test_throttled_order_is_not_retried(self, settings, keep_alive_server):
+        limiter = RateLimiter(rate=1000, burst=1000)
+        session = requests.Session()
+        configure_session(session, settings, limiter)
+        keep_alive_server.failures_left = 1
+        keep_alive_server.failure_status = 429
+
+        assert session.post(keep_alive_server.url + "orders/", data={}).status_code == 429
+        assert limiter.counters["order_requests"] == 1
+
+    def test_rate_limited_adapter(self, settings):
+        adapter = pooled_adapter(settings)
+
+        assert isinstance(adapter, RateLimitedAdapter)
@@ -0,0 +1,249 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.history_cache import parse_begins_at
+from src.indicators import (
+    StreamingAverageTrueRange,
+    StreamingBollingerBands,
+    StreamingExponentialMovingAverage,
+    StreamingMovingAverageConvergenceDivergence,
+    StreamingRelativeStrengthIndex,
+    StreamingSimpleMovingAverage,
+    StreamingVWAP,
+    average_true_range,
+    bollinger_bands,
+    exponential_moving_average,
+    latest_simple_moving_averages,
+    moving_average_convergence_divergence,
+    relative_strength_index,
+    simple_moving_averages,
+)
+from src.stock_history import parse_stock_history
+from tests.configs import AAPL_STOCK_HISTORY_SAMPLE, STOCK_HISTORY_SAMPLE
+
+
+@pytest.fixture
+def close_prices():
+    close_prices = parse_stock_history(STOCK_HISTORY_SAMPLE)["close_price"].to_numpy().copy()
+    close_prices[[7, 120]] = np.nan
+
+    return close_prices
+
+
+@pytest.fixture
+def bars(close_prices):
+    stock_history_df = parse_stock_history(STOCK_HISTORY_SAMPLE)
+
+    return [
+        {"high_price": high_price, "low_price": low_price, "close_price": close_price}
+        for high_price, low_price, close_price in zip(
+            stock_history_df["high_price"], stock_history_df["low_price"], close_prices
+        )
+    ]
+
+
+def stream(indicator, bars):
+    """Returns the values of a streaming indicator after each bar, as an array or a dict of arrays."""
+
+    values = [indicator.update(bar) for bar in bars]
+
+    if values and isinstance(values[0], dict):
+        return {name: np.array([value[name] for value in values]) for name in values[0]}
+
+    return np.array(values)
+
+
+class TestIndicators:
+    @pytest.mark.parametrize("window", [1, 25, 50, 200, 252, 300])
+    def test_simple_moving_averages(self, close_prices, window):
+        moving_averages = simple_moving_averages(close_prices, [window])
+        rolling_means = pd.Series(close_prices).rolling(window, min_periods=1).mean()
+        expected = rolling_means.where(np.arange(len(close_prices)) >= window - 1)
+
+        np.testing.assert_allclose(moving_averages[window], expected, rtol=1e-12)
+
+    def test_partial_simple_moving_averages(self, close_prices):
+        moving_averages = simple_moving_averages(close_prices, [50, 300], partial=True)
+
+        np.testing.assert_allclose(moving_averages[50], pd.Series(close_prices).rolling(50, min_periods=1).mean())
+        np.testing.assert_allclose(moving_averages[300], pd.Series(close_prices).expanding().mean())
+
+    def test_latest_simple_moving_averages(self, close_prices):
+        matrix = np.full((3, 300), np.nan)
+        matrix[0, -len(close_prices) :] = close_prices
+        matrix[1, -30:] = close_prices[-30:]
+        latest_moving_averages = latest_simple_moving_averages(matrix, [50, 200])
+
+        for window in (50, 200):
+            assert latest_moving_averages[window][0] == pytest.approx(
+                simple_moving_averages(close_prices, [window], partial=True)[window][-1]
+            )
+            assert latest_moving_averages[window][1] == pytest.approx(np.nanmean(close_prices[-30:]))
+            assert np.isnan(latest_moving_averages[window][2])
+
+    def test_simple_moving_averages_of_nothing(self):
+        assert simple_moving_averages([], [5])[5].size == 0
+
+    def test_simple_moving_averages_need_positive_windows(self, close_prices):
+        with pytest.raises(ValueError):
+            simple_moving_averages(close_prices, [0])
+
+    @pytest.mark.parametrize("window", [1, 25, 200, 300])
+    def test_streaming_simple_moving_average(self, close_prices, window):
+        moving_average = StreamingSimpleMovingAverage(window)
+        streamed = [moving_average.update(close_price) for close_price in close_prices]
+
+        np.testing.assert_allclose(streamed, simple_moving_averages(close_prices, [window], partial=True)[window])
+        assert len(moving_average) == min(window, len(close_prices))
+
+    def test_streaming_simple_moving_average_from_stock_history(self):
+        stock_history_df = parse_stock_history(STOCK_HISTORY_SAMPLE[:-1])
+        moving_average = StreamingSimpleMovingAverage.from_stock_history(stock_history_df, 50)
+
+        assert moving_average.update(STOCK_HISTORY_SAMPLE[-1]) == pytest.approx(
+            parse_stock_history(STOCK_HISTORY_SAMPLE)["close_price"].tail(50).mean()
+        )
+
+    def test_streaming_simple_moving_average_replaces_a_repeated_bar(self):
+        stock_history_df = parse_stock_history(STOCK_HISTORY_SAMPLE)
+        moving_average = StreamingSimpleMovingAverage.from_stock_history(stock_history_df.iloc[:-1], 50)
+        expected = stock_history_df["close_price"].tail(50).mean()
+
+        # The daily bar was still forming the first time it came in.
+        moving_average.update(dict(STOCK_HISTORY_SAMPLE[-1], close_price="0.00"))
+        assert moving_average.update(STOCK_HISTORY_SAMPLE[-1]) == pytest.approx(expected)
+        assert moving_average.update(stock_history_df.iloc[-1]) == pytest.approx(expected)
+        assert len(moving_average) == 50
+
+        # Older bars are ignored.
+        assert moving_average.update(STOCK_HISTORY_SAMPLE[0]) == pytest.approx(expected)
+
+    def test_streaming_simple_moving_average_of_nothing(self):
+        moving_average = StreamingSimpleMovingAverage.from_stock_history(pd.DataFrame(), 50)
+
+        assert np.isnan(moving_average.value)
+        assert len(moving_average) == 0
+
+        with pytest.raises(ValueError):
+            StreamingSimpleMovingAverage(0)
+
+    def test_streaming_VWAP(self):
+        stock_history_df = parse_stock_history(AAPL_STOCK_HISTORY_SAMPLE)
+        vwap = StreamingVWAP.from_stock_history(parse_stock_history(AAPL_STOCK_HISTORY_SAMPLE[:-1]))
+
+        assert vwap.update(AAPL_STOCK_HISTORY_SAMPLE[-1]) == pytest.approx(
+            np.dot(stock_history_df["volume"], stock_history_df["close_price"]) / stock_history_df["volume"].sum()
+        )
+        assert vwap.session_day == parse_begins_at("2021-11-09T00:00:00Z") // 86400
+
+    def test_streaming_VWAP_skips_flagged_bars(self):
+        vwap = StreamingVWAP()
+        vwap.update(AAPL_STOCK_HISTORY_SAMPLE[0])
+
+        assert vwap.update(dict(AAPL_STOCK_HISTORY_SAMPLE[1], session="post")) == 150.265
+        assert vwap.update(dict(AAPL_STOCK_HISTORY_SAMPLE[1], interpolated=True)) == 150.265
+
+    def test_streaming_VWAP_resets_at_session_open(self):
+        vwap = StreamingVWAP.from_stock_history(pd.DataFrame(AAPL_STOCK_HISTORY_SAMPLE))
+
+        assert vwap.add_trade(151.0, 100, parse_begins_at("2021-11-10T14:30:00Z")) == 151.0
+        assert vwap.add_trade(153.0, 300, parse_begins_at("2021-11-10T14:31:00Z")) == 152.5
+        assert vwap.volume == 400
+
+    def test_streaming_VWAP_replaces_a_repeated_bar(self):
+        stock_history_df = parse_stock_history(AAPL_STOCK_HISTORY_SAMPLE)
+        vwap = StreamingVWAP.from_stock_history(parse_stock_history(AAPL_STOCK_HISTORY_SAMPLE[:-1]))
+        expected = vwap.update(AAPL_STOCK_HISTORY_SAMPLE[-1])
+
+        # The bar was still forming the first time it came in.
+        assert vwap.update(dict(AAPL_STOCK_HISTORY_SAMPLE[-1], close_price="160.00", volume=10**8)) > 151
+        assert vwap.update(AAPL_STOCK_HISTORY_SAMPLE[-1]) == pytest.approx(expected)
+        assert vwap.volume == stock_history_df["volume"].sum()
+
+        # Older bars are ignored.
+        assert vwap.update(AAPL_STOCK_HISTORY_SAMPLE[0]) == pytest.approx(expected)
+
+    def test_streaming_VWAP_extends_with_new_bars(self):
+        stock_history_df = parse_stock_history(AAPL_STOCK_HISTORY_SAMPLE)
+        vwap = StreamingVWAP.from_stock_history(stock_history_df.iloc[:40])
+        vwap.update(dict(AAPL_STOCK_HISTORY_SAMPLE[39], close_price="160.00", volume=10**8))
+
+        assert vwap.extend(stock_history_df) == pytest.approx(
+            StreamingVWAP.from_stock_history(stock_history_df).value, rel=1e-12
+        )
+        assert vwap.volume == stock_history_df["volume"].sum()
+        assert vwap.last_begins_at == parse_begins_at(AAPL_STOCK_HISTORY_SAMPLE[-1]["begins_at"])
+
+    def test_streaming_VWAP_of_nothing(self):
+        assert np.isnan(StreamingVWAP.from_stock_history(pd.DataFrame()).value)
+
+    def test_exponential_moving_average(self, close_prices):
+        moving_averages = exponential_moving_average(close_prices, 20)
+        expected = pd.Series(close_prices).ewm(span=20, adjust=False, ignore_na=True).mean()
+
+        np.testing.assert_allclose(moving_averages[20:], expected[20:])
+        assert np.isnan(moving_averages[:20]).all()
+        np.testing.assert_array_equal(stream(StreamingExponentialMovingAverage(20), close_prices), moving_averages)
+
+    def test_relative_strength_index(self, close_prices):
+        relative_strength_indexes = relative_strength_index(close_prices)
+
+        # With the NaN at 7, the 14th price change comes with the 16th bar.
+        assert np.isnan(relative_strength_indexes[:15]).all()
+        assert (relative_strength_indexes[15:] > 0).all() and (relative_strength_indexes[15:] < 100).all()
+        np.testing.assert_array_equal(stream(StreamingRelativeStrengthIndex(), close_prices), relative_strength_indexes)
+
+    @pytest.mark.parametrize("close_prices,expected", [([1.0] * 20, 50.0), (np.arange(20.0), 100.0)])
+    def test_relative_strength_index_of_flat_and_rising_prices(self, close_prices, expected):
+        assert relative_strength_index(close_prices)[-1] == expected
+
+    def test_moving_average_convergence_divergence(self, close_prices):
+        macd = moving_average_convergence_divergence(close_prices)
+        streamed_macd = stream(StreamingMovingAverageConvergenceDivergence(), close_prices)
+
+        np.testing.assert_allclose(
+            macd["macd"], exponential_moving_average(close_prices, 12) - exponential_moving_average(close_prices, 26)
+        )
+        np.testing.assert_allclose(macd["histogram"], macd["macd"] - macd["signal"])
+        assert np.isnan(macd["signal"][:34]).all() and not np.isnan(macd["signal"][34:]).any()
+
+        for name in ("macd", "signal", "histogram"):
+            np.testing.assert_array_equal(streamed_macd[name], macd[name])
+
+    def test_bollinger_bands(self, close_prices):
+        bands = bollinger_bands(close_prices)
+        streamed_bands = stream(StreamingBollingerBands(), close_prices)
+        valid_close_prices = pd.Series(close_prices).dropna()
+        means = valid_close_prices.rolling(20).mean().reindex(range(len(close_prices))).ffill()
+        deviations = valid_close_prices.rolling(20).std(ddof=0).reindex(range(len(close_prices))).ffill()
+
+        np.testing.assert_allclose(bands["middle"][20:], means[20:])
+        np.testing.assert_allclose(bands["upper"][20:] - bands["middle"][20:], 2 * deviations[20:])
+        assert np.isnan(bands["middle"][:20]).all()
+
+        for name in ("middle", "upper", "lower"):
+            np.testing.assert_allclose(streamed_bands[name], bands[name], rtol=1e-12)
+
+    def test_average_true_range(self, bars):
+        high_prices, low_prices, close_prices = (np.array([bar[name] for bar in bars]) for name in bars[0])
+        average_true_ranges = average_true_range(high_prices, low_prices, close_prices)
+
+        # With the NaN close price at 7, the 14th bar is the 15th.
+        assert np.isnan(average_true_ranges[:14]).all()
+        assert (average_true_ranges[14:] > 0).all()
+        np.testing.assert_array_equal(stream(StreamingAverageTrueRange(), bars), average_true_ranges)
+
+    def test_average_true_range_spans_gaps(self):
+        # The second bar gaps up, so its true range reaches down to the previous close.
+        average_true_ranges = average_true_range([11.0, 21.0], [9.0, 19.0], [10.0, 20.0], window=1)
+
+        np.testing.assert_array_equal(average_true_ranges, [2.0, 11.0])
+
+    def test_indicators_of_nothing(self):
+        assert exponential_moving_average([], 20).size == 0
+        assert relative_strength_index([]).size == 0
+        assert moving_average_convergence_divergence([])["macd"].size == 0
+        assert bollinger_bands([])["middle"].size == 0
+        assert average_true_range([], [], []).size == 0
+        assert np.isnan(StreamingRelativeStrengthIndex().value)
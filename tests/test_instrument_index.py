@@ -0,0 +1,113 @@
+import pytest
+
+from src import instrument_index
+from src.instrument_index import InstrumentIndex, instrument_record
+
+INSTRUMENTS_SAMPLE = {
+    "AAPL": {
+        "id": "450dfc6d-5510-4d40-abfb-f633b7d9be3e",
+        "url": "https://api.robinhood.com/instruments/450dfc6d-5510-4d40-abfb-f633b7d9be3e/",
+        "symbol": "AAPL",
+        "simple_name": "Apple",
+        "name": "Apple Inc. Common Stock",
+        "tradability": "tradable",
+        "fractional_tradability": "tradable",
+    },
+    "GOOG": {
+        "id": "943c5009-a0bb-4665-8cf4-a95dab5874e4",
+        "url": "https://api.robinhood.com/instruments/943c5009-a0bb-4665-8cf4-a95dab5874e4/",
+        "symbol": "GOOG",
+        "simple_name": "Alphabet Class C",
+        "name": "Alphabet Inc. Class C Capital Stock",
+        "tradability": "tradable",
+        "fractional_tradability": "untradable",
+    },
+    "XYZW": {
+        "id": "00000000-0000-0000-0000-000000000000",
+        "url": "https://api.robinhood.com/instruments/00000000-0000-0000-0000-000000000000/",
+        "symbol": "XYZW",
+        "simple_name": None,
+        "name": "XYZW Holdings Warrant",
+        "tradability": "untradable",
+        "fractional_tradability": "untradable",
+    },
+}
+
+
+class TestInstrumentIndex:
+    @pytest.fixture
+    def requested_symbols(self, monkeypatch):
+        requested_symbols = []
+
+        def get_instruments_by_symbols(symbol):
+            requested_symbols.append(symbol)
+            return [INSTRUMENTS_SAMPLE[symbol]] if symbol in INSTRUMENTS_SAMPLE else [None]
+
+        monkeypatch.setattr(instrument_index.robinhood.stocks, "get_instruments_by_symbols", get_instruments_by_symbols)
+
+        return requested_symbols
+
+    def test_instrument_record(self):
+        assert instrument_record(INSTRUMENTS_SAMPLE["GOOG"]) == {
+            "symbol": "GOOG",
+            "id": "943c5009-a0bb-4665-8cf4-a95dab5874e4",
+            "url": "https://api.robinhood.com/instruments/943c5009-a0bb-4665-8cf4-a95dab5874e4/",
+            "simple_name": "Alphabet Class C",
+            "name": "Alphabet Inc. Class C Capital Stock",
+            "tradable": True,
+            "fractional_tradable": False,
+        }
+
+    @pytest.mark.parametrize(
+        "symbol,expected",
+        [
+            ("AAPL", "Apple"),
+            ("goog", "Alphabet Class C"),
+            ("XYZW", "XYZW Holdings Warrant"),
+            ("META", None),
+        ],
+    )
+    def test_get_name(self, tmp_path, requested_symbols, symbol, expected):
+        index = InstrumentIndex(index_path=tmp_path / "instruments.json")
+        index.refresh(["AAPL", "GOOG", "XYZW"])
+
+        assert index.get_name(symbol) == expected
+
+    def test_refresh_is_persisted(self, tmp_path, requested_symbols):
+        index_path = tmp_path / "instruments.json"
+        index = InstrumentIndex(index_path=index_path)
+
+        assert index.refresh(["AAPL", "aapl", "GOOG", "META", ""]) == 2
+        assert requested_symbols == ["AAPL", "GOOG", "META"]
+
+        # A new index over the same file resolves everything without a request.
+        reloaded_index = InstrumentIndex(index_path=index_path)
+
+        assert len(reloaded_index) == 2
+        assert "AAPL" in reloaded_index
+        assert "META" not in reloaded_index
+        assert reloaded_index.get_by_url(INSTRUMENTS_SAMPLE["GOOG"]["url"])["symbol"] == "GOOG"
+        assert requested_symbols == ["AAPL", "GOOG", "META"]
+
+    def test_indexes_sharing_a_file_keep_each_others_instruments(self, tmp_path, requested_symbols):
+        index_path = tmp_path / "instruments.json"
+        first_index = InstrumentIndex(index_path=index_path)
+        second_index = InstrumentIndex(index_path=index_path)
+
+        first_index.refresh(["AAPL"])
+        second_index.refresh(["GOOG"])
+
+        assert "AAPL" in second_index
+        assert len(InstrumentIndex(index_path=index_path)) == 2
+
+    def test_refresh_url(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(
+            instrument_index.robinhood.stocks,
+            "get_instrument_by_url",
+            lambda url: next(instrument for instrument in INSTRUMENTS_SAMPLE.values() if instrument["url"] == url),
+        )
+        index = InstrumentIndex(index_path=tmp_path / "instruments.json")
+
+        assert index.get_by_url(INSTRUMENTS_SAMPLE["AAPL"]["url"]) is None
+        assert index.refresh_url(INSTRUMENTS_SAMPLE["AAPL"]["url"])["symbol"] == "AAPL"
+        assert index.get("AAPL")["fractional_tradable"]
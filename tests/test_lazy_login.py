@@ -0,0 +1,69 @@
+import pytest
+
+from src import login_session
+from src.bots import base_trade_bot
+from src.bots.simple_moving_average import TradeBotSimpleMovingAverage
+from src.bots.volume_weighted_average_price import TradeBotVWAP
+from src.login_session import SessionManager
+
+
+class TestLazyLogin:
+    @pytest.fixture
+    def logins(self, monkeypatch):
+        logins = []
+
+        monkeypatch.setattr(login_session, "configure_robinhood_session", lambda: None)
+        monkeypatch.setattr(login_session, "login", lambda: logins.append("login"))
+        monkeypatch.setattr(login_session.robinhood, "logout", lambda: logins.append("logout"))
+        monkeypatch.setattr(base_trade_bot, "session_manager", SessionManager())
+        monkeypatch.setattr(base_trade_bot.robinhood.profiles, "load_account_profile", lambda info: "12.50")
+
+        return logins
+
+    @pytest.mark.parametrize("bot_class", [TradeBotSimpleMovingAverage, TradeBotVWAP])
+    def test_construction_does_not_log_in(self, logins, bot_class):
+        trade_bot = bot_class()
+
+        assert not trade_bot.logged_in
+        assert logins == []
+
+    def test_first_broker_call_logs_in(self, logins):
+        trade_bot = TradeBotVWAP()
+
+        assert trade_bot.get_current_cash_position() == 12.50
+        assert trade_bot.get_current_cash_position() == 12.50
+        assert trade_bot.logged_in
+        assert logins == ["login"]
+
+    def test_logout_only_when_logged_in(self, logins):
+        trade_bot = TradeBotVWAP()
+        trade_bot.robinhood_logout()
+
+        assert logins == []
+
+        trade_bot.ensure_logged_in()
+        trade_bot.robinhood_logout()
+
+        assert not trade_bot.logged_in
+        assert logins == ["login", "logout"]
+
+    def test_bots_share_one_session(self, logins):
+        sma_bot = TradeBotSimpleMovingAverage()
+        vwap_bot = TradeBotVWAP()
+
+        sma_bot.ensure_logged_in()
+        vwap_bot.ensure_logged_in()
+
+        assert logins == ["login"]
+        assert base_trade_bot.session_manager.reference_count == 2
+
+        sma_bot.robinhood_logout()
+        sma_bot.robinhood_logout()
+
+        assert logins == ["login"]
+        assert vwap_bot.get_current_cash_position() == 12.50
+
+        vwap_bot.robinhood_logout()
+
+        assert logins == ["login", "logout"]
+        assert base_trade_bot.session_manager.reference_count == 0
@@ -0,0 +1,137 @@
+import os
+import stat
+import time
+
+import pytest
+import requests
+
+from src import login_session
+from src.login_session import ACCESS_TOKEN_LIFETIME, LoginSessionStore, login, token_from_login_data
+
+LOGIN_DATA_SAMPLE = {
+    "token_type": "Bearer",
+    "access_token": "new-access-token",
+    "refresh_token": "new-refresh-token",
+    "expires_in": ACCESS_TOKEN_LIFETIME,
+}
+
+
+class TestLoginSession:
+    @pytest.fixture
+    def requests_sent(self, monkeypatch):
+        requests_sent = []
+        session = requests.Session()
+        session.rejected_access_tokens = set()
+
+        def request_post(url, payload):
+            if payload["grant_type"] == "password":
+                requests_sent.append(("login", payload["device_token"]))
+                return LOGIN_DATA_SAMPLE
+
+            requests_sent.append(("refresh", payload["refresh_token"], payload["device_token"]))
+            return (
+                LOGIN_DATA_SAMPLE if payload["refresh_token"] == "valid-refresh-token" else {"error": "invalid_grant"}
+            )
+
+        def get(url, params, timeout):
+            access_token = session.headers["Authorization"].split()[-1]
+            requests_sent.append(("check", access_token))
+
+            response = requests.Response()
+            response.status_code = 401 if access_token in session.rejected_access_tokens else 200
+            return response
+
+        monkeypatch.setattr(session, "get", get)
+        monkeypatch.setattr(login_session.robinhood.helper, "request_post", request_post)
+        monkeypatch.setattr(login_session.robinhood.helper, "SESSION", session)
+        monkeypatch.setattr(login_session.robinhood.authentication, "generate_device_token", lambda: "new-device-token")
+        monkeypatch.setattr(
+            login_session.robinhood, "login", lambda *args, **kwargs: pytest.fail("robinhood.login() must not be used")
+        )
+
+        return requests_sent
+
+    @pytest.fixture
+    def session_store(self, tmp_path):
+        return LoginSessionStore(session_path=str(tmp_path / "tokens" / "session.json"))
+
+    def stored_token(self, session_store, expires_at, refresh_token="valid-refresh-token"):
+        token = {
+            "token_type": "Bearer",
+            "access_token": "stored-access-token",
+            "refresh_token": refresh_token,
+            "device_token": "stored-device-token",
+            "expires_at": expires_at,
+        }
+        session_store.save(token)
+
+        return token
+
+    def test_token_from_login_data(self):
+        assert token_from_login_data(LOGIN_DATA_SAMPLE, 100, "device-token") == {
+            "token_type": "Bearer",
+            "access_token": "new-access-token",
+            "refresh_token": "new-refresh-token",
+            "device_token": "device-token",
+            "expires_at": 100 + ACCESS_TOKEN_LIFETIME,
+        }
+
+    def test_session_file_is_private(self, session_store):
+        self.stored_token(session_store, 0)
+
+        assert stat.S_IMODE(os.stat(session_store.session_path).st_mode) == 0o600
+
+    def test_login_with_stored_token(self, session_store, requests_sent):
+        self.stored_token(session_store, int(time.time()) + 3600)
+
+        assert login(session_store) == "stored"
+        assert requests_sent == [("check", "stored-access-token")]
+        assert login_session.robinhood.helper.SESSION.headers["Authorization"] == "Bearer stored-access-token"
+
+    def test_login_refreshes_rejected_token(self, session_store, requests_sent):
+        self.stored_token(session_store, int(time.time()) + 3600)
+        login_session.robinhood.helper.SESSION.rejected_access_tokens.add("stored-access-token")
+
+        assert login(session_store) == "refreshed"
+        assert requests_sent == [
+            ("check", "stored-access-token"),
+            ("refresh", "valid-refresh-token", "stored-device-token"),
+        ]
+        assert login_session.robinhood.helper.SESSION.headers["Authorization"] == "Bearer new-access-token"
+
+    def test_login_refreshes_expired_token(self, session_store, requests_sent):
+        self.stored_token(session_store, int(time.time()) - 1)
+
+        assert login(session_store) == "refreshed"
+        assert requests_sent == [("refresh", "valid-refresh-token", "stored-device-token")]
+        assert session_store.load()["access_token"] == "new-access-token"
+        assert session_store.load()["device_token"] == "stored-device-token"
+        assert login_session.robinhood.helper.SESSION.headers["Authorization"] == "Bearer new-access-token"
+
+    def test_full_login_when_refresh_is_rejected(self, session_store, requests_sent, monkeypatch):
+        monkeypatch.setenv("ROBINHOOD_MFA_CODE", "JBSWY3DPEHPK3PXP")
+        self.stored_token(session_store, int(time.time()) - 1, refresh_token="revoked-refresh-token")
+
+        assert login(session_store) == "logged in"
+        assert requests_sent == [
+            ("refresh", "revoked-refresh-token", "stored-device-token"),
+            ("login", "stored-device-token"),
+        ]
+        assert session_store.load()["refresh_token"] == "new-refresh-token"
+
+    def test_full_login_without_stored_token(self, session_store, requests_sent, monkeypatch):
+        monkeypatch.setenv("ROBINHOOD_MFA_CODE", "JBSWY3DPEHPK3PXP")
+
+        assert login(session_store) == "logged in"
+        assert requests_sent == [("login", "new-device-token")]
+        assert session_store.load()["device_token"] == "new-device-token"
+
+    def test_failed_full_login_raises(self, session_store, requests_sent, monkeypatch):
+        monkeypatch.setattr(
+            login_session.robinhood.helper, "request_post", lambda url, payload: {"detail": "Unable to log in."}
+        )
+
+        with pytest.raises(Exception, match="Unable to log in"):
+            login(session_store)
+
+        assert session_store.load() is None
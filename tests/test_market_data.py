@@ -0,0 +1,145 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from src.market_data import MAX_SYMBOLS_PER_HISTORICALS_REQUEST, MarketDataFetcher, chunk_symbols
+from tests.configs import AAPL_STOCK_HISTORY_SAMPLE, FB_STOCK_HISTORY_SAMPLE
+
+HISTORICALS_SAMPLE = {"AAPL": AAPL_STOCK_HISTORY_SAMPLE, "FB": FB_STOCK_HISTORY_SAMPLE}
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Local stand-in for the quotes, historicals, and fundamentals endpoints of the Robinhood API."""
+
+    def __init__(self, response_delay=0.0):
+        super().__init__(("127.0.0.1", 0), StandInRequestHandler)
+        self.response_delay = response_delay
+        self.lock = threading.Lock()
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        symbols = query["symbols"][0].split(",")
+
+        with self.server.lock:
+            self.server.requests.append((url.path, symbols))
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+
+        time.sleep(self.server.response_delay)
+
+        if url.path == "/quotes/historicals/":
+            results = [
+                {"symbol": symbol, "historicals": [dict(bar) for bar in HISTORICALS_SAMPLE[symbol]]}
+                for symbol in symbols
+                if symbol in HISTORICALS_SAMPLE
+            ]
+        elif url.path == "/quotes/":
+            results = [
+                {"symbol": symbol, "last_trade_price": "1.000000"} if symbol != "XYZW" else None for symbol in symbols
+            ]
+        elif url.path == "/fundamentals/":
+            results = [{"market_cap": "1.0"} if symbol != "XYZW" else None for symbol in symbols]
+        else:
+            results = None
+
+        with self.server.lock:
+            self.server.in_flight -= 1
+
+        if results is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        body = json.dumps({"results": results}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def stand_in_server():
+    server = StandInServer(response_delay=0.05)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+class TestMarketDataFetcher:
+    def test_chunk_symbols(self):
+        assert chunk_symbols(["aapl", "FB", "AAPL", "", "GOOG"], 2) == [["AAPL", "FB"], ["GOOG"]]
+
+    def test_get_historicals(self, stand_in_server):
+        fetcher = MarketDataFetcher(base_url=stand_in_server.url, session=requests.Session())
+        stock_history = fetcher.get_historicals(["AAPL", "FB", "GOOG"], interval="5minute", span="day")
+
+        assert len(stock_history) == 156
+        assert {bar["symbol"] for bar in stock_history} == {"AAPL", "FB"}
+        assert stand_in_server.requests == [("/quotes/historicals/", ["AAPL", "FB", "GOOG"])]
+
+    def test_get_quotes_and_fundamentals(self, stand_in_server):
+        fetcher = MarketDataFetcher(base_url=stand_in_server.url, session=requests.Session())
+
+        assert [quote["symbol"] for quote in fetcher.get_quotes(["AAPL", "XYZW", "FB"])] == ["AAPL", "FB"]
+        assert [fundamentals["symbol"] for fundamentals in fetcher.get_fundamentals(["XYZW", "FB"])] == ["FB"]
+
+    def test_concurrency_is_bounded(self, stand_in_server):
+        fetcher = MarketDataFetcher(base_url=stand_in_server.url, max_concurrent_requests=2, session=requests.Session())
+        symbols = [f"S{number}" for number in range(6 * MAX_SYMBOLS_PER_HISTORICALS_REQUEST)]
+
+        assert fetcher.get_historicals(symbols) == []
+        assert len(stand_in_server.requests) == 6
+        assert stand_in_server.max_in_flight == 2
+
+    def test_get_universe(self, stand_in_server):
+        fetcher = MarketDataFetcher(base_url=stand_in_server.url, session=requests.Session())
+        universe = fetcher.get_universe(["AAPL", "FB"], interval="5minute", span="day")
+
+        assert len(universe["historicals"]) == 156
+        assert len(universe["quotes"]) == 2
+        assert len(universe["fundamentals"]) == 2
+        assert stand_in_server.max_in_flight == 3
+
+    def test_universe_shares_concurrency_limit(self, stand_in_server):
+        fetcher = MarketDataFetcher(base_url=stand_in_server.url, max_concurrent_requests=1, session=requests.Session())
+        fetcher.get_universe(["AAPL", "FB"])
+
+        assert len(stand_in_server.requests) == 3
+        assert stand_in_server.max_in_flight == 1
+
+    def test_failed_request(self, stand_in_server):
+        fetcher = MarketDataFetcher(base_url=f"{stand_in_server.url}/missing", session=requests.Session())
+
+        assert fetcher.get_quotes(["AAPL"]) == []
+
+    def test_get_quotes_from_running_event_loop(self, stand_in_server):
+        fetcher = MarketDataFetcher(base_url=stand_in_server.url, session=requests.Session())
+
+        async def get_quotes():
+            return fetcher.get_quotes(["AAPL", "FB"])
+
+        assert [quote["symbol"] for quote in asyncio.run(get_quotes())] == ["AAPL", "FB"]
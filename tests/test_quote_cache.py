@@ -0,0 +1,115 @@
+import threading
+import time
+
+import pytest
+
+from src.bots.base_trade_bot import TradeBot
+from src.quote_cache import QuoteCache, quote_cache
+
+
+class TestQuoteCache:
+    def test_get_reuses_fresh_prices(self):
+        requested_tickers = []
+        quote_cache = QuoteCache(lambda ticker: requested_tickers.append(ticker) or 150.0, max_staleness_ms=60_000)
+
+        assert quote_cache.get("AAPL") == 150.0
+        assert quote_cache.get("aapl") == 150.0
+        assert quote_cache.get_fresh("AAPL") == 150.0
+        assert quote_cache.get_fresh("GOOG") is None
+        assert requested_tickers == ["AAPL"]
+
+    def test_get_refetches_stale_prices(self):
+        requested_tickers = []
+        quote_cache = QuoteCache(lambda ticker: requested_tickers.append(ticker) or 150.0, max_staleness_ms=10)
+
+        quote_cache.get("AAPL")
+        time.sleep(0.02)
+        quote_cache.get("AAPL")
+
+        assert requested_tickers == ["AAPL", "AAPL"]
+
+    def test_put(self):
+        quote_cache = QuoteCache(lambda ticker: pytest.fail("price should not be fetched"), max_staleness_ms=60_000)
+        quote_cache.put("aapl", 150.0)
+
+        assert quote_cache.get("AAPL") == 150.0
+
+        quote_cache.clear()
+        assert quote_cache.get_fresh("AAPL") is None
+
+    @pytest.mark.parametrize("max_staleness_ms", [0, 60_000])
+    def test_concurrent_requests_are_coalesced(self, max_staleness_ms):
+        release_request = threading.Event()
+        requested_tickers = []
+
+        def fetch_price(ticker):
+            requested_tickers.append(ticker)
+            release_request.wait(timeout=5)
+            return 150.0
+
+        quote_cache = QuoteCache(fetch_price, max_staleness_ms=max_staleness_ms)
+        prices = []
+        callers = [threading.Thread(target=lambda: prices.append(quote_cache.get("AAPL"))) for _ in range(8)]
+
+        for caller in callers:
+            caller.start()
+
+        # Wait until the first request is in flight before letting it complete.
+        while not requested_tickers:
+            time.sleep(0.001)
+        time.sleep(0.05)
+        release_request.set()
+
+        for caller in callers:
+            caller.join()
+
+        assert prices == [150.0] * 8
+        assert requested_tickers == ["AAPL"]
+
+    def test_errors_reach_every_waiting_caller(self):
+        release_request = threading.Event()
+
+        def fetch_price(ticker):
+            release_request.wait(timeout=5)
+            raise ConnectionError("quote request failed")
+
+        quote_cache = QuoteCache(fetch_price)
+        errors = []
+
+        def get_price():
+            try:
+                quote_cache.get("AAPL")
+            except ConnectionError as error:
+                errors.append(error)
+
+        callers = [threading.Thread(target=get_price) for _ in range(4)]
+
+        for caller in callers:
+            caller.start()
+
+        time.sleep(0.05)
+        release_request.set()
+
+        for caller in callers:
+            caller.join()
+
+        assert len(errors) == 4
+        assert quote_cache.get_fresh("AAPL") is None
+
+    def test_bots_share_the_process_quote_cache(self, monkeypatch):
+        requested_tickers = []
+        monkeypatch.setattr(quote_cache, "max_staleness_ms", 60_000)
+        monkeypatch.setattr(
+            TradeBot, "_fetch_current_market_price", lambda trade_bot, ticker: requested_tickers.append(ticker) or 150.0
+        )
+        quote_cache.clear()
+
+        try:
+            assert TradeBot().get_current_market_price("AAPL") == 150.0
+            assert TradeBot().get_current_market_price("AAPL") == 150.0
+            assert TradeBot().get_current_market_prices(["aapl"]) == {"aapl": 150.0}
+
+        finally:
+            quote_cache.clear()
+
+        assert requested_tickers == ["AAPL"]
@@ -0,0 +1,138 @@
+import threading
+import time
+
+import pytest
+
+from src.rate_limiter import (
+    MINIMUM_RATE,
+    PRIORITY_DATA,
+    PRIORITY_ORDERS,
+    THROTTLED_RATE_MARGIN,
+    RateLimiter,
+    parse_retry_after,
+)
+
+
+class TestRateLimiter:
+    @pytest.mark.parametrize(
+        "retry_after,expected",
+        [
+            (None, None),
+            ("", None),
+            ("2", 2.0),
+            ("-1", 0.0),
+            ("Wed, 21 Oct 2015 07:28:10 GMT", 10.0),
+            ("soon", None),
+        ],
+    )
+    def test_parse_retry_after(self, retry_after, expected):
+        # 2015-10-21T07:28:00Z
+        assert parse_retry_after(retry_after, now=1445412480) == expected
+
+    def test_burst_then_rate(self):
+        rate_limiter = RateLimiter(rate=50, burst=5)
+        started_at = time.monotonic()
+
+        for _ in range(10):
+            rate_limiter.acquire()
+
+        # The first five requests use the burst, the next five wait for a token each.
+        assert 0.08 <= time.monotonic() - started_at < 0.5
+        assert rate_limiter.counters["requests"] == 10
+
+    def test_throttled_response_halves_rate(self):
+        rate_limiter = RateLimiter(rate=10, burst=10)
+        rate_limiter.record_response(429)
+
+        assert rate_limiter.rate == 5
+        assert rate_limiter.counters["throttled_responses"] == 1
+
+        # Each request is sent after the last decrease, so each throttled response starts a new episode.
+        for _ in range(10):
+            rate_limiter.record_response(429, sent_at=time.monotonic())
+
+        assert rate_limiter.rate == MINIMUM_RATE
+
+    def test_concurrent_throttled_responses_cut_rate_once(self):
+        rate_limiter = RateLimiter(rate=10, burst=10)
+        barrier = threading.Barrier(8)
+
+        def send():
+            rate_limiter.acquire()
+            sent_at = time.monotonic()
+            barrier.wait()
+            rate_limiter.record_response(429, sent_at=sent_at)
+
+        threads = [threading.Thread(target=send) for _ in range(8)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        assert rate_limiter.rate == 5
+        assert rate_limiter.counters["throttled_responses"] == 8
+
+        for _ in range(10_000):
+            rate_limiter.record_response(200)
+
+        assert rate_limiter.rate == pytest.approx(10 * THROTTLED_RATE_MARGIN)
+
+    def test_throttled_responses_without_send_time_cut_rate_once(self):
+        rate_limiter = RateLimiter(rate=10, burst=10)
+
+        for _ in range(8):
+            rate_limiter.record_response(429)
+
+        assert rate_limiter.rate == 5
+
+    def test_rate_settles_under_throttled_rate(self):
+        rate_limiter = RateLimiter(rate=10, burst=10)
+        rate_limiter.record_response(200)
+
+        assert rate_limiter.rate == 10
+
+        rate_limiter.record_response(429)
+
+        for _ in range(10_000):
+            rate_limiter.record_response(200)
+
+        assert rate_limiter.rate == pytest.approx(10 * THROTTLED_RATE_MARGIN)
+
+    def test_server_errors_do_not_change_rate(self):
+        rate_limiter = RateLimiter(rate=10, burst=10)
+        rate_limiter.record_response(429)
+        rate_limiter.record_response(503)
+
+        assert rate_limiter.rate == 5
+
+    def test_retry_after_pauses_every_request(self):
+        rate_limiter = RateLimiter(rate=1000, burst=10)
+        rate_limiter.record_response(429, retry_after=0.2)
+
+        assert rate_limiter.acquire() >= 0.15
+
+    def test_orders_jump_ahead_of_data(self):
+        rate_limiter = RateLimiter(rate=20, burst=1)
+        rate_limiter.acquire()
+        acquired = []
+
+        def acquire(priority):
+            rate_limiter.acquire(priority)
+            acquired.append(priority)
+
+        data_threads = [threading.Thread(target=acquire, args=(PRIORITY_DATA,)) for _ in range(3)]
+
+        for thread in data_threads:
+            thread.start()
+
+        time.sleep(0.01)
+        order_thread = threading.Thread(target=acquire, args=(PRIORITY_ORDERS,))
+        order_thread.start()
+
+        for thread in data_threads + [order_thread]:
+            thread.join()
+
+        assert acquired[0] == PRIORITY_ORDERS
+        assert rate_limiter.counters["order_requests"] == 1
@@ -0,0 +1,131 @@
+import numpy as np
+import pytest
+
+from src import history_cache
+from src.bots import base_trade_bot
+from src.bots.base_trade_bot import TradeBot
+from src.history_cache import parse_begins_at
+from src.resampling import DAY_NANOSECONDS, bucket_starts, resample_columns
+from src.stock_history import NANOSECONDS_PER_SECOND, columns_from_stock_history
+from tests.configs import AAPL_STOCK_HISTORY_SAMPLE, STOCK_HISTORY_SAMPLE
+
+
+def begins_at_ns(begins_at):
+    return parse_begins_at(begins_at) * NANOSECONDS_PER_SECOND
+
+
+class TestResampling:
+    @pytest.mark.parametrize(
+        "interval,expected_length,expected_last_begins_at",
+        [
+            ("10minute", 39, "2021-11-09T20:50:00Z"),
+            ("hour", 7, "2021-11-09T20:30:00Z"),
+            ("day", 1, "2021-11-09T00:00:00Z"),
+        ],
+    )
+    def test_resample_columns(self, interval, expected_length, expected_last_begins_at):
+        columns = columns_from_stock_history(AAPL_STOCK_HISTORY_SAMPLE)
+        resampled = resample_columns(columns, interval)
+
+        assert len(resampled["begins_at"]) == expected_length
+        assert resampled["begins_at"][-1] == begins_at_ns(expected_last_begins_at)
+        assert resampled["volume"].sum() == columns["volume"].sum()
+        assert resampled["open_price"][0] == columns["open_price"][0]
+        assert resampled["close_price"][-1] == columns["close_price"][-1]
+        assert resampled["high_price"].max() == columns["high_price"].max()
+        assert resampled["low_price"].min() == columns["low_price"].min()
+
+    def test_resample_first_hour(self):
+        columns = columns_from_stock_history(AAPL_STOCK_HISTORY_SAMPLE)
+        resampled = resample_columns(columns, "hour")
+
+        assert resampled["begins_at"][0] == begins_at_ns("2021-11-09T14:30:00Z")
+        assert resampled["open_price"][0] == columns["open_price"][0]
+        assert resampled["close_price"][0] == columns["close_price"][11]
+        assert resampled["high_price"][0] == columns["high_price"][:12].max()
+        assert resampled["low_price"][0] == columns["low_price"][:12].min()
+        assert resampled["volume"][0] == columns["volume"][:12].sum()
+
+    def test_buckets_do_not_cross_sessions(self):
+        columns = columns_from_stock_history(AAPL_STOCK_HISTORY_SAMPLE)
+
+        # A second session on the next day that opens five minutes later.
+        next_session = columns["begins_at"] + DAY_NANOSECONDS + 300 * NANOSECONDS_PER_SECOND
+        begins_at = np.concatenate([columns["begins_at"], next_session[:-1]])
+
+        buckets = bucket_starts(begins_at, "hour")
+
+        assert len(np.unique(buckets)) == 14
+        assert buckets[78] == begins_at_ns("2021-11-10T14:35:00Z")
+        assert buckets[77] == begins_at_ns("2021-11-09T20:30:00Z")
+
+    def test_resample_weeks(self):
+        resampled = resample_columns(columns_from_stock_history(STOCK_HISTORY_SAMPLE), "week")
+
+        # The last daily bar of the sample falls on a Monday.
+        assert resampled["begins_at"][-1] == begins_at_ns("2021-11-08T00:00:00Z")
+        assert resampled["volume"][-1] == STOCK_HISTORY_SAMPLE[-1]["volume"]
+
+    def test_resample_weeks_from_mid_week(self):
+        columns = columns_from_stock_history(STOCK_HISTORY_SAMPLE)
+
+        # The sample begins on Monday 2020-11-09, so its third bar falls on a Wednesday.
+        resampled = resample_columns({column: values[2:] for column, values in columns.items()}, "week")
+        assert resampled["begins_at"][0] == begins_at_ns("2020-11-16T00:00:00Z")
+        assert resampled["open_price"][0] == columns["open_price"][5]
+
+        # Trimming to start on Wednesday keeps the bars of Monday and Tuesday in the first week.
+        resampled = resample_columns(columns, "week", start=2)
+        assert resampled["begins_at"][0] == begins_at_ns("2020-11-09T00:00:00Z")
+        assert resampled["open_price"][0] == columns["open_price"][0]
+        assert resampled["volume"].sum() == columns["volume"].sum()
+
+    def test_resample_empty(self):
+        resampled = resample_columns(columns_from_stock_history([]), "hour")
+
+        assert all(len(values) == 0 for values in resampled.values())
+
+
+class TestResampledStockHistory:
+    @pytest.fixture
+    def trade_bot(self, tmp_path, monkeypatch):
+        def get_stock_historicals(ticker, interval, span):
+            raise AssertionError(f"Requested {interval} bars over a {span} span")
+
+        monkeypatch.setenv("TRADEBOT_CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(base_trade_bot.robinhood.stocks, "get_stock_historicals", get_stock_historicals)
+
+        return TradeBot()
+
+    def set_now(self, monkeypatch, now):
+        monkeypatch.setattr(base_trade_bot.time, "time", lambda: parse_begins_at(now))
+        monkeypatch.setattr(history_cache.time, "time", lambda: parse_begins_at(now))
+
+    def test_hour_bars_from_cached_5minute_bars(self, trade_bot, monkeypatch):
+        # The last 5-minute bar of the sample is still forming.
+        self.set_now(monkeypatch, "2021-11-09T20:57:00Z")
+        trade_bot.history_cache.put("AAPL", "5minute", "day", AAPL_STOCK_HISTORY_SAMPLE)
+
+        stock_history_df = trade_bot.get_stock_history_dataframe("AAPL", "hour", "day")
+
+        # Like the bars returned by the API, the last hour bar is the one still forming.
+        assert len(stock_history_df) == 7
+        assert stock_history_df.index[-1].isoformat() == "2021-11-09T20:30:00+00:00"
+        assert stock_history_df["volume"].sum() == sum(bar["volume"] for bar in AAPL_STOCK_HISTORY_SAMPLE)
+
+    def test_forming_week_is_kept(self, trade_bot, monkeypatch):
+        # The last daily bar of the sample falls on Monday 2021-11-08.
+        self.set_now(monkeypatch, "2021-11-09T10:00:00Z")
+        trade_bot.history_cache.put("AAPL", "day", "year", STOCK_HISTORY_SAMPLE)
+
+        stock_history_df = trade_bot.get_stock_history_dataframe("AAPL", "week", "year")
+
+        assert stock_history_df.index[-1].isoformat() == "2021-11-08T00:00:00+00:00"
+        assert stock_history_df["volume"].iloc[-1] == STOCK_HISTORY_SAMPLE[-1]["volume"]
+
+    def test_exact_cache_entry_is_preferred(self, trade_bot, monkeypatch):
+        self.set_now(monkeypatch, "2021-11-09T10:00:00Z")
+        trade_bot.history_cache.put("AAPL", "day", "year", STOCK_HISTORY_SAMPLE)
+        trade_bot.history_cache.put("AAPL", "week", "year", STOCK_HISTORY_SAMPLE[-3:])
+
+        assert len(trade_bot.get_stock_history_dataframe("AAPL", "week", "year")) == 3
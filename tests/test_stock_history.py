@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.history_cache import parse_begins_at
+from src.stock_history import (
+    BAR_DTYPE,
+    SESSIONS,
+    BarBatch,
+    columns_from_stock_history,
+    columns_to_dataframe,
+    numeric_column,
+    parse_stock_history,
+)
+from tests.configs import AAPL_STOCK_HISTORY_SAMPLE, FB_STOCK_HISTORY_SAMPLE
+
+
+class TestStockHistory:
+    def test_columns_from_stock_history(self):
+        columns = columns_from_stock_history(AAPL_STOCK_HISTORY_SAMPLE)
+
+        assert columns["begins_at"].dtype == np.int64
+        assert columns["close_price"].dtype == np.float64
+        assert columns["volume"].dtype == np.int64
+        assert columns["begins_at"][0] == parse_begins_at("2021-11-09T14:30:00Z") * 1_000_000_000
+        assert columns["close_price"][0] == 150.265
+        assert columns["volume"][-1] == 884265
+
+    def test_bar_batch(self):
+        bar_batch = BarBatch.from_stock_history(FB_STOCK_HISTORY_SAMPLE + AAPL_STOCK_HISTORY_SAMPLE)
+
+        assert bar_batch.bars.dtype == BAR_DTYPE
+        assert bar_batch.bars.nbytes == 156 * BAR_DTYPE.itemsize
+        assert bar_batch.symbols == ("AAPL", "FB")
+        assert len(bar_batch.select("fb")) == 78
+        assert len(bar_batch.select("GOOG")) == 0
+
+        aapl_columns = bar_batch.select("AAPL").columns()
+
+        assert aapl_columns["close_price"][0] == 150.265
+        assert aapl_columns["session"][0] == SESSIONS.index("reg")
+        assert not aapl_columns["interpolated"].any()
+
+    def test_dataframe_views_bar_batch(self):
+        bar_batch = BarBatch.from_stock_history(AAPL_STOCK_HISTORY_SAMPLE)
+        stock_history_df = columns_to_dataframe(bar_batch.columns())
+
+        assert np.shares_memory(stock_history_df["close_price"].values, bar_batch.bars)
+        assert np.shares_memory(stock_history_df["volume"].values, bar_batch.bars)
+
+    @pytest.mark.parametrize("stock_history", [None, [], [None]])
+    def test_parse_failed_requests(self, stock_history):
+        assert parse_stock_history(stock_history).empty
+
+    def test_parse_stock_history(self):
+        stock_history_df = parse_stock_history(AAPL_STOCK_HISTORY_SAMPLE)
+
+        assert len(stock_history_df) == 78
+        assert str(stock_history_df.index.dtype) == "datetime64[ns, UTC]"
+        assert stock_history_df.index.name == "begins_at"
+        assert stock_history_df.dtypes.to_dict() == {
+            "open_price": np.float64,
+            "high_price": np.float64,
+            "low_price": np.float64,
+            "close_price": np.float64,
+            "volume": np.int64,
+            "session": pd.CategoricalDtype(SESSIONS),
+            "interpolated": np.bool_,
+        }
+        assert (stock_history_df["session"] == "reg").all()
+
+    def test_numeric_column_of_typed_dataframe(self):
+        stock_history_df = parse_stock_history(AAPL_STOCK_HISTORY_SAMPLE)
+
+        assert numeric_column(stock_history_df, "close_price") is stock_history_df["close_price"]
+
+    def test_numeric_column_does_not_modify_dataframe(self):
+        stock_history_df = pd.DataFrame(AAPL_STOCK_HISTORY_SAMPLE)
+        close_prices = numeric_column(stock_history_df, "close_price")
+
+        assert close_prices.dtype == np.float64
+        assert stock_history_df["close_price"].dtype == object
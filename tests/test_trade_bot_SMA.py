@@ -1,12 +1,14 @@
+import numpy as np
 import pandas as pd
 import pytest
 
+from src.bots import simple_moving_average
+from src.bots.base_trade_bot import OrderType
 from src.bots.simple_moving_average import TradeBotSimpleMovingAverage
-from src.utilities import RobinhoodCredentials
+from src.stock_history import parse_stock_history
 from tests.configs import STOCK_HISTORY_SAMPLE
 
 
-@pytest.mark.skipif(RobinhoodCredentials().empty_credentials, reason="Robinhood credentials not provided!")
 class TestTradeBotSimpleMovingAverage:
     trade_bot = TradeBotSimpleMovingAverage()
     stock_history_df = pd.DataFrame(STOCK_HISTORY_SAMPLE)
@@ -27,3 +29,122 @@ class TestTradeBotSimpleMovingAverage:
         stock_history_df = pd.DataFrame(stock_history)
         moving_average = self.trade_bot.calculate_simple_moving_average(stock_history_df, number_of_days)
         assert moving_average == expected
+
+    def test_calculate_simple_moving_averages(self):
+        stock_history_df = pd.DataFrame(STOCK_HISTORY_SAMPLE)
+        moving_averages = self.trade_bot.calculate_simple_moving_averages(stock_history_df, [25, 200])
+
+        assert list(moving_averages.columns) == [25, 200]
+        assert len(moving_averages) == len(STOCK_HISTORY_SAMPLE)
+        assert moving_averages[200].isna().sum() == 199
+        assert round(moving_averages[25].iloc[-1], 2) == 147.13
+        assert round(moving_averages[200].iloc[-1], 2) == 137.01
+
+    @pytest.mark.parametrize("stock_history,windows", [(None, [50]), ([], [50]), (STOCK_HISTORY_SAMPLE, [50, 0])])
+    def test_calculate_simple_moving_averages_errors(self, stock_history, windows):
+        stock_history_df = None if stock_history is None else pd.DataFrame(stock_history)
+
+        assert self.trade_bot.calculate_simple_moving_averages(stock_history_df, windows).empty
+
+    @pytest.fixture
+    def streaming_trade_bot(self, monkeypatch):
+        trade_bot = TradeBotSimpleMovingAverage(streaming=True)
+        trade_bot.now = 1636488000
+        trade_bot.stock_history = STOCK_HISTORY_SAMPLE[:-1]
+        trade_bot.history_requests = 0
+
+        def get_stock_history_dataframe(ticker):
+            trade_bot.history_requests += 1
+            return parse_stock_history(trade_bot.stock_history)
+
+        monkeypatch.setattr(simple_moving_average.time, "time", lambda: trade_bot.now)
+        monkeypatch.setattr(trade_bot.history_cache, "get_expiry", lambda ticker, interval, time_span: None)
+        monkeypatch.setattr(trade_bot, "get_stock_history_dataframe", get_stock_history_dataframe)
+
+        return trade_bot
+
+    def test_streaming_mode(self, streaming_trade_bot):
+        trade_bot = streaming_trade_bot
+
+        interpolated_bar = dict(STOCK_HISTORY_SAMPLE[-1], close_price="0.00", interpolated=True)
+        indicator_state = trade_bot.update_moving_averages("AAPL", interpolated_bar)
+        assert indicator_state["moving_average_200_day"] == self.trade_bot.calculate_simple_moving_average(
+            parse_stock_history(STOCK_HISTORY_SAMPLE[:-1]), 200
+        )
+
+        indicator_state = trade_bot.update_moving_averages("AAPL", STOCK_HISTORY_SAMPLE[-1])
+        assert indicator_state == self.trade_bot.compute_indicator_state(self.stock_history_df)
+        assert trade_bot.make_order_recommendation("AAPL") == OrderType.BUY_RECOMMENDATION
+        assert trade_bot.history_requests == 1
+
+    def test_streaming_mode_replaces_a_repeated_bar(self, streaming_trade_bot):
+        trade_bot = streaming_trade_bot
+        expected = self.trade_bot.compute_indicator_state(self.stock_history_df)
+
+        # The daily bar is sent while it is forming, and again once it has closed.
+        trade_bot.update_moving_averages("AAPL", dict(STOCK_HISTORY_SAMPLE[-1], close_price="0.00"))
+        assert trade_bot.update_moving_averages("AAPL", STOCK_HISTORY_SAMPLE[-1]) == expected
+        assert trade_bot.update_moving_averages("AAPL", STOCK_HISTORY_SAMPLE[-1]) == expected
+
+    def test_streaming_mode_takes_in_new_bars(self, streaming_trade_bot):
+        trade_bot = streaming_trade_bot
+        trade_bot.make_order_recommendation("AAPL")
+
+        # The newest bar was forming and closes, then a new bar comes in.
+        trade_bot.stock_history = STOCK_HISTORY_SAMPLE[:-2] + [dict(STOCK_HISTORY_SAMPLE[-2], close_price="0.00")]
+        trade_bot.now += 300
+        trade_bot.make_order_recommendation("AAPL")
+
+        trade_bot.stock_history = STOCK_HISTORY_SAMPLE
+        assert trade_bot.make_order_recommendations(["AAPL"]) == {"AAPL": OrderType.BUY_RECOMMENDATION}
+        assert trade_bot.history_requests == 2
+
+        trade_bot.now += 300
+        assert trade_bot.get_streaming_indicator_state("AAPL") == self.trade_bot.compute_indicator_state(
+            self.stock_history_df
+        )
+        assert trade_bot.history_requests == 3
+
+    def universe_frames(self):
+        """Returns the stock histories of a small universe covering each recommendation."""
+
+        falling_stock_history = [
+            dict(bar, close_price=reversed_bar["close_price"])
+            for bar, reversed_bar in zip(STOCK_HISTORY_SAMPLE, reversed(STOCK_HISTORY_SAMPLE))
+        ]
+
+        return {
+            "RISING": parse_stock_history(STOCK_HISTORY_SAMPLE),
+            "FALLING": parse_stock_history(falling_stock_history),
+            "SHORT": parse_stock_history(STOCK_HISTORY_SAMPLE[-120:]),
+            "NEW": parse_stock_history(STOCK_HISTORY_SAMPLE[-30:]),
+            "MISSING": pd.DataFrame(),
+        }
+
+    def test_calculate_order_recommendation_codes(self):
+        stock_history_frames = self.universe_frames()
+        close_prices = self.trade_bot.build_close_price_matrix(list(stock_history_frames.values()))
+        order_recommendation_codes = self.trade_bot.calculate_order_recommendation_codes(close_prices)
+
+        assert close_prices.shape == (5, 200)
+        assert order_recommendation_codes.dtype == np.int8
+        assert [OrderType(code) for code in order_recommendation_codes] == [
+            self.trade_bot.compare_moving_averages(**self.trade_bot.compute_indicator_state(stock_history_df))
+            for stock_history_df in stock_history_frames.values()
+        ]
+        assert list(order_recommendation_codes) == [1, 0, 1, -1, -1]
+
+    def test_make_order_recommendations(self, monkeypatch):
+        trade_bot = TradeBotSimpleMovingAverage()
+        stock_history_frames = self.universe_frames()
+        monkeypatch.setattr(
+            trade_bot,
+            "get_stock_history_frames",
+            lambda tickers: {ticker: stock_history_frames[ticker] for ticker in tickers},
+        )
+
+        assert trade_bot.make_order_recommendations(["FALLING", "RISING", "", "FALLING", "MISSING"]) == {
+            "FALLING": OrderType.SELL_RECOMMENDATION,
+            "RISING": OrderType.BUY_RECOMMENDATION,
+            "MISSING": OrderType.HOLD_RECOMMENDATION,
+        }
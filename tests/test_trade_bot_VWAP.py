@@ -1,12 +1,14 @@
 import pandas as pd
 import pytest
 
+from src.bots import volume_weighted_average_price
+from src.bots.base_trade_bot import OrderType
 from src.bots.volume_weighted_average_price import TradeBotVWAP
-from src.utilities import RobinhoodCredentials
+from src.history_cache import parse_begins_at
+from src.stock_history import parse_stock_history
 from tests.configs import AAPL_STOCK_HISTORY_SAMPLE, FB_STOCK_HISTORY_SAMPLE, GOOG_STOCK_HISTORY_SAMPLE
 
 
-@pytest.mark.skipif(RobinhoodCredentials().empty_credentials, reason="Robinhood credentials not provided!")
 class TestTradeBotVWAP:
     trade_bot = TradeBotVWAP()
 
@@ -23,3 +25,84 @@ class TestTradeBotVWAP:
     def test_calculate_VWAP(self, stock_history, expected):
         stock_history_df = pd.DataFrame(stock_history)
         assert self.trade_bot.calculate_VWAP(stock_history_df) == expected
+
+    @pytest.fixture
+    def offline_trade_bot(self, monkeypatch):
+        trade_bot = TradeBotVWAP()
+        trade_bot.history_requests = []
+        trade_bot.now = parse_begins_at("2021-11-09T20:56:00Z")
+        trade_bot.stock_history = AAPL_STOCK_HISTORY_SAMPLE[:-1]
+
+        def get_stock_history_dataframe(ticker, interval, time_span):
+            trade_bot.history_requests.append((ticker, interval, time_span))
+            return parse_stock_history(trade_bot.stock_history)
+
+        monkeypatch.setattr(volume_weighted_average_price.time, "time", lambda: trade_bot.now)
+        monkeypatch.setattr(trade_bot.history_cache, "get_expiry", lambda ticker, interval, time_span: None)
+        monkeypatch.setattr(trade_bot, "get_stock_history_dataframe", get_stock_history_dataframe)
+        monkeypatch.setattr(trade_bot, "get_current_market_price", lambda ticker: 150.90)
+
+        return trade_bot
+
+    def test_make_order_recommendation_follows_new_bars(self, offline_trade_bot):
+        assert offline_trade_bot.make_order_recommendation("AAPL") == OrderType.SELL_RECOMMENDATION
+        assert offline_trade_bot.get_VWAP("AAPL") == 150.81
+
+        # A new bar comes in, but the history taken in is current for another 5 minutes.
+        offline_trade_bot.stock_history = AAPL_STOCK_HISTORY_SAMPLE[:-1] + [
+            dict(AAPL_STOCK_HISTORY_SAMPLE[-1], close_price="160.00", volume=10**8)
+        ]
+        offline_trade_bot.now += 60
+        assert offline_trade_bot.make_order_recommendation("AAPL") == OrderType.SELL_RECOMMENDATION
+        assert len(offline_trade_bot.history_requests) == 1
+
+        offline_trade_bot.now += 300
+        assert offline_trade_bot.make_order_recommendation("AAPL") == OrderType.BUY_RECOMMENDATION
+        assert offline_trade_bot.get_VWAP("AAPL") > 150.90
+
+        # The bar was still forming, and its final version replaces it.
+        offline_trade_bot.stock_history = AAPL_STOCK_HISTORY_SAMPLE
+        offline_trade_bot.now += 300
+        assert offline_trade_bot.make_order_recommendation("AAPL") == OrderType.SELL_RECOMMENDATION
+        assert offline_trade_bot.get_VWAP("AAPL") == self.trade_bot.calculate_VWAP(
+            pd.DataFrame(AAPL_STOCK_HISTORY_SAMPLE)
+        )
+        assert offline_trade_bot.history_requests == [("AAPL", "5minute", "day")] * 3
+
+    def test_make_order_recommendations_follows_new_bars(self, offline_trade_bot, monkeypatch):
+        def get_stock_history_frames(tickers, interval, time_span):
+            return {
+                ticker: offline_trade_bot.get_stock_history_dataframe(ticker, interval, time_span) for ticker in tickers
+            }
+
+        monkeypatch.setattr(offline_trade_bot, "get_stock_history_frames", get_stock_history_frames)
+        monkeypatch.setattr(offline_trade_bot, "get_current_market_prices", lambda tickers: {"AAPL": 150.90})
+
+        assert offline_trade_bot.make_order_recommendations(["AAPL"]) == {"AAPL": OrderType.SELL_RECOMMENDATION}
+
+        offline_trade_bot.stock_history = AAPL_STOCK_HISTORY_SAMPLE[:-1] + [
+            dict(AAPL_STOCK_HISTORY_SAMPLE[-1], close_price="160.00", volume=10**8)
+        ]
+        assert offline_trade_bot.make_order_recommendations(["AAPL"]) == {"AAPL": OrderType.SELL_RECOMMENDATION}
+
+        offline_trade_bot.now += 300
+        assert offline_trade_bot.make_order_recommendations(["AAPL"]) == {"AAPL": OrderType.BUY_RECOMMENDATION}
+        assert len(offline_trade_bot.history_requests) == 2
+
+    def test_update_VWAP_streams_bars(self, offline_trade_bot):
+        offline_trade_bot.get_VWAP("AAPL")
+        offline_trade_bot.update_VWAP("AAPL", dict(AAPL_STOCK_HISTORY_SAMPLE[-1], close_price="160.00", volume=10**8))
+
+        assert offline_trade_bot.make_order_recommendation("AAPL") == OrderType.BUY_RECOMMENDATION
+        assert len(offline_trade_bot.history_requests) == 1
+
+    def test_VWAP_is_reseeded_for_a_new_session(self, offline_trade_bot):
+        offline_trade_bot.get_VWAP("AAPL")
+        offline_trade_bot.now = parse_begins_at("2021-11-10T14:36:00Z")
+        offline_trade_bot.stock_history = [
+            dict(bar, begins_at=bar["begins_at"].replace("2021-11-09", "2021-11-10"), close_price="140.00")
+            for bar in AAPL_STOCK_HISTORY_SAMPLE[:2]
+        ]
+
+        assert offline_trade_bot.get_VWAP("AAPL") == 140.00
+        assert len(offline_trade_bot.history_requests) == 2
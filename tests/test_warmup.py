@@ -0,0 +1,114 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from src.bots import base_trade_bot
+from src.bots.base_trade_bot import OrderType
+from src.bots.simple_moving_average import TradeBotSimpleMovingAverage
+from src.bots.volume_weighted_average_price import TradeBotVWAP
+from src.history_cache import parse_begins_at
+from src.utilities import WarmupSettings
+from src.warmup import WarmupScheduler, next_market_open
+from tests.configs import STOCK_HISTORY_SAMPLE
+
+
+@pytest.fixture
+def offline_bots(tmp_path, monkeypatch):
+    requests = []
+
+    monkeypatch.setenv("TRADEBOT_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(base_trade_bot.session_manager, "acquire", lambda: requests.append("login"))
+
+    def get_historicals(market_data, tickers, interval, time_span):
+        requests.append(("historicals", tuple(tickers), interval, time_span))
+        return [dict(bar, symbol=ticker.upper()) for ticker in tickers for bar in STOCK_HISTORY_SAMPLE]
+
+    def refresh(instrument_index, symbols):
+        requests.append(("instruments", tuple(symbols)))
+        return len(symbols)
+
+    monkeypatch.setattr(base_trade_bot.MarketDataFetcher, "get_historicals", get_historicals)
+    monkeypatch.setattr(base_trade_bot.InstrumentIndex, "refresh", refresh)
+
+    return requests
+
+
+class TestWarmup:
+    @pytest.mark.parametrize(
+        "now,expected",
+        [
+            # Tuesday before the open.
+            ("2021-11-09T13:00:00Z", "2021-11-09T14:30:00Z"),
+            # Tuesday at the open.
+            ("2021-11-09T14:30:00Z", "2021-11-10T14:30:00Z"),
+            # Friday after the close, and Saturday.
+            ("2021-11-12T21:00:00Z", "2021-11-15T14:30:00Z"),
+            ("2021-11-13T12:00:00Z", "2021-11-15T14:30:00Z"),
+            # Daylight saving time.
+            ("2021-11-05T12:00:00Z", "2021-11-05T13:30:00Z"),
+        ],
+    )
+    def test_next_market_open(self, now, expected):
+        assert next_market_open(parse_begins_at(now), WarmupSettings()) == parse_begins_at(expected)
+
+    def test_warm_up_precomputes_indicator_state(self, offline_bots, monkeypatch):
+        trade_bot = TradeBotSimpleMovingAverage()
+        warmup_counts = trade_bot.warm_up(["AAPL", "msft", "AAPL"])
+
+        assert warmup_counts == {"instruments": 2, "histories": 2, "indicator_states": 2}
+        assert offline_bots == [
+            "login",
+            ("instruments", ("AAPL", "MSFT")),
+            ("historicals", ("AAPL", "MSFT"), "day", "year"),
+        ]
+
+        stock_history_df = pd.DataFrame(STOCK_HISTORY_SAMPLE)
+        assert trade_bot.get_indicator_state("aapl") == {
+            "moving_average_50_day": trade_bot.calculate_simple_moving_average(stock_history_df, 50),
+            "moving_average_200_day": trade_bot.calculate_simple_moving_average(stock_history_df, 200),
+        }
+
+        # The first trading cycle reads neither the history cache nor the API.
+        monkeypatch.setattr(trade_bot, "get_stock_history_dataframe", None)
+        assert trade_bot.make_order_recommendation("AAPL") == OrderType.BUY_RECOMMENDATION
+
+    def test_expired_indicator_state_is_ignored(self, offline_bots, monkeypatch):
+        trade_bot = TradeBotSimpleMovingAverage()
+        trade_bot.warm_up(["AAPL"])
+
+        monkeypatch.setattr(base_trade_bot.time, "time", lambda: trade_bot.indicator_state["AAPL"][0])
+        assert trade_bot.get_indicator_state("AAPL") is None
+
+    def test_session_bots_skip_history(self, offline_bots):
+        trade_bot = TradeBotVWAP()
+
+        assert trade_bot.warm_up(["AAPL"]) == {"instruments": 1, "histories": 0, "indicator_states": 0}
+        assert trade_bot.get_indicator_state("AAPL") is None
+        assert offline_bots == ["login", ("instruments", ("AAPL",))]
+
+    def test_scheduler_reports_failed_warmups(self, offline_bots, monkeypatch):
+        failing_bot = TradeBotVWAP()
+        monkeypatch.setattr(failing_bot, "ensure_logged_in", lambda: 1 / 0)
+
+        scheduler = WarmupScheduler([failing_bot, TradeBotVWAP()], tickers=["AAPL"])
+
+        assert scheduler.run() == [None, {"instruments": 1, "histories": 0, "indicator_states": 0}]
+
+    def test_scheduler_warms_up_ahead_of_the_open(self, monkeypatch):
+        monkeypatch.setenv("TRADEBOT_UNIVERSE", "aapl, msft,")
+        monkeypatch.setenv("TRADEBOT_WARMUP_LEAD_SECONDS", str(7 * 24 * 60 * 60))
+        warmed_up = threading.Event()
+
+        class FakeBot:
+            def warm_up(self, tickers):
+                scheduler.stop()
+                warmed_up.set()
+                return tickers
+
+        scheduler = WarmupScheduler([FakeBot()])
+        scheduler.start()
+
+        assert warmed_up.wait(5)
+        assert scheduler.last_warmup_counts == [["AAPL", "MSFT"]]
+        assert not scheduler.scheduled